@@ -1,29 +1,127 @@
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-def get_env_var(name, required=True, default=None):
-    value = os.getenv(name, default)
-    if not value and required:
-        # We'll raise an error or just print a warning depending on severity.
-        # For essential services like DB, it might be better to fail early if not handled elsewhere.
-        print(f"Warning: Environment variable {name} not set.")
-    return value
-
-class Config:
-    MONGO_URI = get_env_var('MONGO_URI', required=False, default='mongodb://localhost:27017/')
-    GOOGLE_API_KEY = get_env_var('GOOGLE_API_KEY', required=True)
-    
-    # Twitter Credentials
-    TWITTER_API_KEY = get_env_var('TWITTER_API_KEY', required=False)
-    TWITTER_API_SECRET = get_env_var('TWITTER_API_SECRET', required=False)
-    TWITTER_ACCESS_TOKEN = get_env_var('TWITTER_ACCESS_TOKEN', required=False)
-    TWITTER_ACCESS_TOKEN_SECRET = get_env_var('TWITTER_ACCESS_TOKEN_SECRET', required=False)
-
-    # Threads Credentials
-    THREADS_USER_ID = get_env_var('THREADS_USER_ID', required=False)
-    THREADS_ACCESS_TOKEN = get_env_var('THREADS_ACCESS_TOKEN', required=False)
-    
-    # Search Config
-    SEARCH_DATE = get_env_var('SEARCH_DATE', required=False)
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def get_env_var(name, required=True, default=None):
+    value = os.getenv(name, default)
+    if not value and required:
+        # We'll raise an error or just print a warning depending on severity.
+        # For essential services like DB, it might be better to fail early if not handled elsewhere.
+        print(f"Warning: Environment variable {name} not set.")
+    return value
+
+class Config:
+    MONGO_URI = get_env_var('MONGO_URI', required=False, default='mongodb://localhost:27017/')
+    GOOGLE_API_KEY = get_env_var('GOOGLE_API_KEY', required=True)
+    
+    # Twitter Credentials
+    TWITTER_API_KEY = get_env_var('TWITTER_API_KEY', required=False)
+    TWITTER_API_SECRET = get_env_var('TWITTER_API_SECRET', required=False)
+    TWITTER_ACCESS_TOKEN = get_env_var('TWITTER_ACCESS_TOKEN', required=False)
+    TWITTER_ACCESS_TOKEN_SECRET = get_env_var('TWITTER_ACCESS_TOKEN_SECRET', required=False)
+
+    # Threads Credentials
+    THREADS_USER_ID = get_env_var('THREADS_USER_ID', required=False)
+    THREADS_ACCESS_TOKEN = get_env_var('THREADS_ACCESS_TOKEN', required=False)
+    # Twitter handles in the generated text mapped to Threads ones: 'twitter_handle:threads_handle,...'
+    THREADS_HANDLE_MAP = get_env_var('THREADS_HANDLE_MAP', required=False, default='')
+    
+    # Search Config
+    SEARCH_DATE = get_env_var('SEARCH_DATE', required=False)
+    # Athlete history stored in the athletes collection is reused for this long before refetching
+    HISTORY_TTL_HOURS = float(get_env_var('HISTORY_TTL_HOURS', required=False, default='24'))
+    # Athletes with contracts stored in the last N days get their history refreshed (0 disables)
+    HISTORY_REFRESH_DAYS = int(get_env_var('HISTORY_REFRESH_DAYS', required=False, default='30'))
+    # Tweet prompt input: approximate token budget and how many recent matches to send with the scout summary
+    TWEET_PROMPT_TOKEN_BUDGET = int(get_env_var('TWEET_PROMPT_TOKEN_BUDGET', required=False, default='1500'))
+    TWEET_PROMPT_RECENT_MATCHES = int(get_env_var('TWEET_PROMPT_RECENT_MATCHES', required=False, default='5'))
+    # Pending posts generated together in one LLM call (1 disables batching)
+    TWEET_BATCH_SIZE = int(get_env_var('TWEET_BATCH_SIZE', required=False, default='5'))
+    # Search scheduling: POLL_BUDGET_PER_DAY searches a day on average, spread over the week by when
+    # contracts were first seen (last POLL_HISTORY_DAYS days, POLL_TIMEZONE) and clamped to these intervals
+    POLL_BUDGET_PER_DAY = float(get_env_var('POLL_BUDGET_PER_DAY', required=False, default='24'))
+    POLL_MIN_INTERVAL_SECONDS = int(get_env_var('POLL_MIN_INTERVAL_SECONDS', required=False, default='900'))
+    POLL_MAX_INTERVAL_SECONDS = int(get_env_var('POLL_MAX_INTERVAL_SECONDS', required=False, default='14400'))
+    POLL_HISTORY_DAYS = int(get_env_var('POLL_HISTORY_DAYS', required=False, default='365'))
+    POLL_TIMEZONE = get_env_var('POLL_TIMEZONE', required=False, default='America/Fortaleza')
+    # Transfer windows ('MM-DD:MM-DD,...') are searched TRANSFER_WINDOW_BOOST times more eagerly (twice that in their last week)
+    TRANSFER_WINDOWS = get_env_var('TRANSFER_WINDOWS', required=False, default='01-02:03-03,07-10:09-02')
+    TRANSFER_WINDOW_BOOST = float(get_env_var('TRANSFER_WINDOW_BOOST', required=False, default='4'))
+
+    # Dates missed by the live search (downtime) are searched again, at most this many days back
+    CATCHUP_MAX_DAYS = int(get_env_var('CATCHUP_MAX_DAYS', required=False, default='30'))
+
+    # Club searched on the BID (default: Fortaleza EC)
+    SEARCH_UF = get_env_var('SEARCH_UF', required=False, default='CE')
+    SEARCH_CLUB_CODE = get_env_var('SEARCH_CLUB_CODE', required=False, default='63238')
+    # Clubs monitored by this process: 'UF:CLUB[:name],...' (the 'watchlist' collection overrides it;
+    # empty = just SEARCH_UF/SEARCH_CLUB_CODE)
+    WATCHLIST = get_env_var('WATCHLIST', required=False, default='')
+
+    # Captcha Solver Config
+    # Path to the trained local solver (see train_captcha_solver.py). Leave unset/missing to always use Gemini.
+    CAPTCHA_SOLVER_MODEL = get_env_var('CAPTCHA_SOLVER_MODEL', required=False, default='captcha_templates.npz')
+    # Minimum confidence for a local answer; below this we fall back to Gemini.
+    CAPTCHA_LOCAL_MIN_CONFIDENCE = float(get_env_var('CAPTCHA_LOCAL_MIN_CONFIDENCE', required=False, default='0.85'))
+    # Directory where captcha attempts (image, answer, model, latency, accepted) are recorded. Empty disables it.
+    CAPTCHA_CORPUS_DIR = get_env_var('CAPTCHA_CORPUS_DIR', required=False, default='data/captcha_corpus')
+    # Hedged mode: ask several models in parallel and vote per character
+    CAPTCHA_HEDGED = get_env_var('CAPTCHA_HEDGED', required=False, default='false').lower() == 'true'
+    CAPTCHA_HEDGE_MAX_IN_FLIGHT = int(get_env_var('CAPTCHA_HEDGE_MAX_IN_FLIGHT', required=False, default='3'))
+    # Vote weight a character needs to be accepted before all models answer (~2 unproven models agreeing)
+    CAPTCHA_HEDGE_QUORUM = float(get_env_var('CAPTCHA_HEDGE_QUORUM', required=False, default='1.2'))
+    # Opt-in dump of raw/processed captcha images (ring buffer of at most CAPTCHA_DEBUG_MAX_FILES files)
+    CAPTCHA_DEBUG_DIR = get_env_var('CAPTCHA_DEBUG_DIR', required=False)
+    CAPTCHA_DEBUG_MAX_FILES = int(get_env_var('CAPTCHA_DEBUG_MAX_FILES', required=False, default='50'))
+    # Prefetched captchas older than this are discarded (CBF expires them server-side)
+    CAPTCHA_MAX_AGE_SECONDS = int(get_env_var('CAPTCHA_MAX_AGE_SECONDS', required=False, default='120'))
+
+    # Gemini model health (cooldowns, latency, circuit breakers) survives restarts here
+    MODEL_ROUTER_STATE_PATH = get_env_var('MODEL_ROUTER_STATE_PATH', required=False, default='data/model_router_state.json')
+
+    # Gemini response cache: memory LRU + files in LLM_CACHE_DIR (empty = memory only).
+    # Tasks: 'text' (tweets), 'captcha' (only served for the exact same image; rejected answers are dropped)
+    LLM_CACHE_ENABLED = get_env_var('LLM_CACHE_ENABLED', required=False, default='true').lower() == 'true'
+    LLM_CACHE_DIR = get_env_var('LLM_CACHE_DIR', required=False, default='data/llm_cache')
+    LLM_CACHE_MAX_ENTRIES = int(get_env_var('LLM_CACHE_MAX_ENTRIES', required=False, default='500'))
+    LLM_CACHE_MAX_FILES = int(get_env_var('LLM_CACHE_MAX_FILES', required=False, default='5000'))
+    LLM_CACHE_TTL_SECONDS = int(get_env_var('LLM_CACHE_TTL_SECONDS', required=False, default='604800'))
+    LLM_CACHE_DISABLED_TASKS = get_env_var('LLM_CACHE_DISABLED_TASKS', required=False, default='')
+
+    # Publish workers: attempts per post and base of the exponential backoff between them
+    PUBLISH_MAX_ATTEMPTS = int(get_env_var('PUBLISH_MAX_ATTEMPTS', required=False, default='3'))
+    PUBLISH_BACKOFF_SECONDS = float(get_env_var('PUBLISH_BACKOFF_SECONDS', required=False, default='30'))
+
+    # Publish outbox: a claimed (contract, platform) job is leased for this long; failed jobs are
+    # retried with exponential backoff (OUTBOX_BACKOFF_SECONDS doubling) up to OUTBOX_MAX_ATTEMPTS claims
+    OUTBOX_LEASE_SECONDS = int(get_env_var('OUTBOX_LEASE_SECONDS', required=False, default='1800'))
+    OUTBOX_MAX_ATTEMPTS = int(get_env_var('OUTBOX_MAX_ATTEMPTS', required=False, default='8'))
+    OUTBOX_BACKOFF_SECONDS = int(get_env_var('OUTBOX_BACKOFF_SECONDS', required=False, default='300'))
+    # New contracts become publishable after this long even if their history could not be fetched
+    OUTBOX_ENRICH_GRACE_SECONDS = int(get_env_var('OUTBOX_ENRICH_GRACE_SECONDS', required=False, default='3600'))
+    # Publish as soon as outbox jobs are due (change stream, or polling on a standalone mongod)
+    # instead of once at the end of each search cycle
+    PUBLISH_TRIGGER_ENABLED = get_env_var('PUBLISH_TRIGGER_ENABLED', required=False, default='true').lower() == 'true'
+    PUBLISH_POLL_INTERVAL_SECONDS = float(get_env_var('PUBLISH_POLL_INTERVAL_SECONDS', required=False, default='5'))
+
+    # Rate Limits ('REQUESTS/SECONDS'), shared by every service in the process
+    RATE_LIMIT_CBF = get_env_var('RATE_LIMIT_CBF', required=False, default='29/60')
+    # Per Gemini model (each model has its own quota)
+    RATE_LIMIT_GEMINI = get_env_var('RATE_LIMIT_GEMINI', required=False, default='30/60')
+    RATE_LIMIT_TWITTER = get_env_var('RATE_LIMIT_TWITTER', required=False, default='1/65')
+    # Threads counts API calls (a post is 2 calls: create container + publish)
+    RATE_LIMIT_THREADS = get_env_var('RATE_LIMIT_THREADS', required=False, default='10/60')
+    # Persist bucket levels in MongoDB so restarts don't burst
+    RATE_LIMIT_PERSIST = get_env_var('RATE_LIMIT_PERSIST', required=False, default='true').lower() == 'true'
+
+    # Execution Mode: 'sync' (sequential loop) or 'async' (concurrent pipeline stages)
+    EXECUTION_MODE = get_env_var('EXECUTION_MODE', required=False, default='sync')
+    PIPELINE_QUEUE_SIZE = int(get_env_var('PIPELINE_QUEUE_SIZE', required=False, default='20'))
+    ASYNC_GEMINI_CONCURRENCY = int(get_env_var('ASYNC_GEMINI_CONCURRENCY', required=False, default='2'))
+
+    # CBF Sessions: each pooled session has its own cookies/CSRF token (and its own captcha)
+    CBF_SESSION_POOL_SIZE = int(get_env_var('CBF_SESSION_POOL_SIZE', required=False, default='2'))
+    CBF_SESSION_STATE_PATH = get_env_var('CBF_SESSION_STATE_PATH', required=False, default='data/cbf_sessions.json')
+    # Persisted sessions older than this are not reused on startup
+    CBF_SESSION_MAX_AGE_SECONDS = int(get_env_var('CBF_SESSION_MAX_AGE_SECONDS', required=False, default='3600'))
@@ -0,0 +1,173 @@
+import asyncio
+from app.config import Config
+from app.controllers.bid_controller import BidController
+from app.services.async_adapters import AsyncContractRepository
+
+class AsyncBidController(BidController):
+    """
+    Asyncio execution mode for the BID cycle.
+
+    Search, enrichment and publishing run as concurrent stages joined by
+    bounded queues: athletes are enriched as soon as the search returns and
+    each enriched contract is published while the next athlete is fetched.
+    The stages only schedule work: each step runs the sync use case
+    (SearchWatchlistUseCase, EnrichAthleteUseCase, PublishWorker) in a worker
+    thread, so retries and captcha reporting are the same in both modes.
+
+    Stage concurrency is bounded by the CBF session pool (one enricher per
+    pooled session, cbf_service.max_concurrency) and by
+    ASYNC_GEMINI_CONCURRENCY for post generation. The shared rate buckets only
+    pace requests: the services acquire them (blocking) inside those threads.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.repo = AsyncContractRepository(self.repository)
+        self.providers = self.sync_use_case.providers
+
+    def run(self):
+        asyncio.run(self._run_forever())
+
+    async def _run_forever(self):
+        await asyncio.to_thread(self.cbf_service.initialize_session)
+        while True:
+            searched = await self.run_cycle()
+            targets = await asyncio.to_thread(self.watchlist_use_case.targets)
+            await asyncio.to_thread(self.catch_up, targets, searched)
+            # Reuses the sync flow (captcha-gated, one athlete at a time)
+            await asyncio.to_thread(self.refresh_use_case.execute)
+            if self.gemini_service.cache_stats():
+                print(f"[AsyncController] LLM cache: {self.gemini_service.cache_stats()}")
+            delay = await asyncio.to_thread(self.poll_scheduler.seconds_until_next_run)
+            next_run = self.poll_scheduler.next_run_at.astimezone(self.poll_scheduler.tz)
+            print(f"[AsyncController] Cycle complete. Next search at {next_run:%d/%m %H:%M} (in {delay / 60:.0f} min).")
+            await asyncio.sleep(delay)
+
+    async def run_cycle(self):
+        """
+        One search -> enrich -> publish pass. Returns the watchlist targets searched successfully.
+        """
+        # Concurrent fetches of the same athlete (found for several clubs) wait for the first one
+        self._athlete_locks = {}
+        gemini_slots = asyncio.Semaphore(Config.ASYNC_GEMINI_CONCURRENCY)
+        # One generated post per contract, shared by every provider in the cycle
+        self._posts = {}
+        self._post_locks = {}
+        enrich_queue = asyncio.Queue(maxsize=Config.PIPELINE_QUEUE_SIZE)
+        publish_queues = {p.name: asyncio.Queue(maxsize=Config.PIPELINE_QUEUE_SIZE) for p in self.providers}
+
+        n_enrichers = self.cbf_service.max_concurrency
+        search = asyncio.create_task(self._search_stage(enrich_queue, n_enrichers))
+        enrichers = [
+            asyncio.create_task(self._enrich_worker(enrich_queue, publish_queues))
+            for _ in range(n_enrichers)
+        ]
+        # Earlier failures get their posts generated in batches while search runs
+        pending = await self._prepare_pending_posts(gemini_slots)
+        publishers = [
+            asyncio.create_task(self._publish_stage(p, publish_queues[p.name], gemini_slots, pending[p.name]))
+            for p in self.providers
+        ]
+
+        searched = await search
+        await asyncio.gather(*enrichers)
+        for queue in publish_queues.values():
+            await queue.put(None)
+        await asyncio.gather(*publishers)
+        return searched
+
+    # --- Stages ---
+
+    async def _search_stage(self, enrich_queue, n_enrichers):
+        print("\n[AsyncController] Starting search stage...")
+        # Targets are searched concurrently over the session pool (see SearchWatchlistUseCase)
+        results, searched = await asyncio.to_thread(self.watchlist_use_case.execute)
+
+        if results:
+            to_enrich = await self.repo.contracts_needing_history(results)
+            print(f"[AsyncController] Found {len(results)} items, {len(to_enrich)} need history. Feeding enrichment stage...")
+            for athlete in to_enrich:
+                await enrich_queue.put(athlete)
+        else:
+            print("[AsyncController] No results or search failed.")
+
+        for _ in range(n_enrichers):
+            await enrich_queue.put(None)
+        return searched
+
+    async def _enrich_worker(self, enrich_queue, publish_queues, max_retries=5):
+        while True:
+            athlete = await enrich_queue.get()
+            if athlete is None:
+                return
+
+            codigo_atleta = athlete['codigo_atleta']
+            async with self._athlete_locks.setdefault(codigo_atleta, asyncio.Lock()):
+                # Already filtered by contracts_needing_history in the search stage
+                enriched = await asyncio.to_thread(self.enrich_use_case.execute, athlete, max_retries, False)
+            if not enriched:
+                continue
+
+            contract = await self.repo.find_contract(athlete)
+            if contract:
+                for queue in publish_queues.values():
+                    await queue.put(contract)
+
+    async def _get_post(self, contract, gemini_slots):
+        """
+        SyncSocialUseCase.ensure_post, generating each contract's post once
+        even when both providers ask for it at the same time.
+        """
+        contract_id = contract['_id']
+        async with self._post_locks.setdefault(contract_id, asyncio.Lock()):
+            if contract_id in self._posts:
+                return self._posts[contract_id]
+            async with gemini_slots:
+                post = await asyncio.to_thread(self.sync_use_case.ensure_post, contract)
+            self._posts[contract_id] = post
+            return post
+
+    async def _prepare_pending_posts(self, gemini_slots, pending_limit=5):
+        owner = self.sync_use_case.owner
+        pending = {p.name: await self.repo.claim_pending_posts(p.name, owner, limit=pending_limit) for p in self.providers}
+        contracts = [c for items in pending.values() for c in items]
+        if contracts:
+            async with gemini_slots:
+                await asyncio.to_thread(self.sync_use_case.ensure_posts, contracts)
+            for contract in contracts:
+                if contract.get('post'):
+                    self._posts[contract['_id']] = contract['post']
+        return pending
+
+    async def _publish_stage(self, provider, queue, gemini_slots, pending):
+        """
+        Feeds the provider's PublishWorker, so retries, backoff and pausing a
+        failing platform follow the sync flow, and waits for it to drain.
+        """
+        worker = self.sync_use_case.worker_for(provider)
+        worker.new_cycle()
+
+        async def publish(contract):
+            if 'outbox_job' not in contract:
+                # Fresh from enrichment: only publish if this process wins its outbox job
+                contract = await self.repo.claim_post(contract['_id'], provider.name, self.sync_use_case.owner)
+                if contract is None:
+                    return
+            try:
+                post = await self._get_post(contract, gemini_slots)
+            except Exception as e:
+                print(f"[AsyncController] Error preparing post for {provider.name}: {e}")
+                await self.repo.retry_post_later(contract, str(e))
+                return
+            worker.submit(contract, post['text'])
+
+        # Earlier failures first, then contracts coming out of enrichment
+        for contract in pending:
+            await publish(contract)
+
+        while True:
+            contract = await queue.get()
+            if contract is None:
+                break
+            await publish(contract)
+        await asyncio.to_thread(worker.join)
@@ -1,89 +1,221 @@
-from app.services.cbf_service import CBFService
-from app.services.gemini_service import GeminiService
-from app.services.social.twitter_service import TwitterService
-from app.services.social.threads_service import ThreadsService
-from app.models.contract_repository import ContractRepository
-from app.use_cases.search_bid import SearchBidUseCase
-from app.use_cases.enrich_athlete import EnrichAthleteUseCase
-from app.use_cases.sync_social import SyncSocialUseCase
-import time
-
-class BidController:
-    def __init__(self):
-        # Initialize Services
-        self.cbf_service = CBFService()
-        self.gemini_service = GeminiService()
-        self.twitter_service = TwitterService()
-        self.threads_service = ThreadsService()
-        self.repository = ContractRepository()
-        
-        # Initialize Use Cases
-        self.search_use_case = SearchBidUseCase(self.cbf_service, self.gemini_service)
-        self.enrich_use_case = EnrichAthleteUseCase(self.cbf_service, self.gemini_service, self.repository)
-        
-        # Sync Use Case with multiple providers
-        self.sync_use_case = SyncSocialUseCase(
-            self.repository, 
-            self.gemini_service, 
-            providers=[self.twitter_service, self.threads_service]
-        )
-
-    def run(self):
-        # 1. Initialize CBF Session
-        self.cbf_service.initialize_session()
-        
-        requests_count = 0
-        max_requests_per_minute = 29
-        minute_start_time = time.time()
-
-        def check_rate_limit(count):
-            nonlocal minute_start_time
-            current_time = time.time()
-            elapsed_time = current_time - minute_start_time
-            
-            if elapsed_time >= 60:
-                count = 0
-                minute_start_time = time.time()
-                print("--- New minute started for rate limiting ---")
-            
-            if count >= max_requests_per_minute:
-                wait_time = 60 - elapsed_time + 1
-                if wait_time > 0:
-                    print(f"Rate limit reaching ({count}). Waiting {wait_time:.2f}s...")
-                    time.sleep(wait_time)
-                count = 0
-                minute_start_time = time.time()
-            
-            return count
-
-        # Main Loop
-        while True:
-            # Rate Limit for Search Step
-            requests_count = check_rate_limit(requests_count)
-            requests_count += 2 # Captcha + Search estimates
-            
-            # --- 1. Search ---
-            results = self.search_use_case.execute()
-            
-            # --- 2. Enrich & Save ---
-            if results:
-                print(f"[Controller] Found {len(results)} items. Starting enrichment...")
-                for athlete in results:
-                    # Rate limit for Enrichment
-                    requests_count = check_rate_limit(requests_count)
-                    requests_count += 2 # Captcha + History Fetch estimates
-                    
-                    self.enrich_use_case.execute(athlete)
-            
-            else:
-                # If no results or failed, wait a bit before next search loop
-                print("[Controller] No results or search failed. Waiting before retry...")
-                time.sleep(10) # 10s delay between search attempts if empty/fail
-
-            # --- 3. Sync Social Media ---
-            # We run sync after each search cycle.
-            self.sync_use_case.execute()
-            
-            # stability delay
-            print("[Controller] Cycle complete. Waiting 3600s (1h) before next search cycle...")
-            time.sleep(3600)
+from app.services.cbf_service import CBFService
+from app.services.gemini_service import GeminiService
+from app.services.social.twitter_service import TwitterService
+from app.services.social.threads_service import ThreadsService
+from app.models.contract_repository import ContractRepository
+from app.use_cases.search_bid import SearchBidUseCase
+from app.use_cases.search_watchlist import SearchWatchlistUseCase, parse_watchlist
+from app.use_cases.enrich_athlete import EnrichAthleteUseCase
+from app.use_cases.sync_social import SyncSocialUseCase
+from app.use_cases.refresh_history import RefreshHistoryUseCase
+from app.use_cases.backfill import BackfillUseCase
+from app.use_cases.catch_up import CatchUpUseCase
+from app.services.social.publish_trigger import PublishTrigger
+from app.services.poll_scheduler import PollScheduler, parse_windows
+from app.services.captcha.prefetcher import CaptchaPrefetcher
+from app.services.rate_limiter import get_rate_limiter, MongoBucketStore
+from app.config import Config
+import threading
+import time
+from datetime import datetime
+
+class BidController:
+    def __init__(self):
+        # Initialize Services
+        self.cbf_service = CBFService()
+        self.gemini_service = GeminiService()
+        self.twitter_service = TwitterService()
+        self.threads_service = ThreadsService()
+        self.repository = ContractRepository()
+        
+        # Shared rate buckets (CBF, Gemini, Twitter, Threads); persisted so restarts don't burst
+        if Config.RATE_LIMIT_PERSIST and self.repository.db is not None:
+            get_rate_limiter().attach_store(MongoBucketStore(self.repository.db['rate_limits']))
+        # Contracts stored before the publish outbox existed get their jobs
+        self.repository.seed_outbox()
+
+        self.captcha_prefetcher = CaptchaPrefetcher(
+            self.cbf_service,
+            self.gemini_service,
+            max_age=Config.CAPTCHA_MAX_AGE_SECONDS
+        )
+        
+        # Initialize Use Cases
+        self.search_use_case = SearchBidUseCase(self.cbf_service, self.gemini_service)
+        # Every watched (UF, club) shares the CBF session pool and rate bucket
+        self.watchlist_use_case = SearchWatchlistUseCase(
+            self.search_use_case,
+            self.repository,
+            parse_watchlist(Config.WATCHLIST) or [{'uf': Config.SEARCH_UF, 'codigo_clube': Config.SEARCH_CLUB_CODE, 'nome': None}],
+            workers=self.cbf_service.max_concurrency
+        )
+        self.enrich_use_case = EnrichAthleteUseCase(
+            self.cbf_service,
+            self.gemini_service,
+            self.repository,
+            prefetcher=self.captcha_prefetcher
+        )
+        self.refresh_use_case = RefreshHistoryUseCase(
+            self.enrich_use_case,
+            self.repository,
+            days=Config.HISTORY_REFRESH_DAYS
+        )
+        # Searches the dates the live search missed (downtime), newest first; one CatchUpUseCase per target
+        self.catch_up_backfill = BackfillUseCase(
+            self.cbf_service,
+            self.gemini_service,
+            self.repository,
+            enrich_use_case=self.enrich_use_case,
+            source='catch_up'
+        )
+        self.catch_up_use_cases = {}
+        
+        # Sync Use Case with multiple providers
+        self.sync_use_case = SyncSocialUseCase(
+            self.repository, 
+            self.gemini_service, 
+            providers=[self.twitter_service, self.threads_service]
+        )
+        # When to search next (learned from when contracts show up)
+        self.poll_scheduler = PollScheduler(
+            self.repository,
+            polls_per_day=Config.POLL_BUDGET_PER_DAY,
+            min_interval=Config.POLL_MIN_INTERVAL_SECONDS,
+            max_interval=Config.POLL_MAX_INTERVAL_SECONDS,
+            history_days=Config.POLL_HISTORY_DAYS,
+            tz=Config.POLL_TIMEZONE,
+            transfer_windows=parse_windows(Config.TRANSFER_WINDOWS),
+            window_boost=Config.TRANSFER_WINDOW_BOOST
+        )
+
+        self.publish_trigger = None
+        if Config.PUBLISH_TRIGGER_ENABLED and self.repository.outbox is not None:
+            self.publish_trigger = PublishTrigger(
+                self.repository.outbox,
+                poll_interval=Config.PUBLISH_POLL_INTERVAL_SECONDS
+            )
+
+    def start_publisher(self):
+        """
+        Publishes from a background thread whenever outbox jobs become due, so
+        a contract goes out seconds after it is saved with its history.
+        Returns False when publishing stays at the end of each cycle.
+        """
+        if self.publish_trigger is None:
+            return False
+        self.publish_trigger.start()
+        threading.Thread(target=self._publish_loop, name='publisher', daemon=True).start()
+        return True
+
+    def _publish_loop(self):
+        while self.publish_trigger.wait():
+            try:
+                self.sync_use_case.execute()
+            except Exception as e:
+                print(f"[Controller] Publisher error: {e}")
+
+    def _catch_up_for(self, target):
+        key = (target['uf'], target['codigo_clube'])
+        if key not in self.catch_up_use_cases:
+            self.catch_up_use_cases[key] = CatchUpUseCase(
+                self.catch_up_backfill,
+                self.repository,
+                target['uf'],
+                target['codigo_clube'],
+                max_days=Config.CATCHUP_MAX_DAYS
+            )
+        return self.catch_up_use_cases[key]
+
+    def catch_up(self, targets, searched):
+        """
+        Runs catch-up searches for missed dates of every target, then records
+        today's live search as the last searched date of the targets it
+        succeeded for. A pinned Config.SEARCH_DATE disables both.
+        """
+        if Config.SEARCH_DATE:
+            return
+        for target in targets:
+            try:
+                self._catch_up_for(target).execute()
+            except Exception as e:
+                print(f"[Controller] Catch-up error for {target['uf']}:{target['codigo_clube']}: {e}")
+        today = datetime.now().strftime('%d/%m/%Y')
+        for target in searched:
+            self._catch_up_for(target).record_search(today)
+
+    @staticmethod
+    def split_repeated_athletes(athletes):
+        """
+        (first contract of each athlete, the others). Contracts of an athlete
+        already listed reuse the history fetched for the first one.
+        """
+        first, repeated = {}, []
+        for athlete in athletes:
+            if athlete['codigo_atleta'] in first:
+                repeated.append(athlete)
+            else:
+                first[athlete['codigo_atleta']] = athlete
+        return list(first.values()), repeated
+
+    def run(self):
+        # 1. Initialize CBF Session
+        self.cbf_service.initialize_session()
+        event_driven = self.start_publisher()
+
+        # Main Loop
+        # Every CBF request is charged to the shared 'cbf' bucket by CBFService itself
+        while True:
+            # --- 1. Search every watched club ---
+            results, searched = self.watchlist_use_case.execute()
+            
+            # --- 2. Enrich & Save ---
+            if results:
+                # One query tells which athletes still need CBF calls (captcha + history)
+                to_enrich = self.repository.contracts_needing_history(results)
+                print(f"[Controller] Found {len(results)} items, {len(to_enrich)} need history. Starting enrichment...")
+                # Athletes with a fresh cached history are linked without CBF calls
+                cached = self.repository.fresh_history_codes({a['codigo_atleta'] for a in to_enrich})
+                to_fetch, repeated = self.split_repeated_athletes(
+                    [a for a in to_enrich if a['codigo_atleta'] not in cached]
+                )
+                for athlete in to_enrich:
+                    if athlete['codigo_atleta'] in cached:
+                        self.enrich_use_case.execute(athlete, check_existing=False)
+                if to_fetch:
+                    # Captchas are fetched/solved in the background while the previous athlete is saved
+                    self.captcha_prefetcher.start(expected=len(to_fetch))
+                    try:
+                        for athlete in to_fetch:
+                            self.enrich_use_case.execute(athlete, check_existing=False)
+                    finally:
+                        self.captcha_prefetcher.stop()
+                # Same athlete found for several clubs: history fetched once, reused from the cache
+                for athlete in repeated:
+                    self.enrich_use_case.execute(athlete, check_existing=False)
+            
+            else:
+                print("[Controller] No results or search failed.")
+
+            # --- 2a. Catch up on dates missed while the monitor was down ---
+            self.catch_up(self.watchlist_use_case.targets(), searched)
+
+            # --- 2b. Refresh stale history of recently signed athletes ---
+            self.refresh_use_case.execute()
+
+            # --- 3. Sync Social Media ---
+            # The publisher thread posts as jobs become due; without it we sync after each search cycle.
+            if not event_driven:
+                self.sync_use_case.execute()
+            if self.gemini_service.cache_stats():
+                print(f"[Controller] LLM cache: {self.gemini_service.cache_stats()}")
+            
+            self.wait_for_next_run()
+
+    def wait_for_next_run(self):
+        """
+        Sleeps until the scheduler's next planned search (poll_scheduler.next_run_at).
+        """
+        delay = self.poll_scheduler.seconds_until_next_run()
+        next_run = self.poll_scheduler.next_run_at.astimezone(self.poll_scheduler.tz)
+        print(f"[Controller] Cycle complete. Next search at {next_run:%d/%m %H:%M} (in {delay / 60:.0f} min).")
+        time.sleep(delay)
@@ -1,187 +1,815 @@
-from pymongo import MongoClient
-from app.config import Config
-
-class ContractRepository:
-    def __init__(self):
-        self.client = self._get_client()
-        if self.client:
-            self.db = self.client['cbf_data']
-            self.collection = self.db['contracts']
-        else:
-            self.collection = None
-
-    def _get_client(self):
-        try:
-            client = MongoClient(Config.MONGO_URI)
-            client.admin.command('ping')
-            print("Connected to MongoDB.")
-            return client
-        except Exception as e:
-            print(f"Error connecting to MongoDB: {e}")
-            return None
-
-    def save_contracts(self, contracts):
-        """
-        Saves a list of contracts to the database.
-        Returns a list of inserted contracts (documents that were new).
-        """
-        if self.collection is None:
-            print("Database not connected. Skipping save.")
-            return []
-
-        saved_contracts = []
-        for item in contracts:
-            if not isinstance(item, dict):
-                print(f"Skipping invalid item (not a dict): {item}")
-                continue
-
-            contract_id = item.get('id_contrato')
-            if not contract_id:
-                print(f"Skipping item without 'id_contrato': {item}")
-                continue
-            
-            # Check if exists
-            exists = self.collection.find_one({'id_contrato': contract_id})
-            if not exists:
-                self.collection.insert_one(item)
-                saved_contracts.append(item)
-                print(f"Saved new contract: {item.get('nome')} ({contract_id})")
-            else:
-                print(f"Contract {contract_id} already exists. Skipping.")
-        
-        return saved_contracts
-
-    def has_history_for_contract(self, contract_data):
-        """
-        Checks if the contract already exists in the DB and has history data.
-        """
-        if self.collection is None:
-            return False
-
-        query = {}
-        if 'contrato_numero' in contract_data:
-            query['contrato_numero'] = contract_data['contrato_numero']
-        elif 'id_contrato' in contract_data:
-            query['id_contrato'] = contract_data['id_contrato']
-        else:
-            if 'codigo_atleta' in contract_data and 'codigo_clube' in contract_data:
-                 query = {
-                     'codigo_atleta': contract_data['codigo_atleta'],
-                     'codigo_clube': contract_data['codigo_clube']
-                 }
-            else:
-                return False
-        
-        try:
-            # Check for existence AND non-empty 'historico'
-            existing = self.collection.find_one(query, {'historico': 1})
-            if existing and existing.get('historico'):
-                return True
-            return False
-        except Exception as e:
-            print(f"Error checking history existence: {e}")
-            return False
-
-    def save_contract_with_history(self, contract_data):
-        """
-        Saves a single contract with its history.
-        Uses upsert to update if exists.
-        """
-        if self.collection is None:
-            print("Database not connected. Skipping save.")
-            return False
-
-        if not isinstance(contract_data, dict):
-            print(f"Skipping invalid item (not a dict): {contract_data}")
-            return False
-
-        # Determine unique identifier
-        # User example has 'contrato_numero', existing code used 'id_contrato'
-        # we try to use a unique combination.
-        
-        query = {}
-        if 'contrato_numero' in contract_data:
-            query['contrato_numero'] = contract_data['contrato_numero']
-        elif 'id_contrato' in contract_data:
-            query['id_contrato'] = contract_data['id_contrato']
-        else:
-            # Fallback to athlete code + club? Might not be unique for contract but good enough?
-            # Or just skip
-            if 'codigo_atleta' in contract_data and 'codigo_clube' in contract_data:
-                 query = {
-                     'codigo_atleta': contract_data['codigo_atleta'],
-                     'codigo_clube': contract_data['codigo_clube']
-                 }
-            else:
-                print(f"Skipping item without ID fields: {contract_data}")
-                return False
-        
-        try:
-            # Check if it exists first to know if we are inserting
-            existing = self.collection.find_one(query)
-            
-            # Prepare update data
-            update_data = {'$set': contract_data}
-            
-            # If new, ensure tweeted is False (if not present)
-            if not existing:
-                if 'tweeted' not in contract_data:
-                     update_data['$setOnInsert'] = {'tweeted': False}
-                print(f"Inserted new contract/history for {contract_data.get('nome', 'Unknown')}")
-            else:
-                # If updating, we don't reset tweeted unless we want to re-tweet updates?
-                # Usually no.
-                print(f"Updated existing contract/history for {contract_data.get('nome', 'Unknown')}")
-
-            result = self.collection.update_one(
-                query,
-                update_data,
-                upsert=True
-            )
-            
-            return True
-        except Exception as e:
-            print(f"Error saving to MongoDB: {e}")
-            return False
-
-    def get_pending_posts(self, platform_name: str, limit=10):
-        """
-        Retrieves contracts that have not been posted to the specified platform yet.
-        """
-        if self.collection is None:
-            return []
-            
-        try:
-            # check if social_status.{platform_name}.posted is not True
-            # We treat missing as not posted.
-            query = {
-                f'social_status.{platform_name}.posted': {'$ne': True}
-            }
-            # Sort by _id (timestamp) ascending to prioritize oldest (failed) items first
-            return list(self.collection.find(query).sort('_id', 1).limit(limit))
-        except Exception as e:
-            print(f"Error fetching pending posts for {platform_name}: {e}")
-            return []
-
-    def mark_as_posted(self, contract_id, platform_name: str, post_id=None):
-        """
-        Marks a contract as posted on a specific platform.
-        """
-        if self.collection is None:
-            return False
-            
-        try:
-            self.collection.update_one(
-                {'_id': contract_id},
-                {
-                    '$set': {
-                        f'social_status.{platform_name}.posted': True,
-                        f'social_status.{platform_name}.post_id': post_id,
-                        f'social_status.{platform_name}.posted_at': Config.SEARCH_DATE # or current time
-                    }
-                }
-            )
-            return True
-        except Exception as e:
-            print(f"Error marking as posted on {platform_name}: {e}")
-            return False
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from pymongo import MongoClient, ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+from app.config import Config
+from app.models.outbox_repository import OutboxRepository
+from app.services.scout_stats import compute_scout
+
+def _content_hash(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')).hexdigest()
+
+def _season_meta(matches):
+    return {'hash': _content_hash(matches), 'count': len(matches) if isinstance(matches, list) else None}
+
+def _history_update(stored, historico, fetched_at):
+    """
+    Builds the update for an athlete's history given what is stored
+    ({'content_hash', 'seasons': {season: {'hash', 'count'}}} or None).
+
+    Identical responses only bump fetched_at. When the history is organised by
+    season, only changed seasons are written: new matches appended to (or
+    prepended before) a known season are $push-ed, anything else rewrites that
+    season alone. Returns (update, changed_seasons); changed_seasons is None
+    when the whole history was written.
+    """
+    content_hash = _content_hash(historico)
+    if stored and stored.get('content_hash') == content_hash:
+        return {'$set': {'fetched_at': fetched_at}}, []
+
+    by_season = isinstance(historico, dict) and all(
+        isinstance(k, str) and k and '.' not in k and not k.startswith('$') for k in historico
+    )
+    stored_seasons = (stored or {}).get('seasons')
+    if not by_season or not isinstance(stored_seasons, dict):
+        update = {'historico': historico, 'content_hash': content_hash, 'fetched_at': fetched_at}
+        if by_season:
+            update['seasons'] = {season: _season_meta(matches) for season, matches in historico.items()}
+        return {'$set': update}, None
+
+    to_set, to_push, to_unset = {}, {}, {}
+    changed = []
+    for season, matches in historico.items():
+        meta = stored_seasons.get(season)
+        new_meta = _season_meta(matches)
+        if meta and meta.get('hash') == new_meta['hash']:
+            continue
+        changed.append(season)
+        count = (meta or {}).get('count')
+        if count and new_meta['count'] and new_meta['count'] > count:
+            if _content_hash(matches[:count]) == meta['hash']:
+                to_push[f'historico.{season}'] = {'$each': matches[count:]}
+            elif _content_hash(matches[-count:]) == meta['hash']:
+                to_push[f'historico.{season}'] = {'$each': matches[:-count], '$position': 0}
+            else:
+                to_set[f'historico.{season}'] = matches
+        else:
+            to_set[f'historico.{season}'] = matches
+        to_set[f'seasons.{season}'] = new_meta
+
+    for season in stored_seasons:
+        if season not in historico:
+            changed.append(season)
+            to_unset[f'historico.{season}'] = ''
+            to_unset[f'seasons.{season}'] = ''
+
+    to_set['content_hash'] = content_hash
+    to_set['fetched_at'] = fetched_at
+    update = {'$set': to_set}
+    if to_push:
+        update['$push'] = to_push
+    if to_unset:
+        update['$unset'] = to_unset
+    return update, changed
+
+class ContractRepository:
+    # Platforms with a social_status.<platform>.posted flag (see SocialProvider.name)
+    SOCIAL_PLATFORMS = ('twitter', 'threads')
+
+    def __init__(self):
+        self.client = self._get_client()
+        if self.client:
+            self.db = self.client['cbf_data']
+            self.collection = self.db['contracts']
+            self.backfill_progress = self.db['backfill_progress']
+            # Last successful live search per club (_id = 'uf:club')
+            self.search_state = self.db['search_state']
+            # Monitored clubs ({'uf', 'codigo_clube', 'nome', 'enabled'}), overriding Config.WATCHLIST
+            self.watchlist = self.db['watchlist']
+            # One history document per athlete (_id = codigo_atleta), referenced by contracts
+            self.athletes = self.db['athletes']
+            # One publish job per (contract, platform), claimed under a lease
+            self.outbox = OutboxRepository(
+                self.db['outbox'],
+                lease_seconds=Config.OUTBOX_LEASE_SECONDS,
+                max_attempts=Config.OUTBOX_MAX_ATTEMPTS,
+                backoff_base=Config.OUTBOX_BACKOFF_SECONDS
+            )
+            self.ensure_indexes()
+        else:
+            self.db = None
+            self.collection = None
+            self.backfill_progress = None
+            self.search_state = None
+            self.watchlist = None
+            self.athletes = None
+            self.outbox = None
+
+    def _get_client(self):
+        try:
+            client = MongoClient(Config.MONGO_URI)
+            client.admin.command('ping')
+            print("Connected to MongoDB.")
+            return client
+        except Exception as e:
+            print(f"Error connecting to MongoDB: {e}")
+            return None
+
+    def ensure_indexes(self):
+        """
+        Creates the indexes the queries rely on (idempotent), each on its own
+        so one failure does not skip the rest.
+        The unique index on id_contrato keeps concurrent writers from inserting
+        duplicates; duplicates stored before it existed are merged first.
+        """
+        unique_key = [('id_contrato', ASCENDING)]
+        if not self._create_index(self.collection, unique_key, unique=True, sparse=True):
+            if self.dedupe_contracts():
+                self._create_index(self.collection, unique_key, unique=True, sparse=True)
+
+        self._create_index(self.collection, [('contrato_numero', ASCENDING)])
+        self._create_index(self.collection, [('codigo_atleta', ASCENDING), ('codigo_clube', ASCENDING)])
+        for platform_name in self.SOCIAL_PLATFORMS:
+            self._create_index(self.collection, [(f'social_status.{platform_name}.posted', ASCENDING)])
+        self._create_index(self.backfill_progress, [('job', ASCENDING), ('date', ASCENDING)])
+        self._create_index(self.athletes, [('fetched_at', ASCENDING)])
+        self.outbox.ensure_indexes()
+
+    @staticmethod
+    def _create_index(collection, keys, **options):
+        try:
+            collection.create_index(keys, **options)
+            return True
+        except Exception as e:
+            print(f"Error creating index {keys} on {collection.name}: {e}")
+            return False
+
+    def dedupe_contracts(self):
+        """
+        Merges contracts sharing an id_contrato (stored before the unique index
+        existed) into the oldest document. A platform counts as posted if any
+        copy was posted, and a stored post is kept. Returns the number of
+        documents removed.
+        """
+        try:
+            duplicates = list(self.collection.aggregate([
+                {'$match': {'id_contrato': {'$exists': True}}},
+                {'$group': {'_id': '$id_contrato', 'ids': {'$push': '$_id'}, 'count': {'$sum': 1}}},
+                {'$match': {'count': {'$gt': 1}}},
+            ], allowDiskUse=True))
+        except Exception as e:
+            print(f"Error looking for duplicate contracts: {e}")
+            return 0
+        if not duplicates:
+            return 0
+
+        print(f"Found {len(duplicates)} duplicated id_contrato value(s): {[d['_id'] for d in duplicates][:20]}. Merging...")
+        removed = 0
+        for duplicate in duplicates:
+            docs = sorted(self.collection.find({'_id': {'$in': duplicate['ids']}}), key=lambda d: d['_id'])
+            keeper, extras = docs[0], docs[1:]
+            update = {}
+            for doc in extras:
+                for platform_name, status in (doc.get('social_status') or {}).items():
+                    if status.get('posted') and not keeper.get('social_status', {}).get(platform_name, {}).get('posted'):
+                        update[f'social_status.{platform_name}'] = status
+                if doc.get('post') and not keeper.get('post'):
+                    update.setdefault('post', doc['post'])
+            if update:
+                self.collection.update_one({'_id': keeper['_id']}, {'$set': update})
+            extra_ids = [doc['_id'] for doc in extras]
+            self.collection.delete_many({'_id': {'$in': extra_ids}})
+            self.outbox.forget(extra_ids)
+            removed += len(extra_ids)
+        print(f"Removed {removed} duplicate contract(s).")
+        return removed
+
+    def seed_outbox(self):
+        """
+        Enqueues publish jobs for contracts stored before the outbox existed
+        (not posted yet and without a job). Called once at startup.
+        """
+        if self.collection is None:
+            return
+        try:
+            for platform_name in self.SOCIAL_PLATFORMS:
+                ids = [doc['_id'] for doc in self.collection.find(
+                    {f'social_status.{platform_name}.posted': {'$ne': True}}, {'_id': 1}
+                )]
+                created = self.outbox.enqueue(ids, [platform_name])
+                if created:
+                    print(f"[Outbox] Enqueued {created} existing contract(s) for {platform_name}.")
+        except Exception as e:
+            print(f"Error seeding outbox: {e}")
+
+    def save_contracts(self, contracts, source=None):
+        """
+        Saves a list of contracts to the database in one unordered bulk upsert.
+        New documents get first_seen_at (and `source`, e.g. 'backfill', when
+        given). Returns a list of inserted contracts (documents that were new).
+        """
+        if self.collection is None:
+            print("Database not connected. Skipping save.")
+            return []
+
+        items = []
+        operations = []
+        seen_ids = set()
+        on_insert = {'first_seen_at': datetime.now(timezone.utc)}
+        if source:
+            on_insert['source'] = source
+        for item in contracts:
+            if not isinstance(item, dict):
+                print(f"Skipping invalid item (not a dict): {item}")
+                continue
+
+            contract_id = item.get('id_contrato')
+            if not contract_id:
+                print(f"Skipping item without 'id_contrato': {item}")
+                continue
+            if contract_id in seen_ids:
+                continue
+            seen_ids.add(contract_id)
+
+            # Existing contracts are left untouched
+            items.append(item)
+            operations.append(UpdateOne({'id_contrato': contract_id}, {'$setOnInsert': {**on_insert, **item}}, upsert=True))
+
+        if not operations:
+            return []
+
+        try:
+            result = self.collection.bulk_write(operations, ordered=False)
+            upserted = result.upserted_ids
+        except BulkWriteError as e:
+            # Duplicate-key errors mean another writer inserted the same contract first;
+            # the remaining operations of an unordered batch still went through.
+            upserted = {u['index']: u['_id'] for u in e.details.get('upserted', [])}
+            other_errors = [err for err in e.details.get('writeErrors', []) if err.get('code') != 11000]
+            if other_errors:
+                print(f"Error saving contracts: {other_errors}")
+        except Exception as e:
+            print(f"Error saving contracts: {e}")
+            return []
+
+        saved_contracts = []
+        for index, _id in sorted(upserted.items()):
+            item = items[index]
+            item['_id'] = _id
+            saved_contracts.append(item)
+            print(f"Saved new contract: {item.get('nome')} ({item.get('id_contrato')})")
+
+        # Published once enriched (save_contract_with_history), or after the grace period without history
+        self.outbox.enqueue([c['_id'] for c in saved_contracts], self.SOCIAL_PLATFORMS,
+                            delay=Config.OUTBOX_ENRICH_GRACE_SECONDS)
+
+        print(f"Saved {len(saved_contracts)} new contract(s), {len(items) - len(saved_contracts)} already existed.")
+        return saved_contracts
+
+    def has_history_for_contract(self, contract_data):
+        """
+        Checks if the contract already exists in the DB and has history data.
+        """
+        if self.collection is None:
+            return False
+
+        query = {}
+        if 'contrato_numero' in contract_data:
+            query['contrato_numero'] = contract_data['contrato_numero']
+        elif 'id_contrato' in contract_data:
+            query['id_contrato'] = contract_data['id_contrato']
+        else:
+            if 'codigo_atleta' in contract_data and 'codigo_clube' in contract_data:
+                 query = {
+                     'codigo_atleta': contract_data['codigo_atleta'],
+                     'codigo_clube': contract_data['codigo_clube']
+                 }
+            else:
+                return False
+        
+        try:
+            # Linked to the athletes collection, or (legacy documents) embedded 'historico'
+            existing = self.collection.find_one(query, {'historico_ref': 1, 'historico': 1})
+            if existing and (existing.get('historico_ref') is not None or existing.get('historico')):
+                return True
+            return False
+        except Exception as e:
+            print(f"Error checking history existence: {e}")
+            return False
+
+    def contracts_needing_history(self, contracts):
+        """
+        Batch version of has_history_for_contract: returns the contracts (with a
+        'codigo_atleta') that have no stored history, using a single query.
+        """
+        candidates = [c for c in contracts if isinstance(c, dict) and c.get('codigo_atleta')]
+        if self.collection is None or not candidates:
+            return candidates
+
+        numeros = [c['contrato_numero'] for c in candidates if 'contrato_numero' in c]
+        ids = [c['id_contrato'] for c in candidates if 'contrato_numero' not in c and 'id_contrato' in c]
+        pairs = [
+            {'codigo_atleta': c['codigo_atleta'], 'codigo_clube': c['codigo_clube']}
+            for c in candidates
+            if 'contrato_numero' not in c and 'id_contrato' not in c and 'codigo_clube' in c
+        ]
+
+        clauses = []
+        if numeros:
+            clauses.append({'contrato_numero': {'$in': numeros}})
+        if ids:
+            clauses.append({'id_contrato': {'$in': ids}})
+        clauses.extend(pairs)
+
+        try:
+            enriched = list(self.collection.find(
+                {'$and': [
+                    {'$or': clauses},
+                    {'$or': [
+                        {'historico_ref': {'$exists': True}},
+                        {'historico': {'$exists': True, '$nin': [None, [], {}]}},
+                    ]},
+                ]},
+                {'contrato_numero': 1, 'id_contrato': 1, 'codigo_atleta': 1, 'codigo_clube': 1}
+            ))
+        except Exception as e:
+            print(f"Error checking history existence: {e}")
+            return candidates
+
+        enriched_numeros = {d.get('contrato_numero') for d in enriched if d.get('contrato_numero') is not None}
+        enriched_ids = {d.get('id_contrato') for d in enriched if d.get('id_contrato') is not None}
+        enriched_pairs = {(d.get('codigo_atleta'), d.get('codigo_clube')) for d in enriched}
+
+        def has_history(c):
+            # Same key precedence as has_history_for_contract
+            if 'contrato_numero' in c:
+                return c['contrato_numero'] in enriched_numeros
+            if 'id_contrato' in c:
+                return c['id_contrato'] in enriched_ids
+            return (c['codigo_atleta'], c.get('codigo_clube')) in enriched_pairs
+
+        return [c for c in candidates if not has_history(c)]
+
+    # --- Athlete history (one document per athlete) ---
+
+    @staticmethod
+    def _history_max_age(max_age_hours=None):
+        hours = Config.HISTORY_TTL_HOURS if max_age_hours is None else max_age_hours
+        return timedelta(hours=hours)
+
+    @staticmethod
+    def _as_utc(value):
+        # pymongo returns naive datetimes (UTC) unless the client is tz_aware
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+    def get_athlete_history(self, codigo_atleta, max_age_hours=None):
+        """
+        Returns the stored history for an athlete if it was fetched within the
+        staleness window (Config.HISTORY_TTL_HOURS), else None.
+        """
+        if self.athletes is None:
+            return None
+
+        try:
+            doc = self.athletes.find_one({'_id': codigo_atleta})
+        except Exception as e:
+            print(f"Error fetching athlete history: {e}")
+            return None
+
+        if not doc or not doc.get('historico'):
+            return None
+        fetched_at = self._as_utc(doc.get('fetched_at'))
+        if not fetched_at or datetime.now(timezone.utc) - fetched_at > self._history_max_age(max_age_hours):
+            return None
+        return doc['historico']
+
+    def fresh_history_codes(self, codigos, max_age_hours=None):
+        """
+        Returns the subset of athlete codes whose stored history is still fresh (one query).
+        """
+        if self.athletes is None or not codigos:
+            return set()
+
+        cutoff = datetime.now(timezone.utc) - self._history_max_age(max_age_hours)
+        try:
+            return {d['_id'] for d in self.athletes.find(
+                {'_id': {'$in': list(codigos)}, 'fetched_at': {'$gte': cutoff}}, {'_id': 1}
+            )}
+        except Exception as e:
+            print(f"Error checking athlete history freshness: {e}")
+            return set()
+
+    def save_athlete_history(self, codigo_atleta, historico):
+        """
+        Stores an athlete's history incrementally (see _history_update):
+        unchanged responses skip the history write, changed ones only touch
+        the seasons that changed. Returns the fetched_at timestamp, or None on error.
+        """
+        if self.athletes is None:
+            return None
+
+        fetched_at = datetime.now(timezone.utc)
+        try:
+            stored = self.athletes.find_one({'_id': codigo_atleta}, {'content_hash': 1, 'seasons': 1, 'scout.games': 1})
+            update, changed = _history_update(stored, historico, fetched_at)
+            if changed != [] or not (stored or {}).get('scout'):
+                # Precomputed aggregates, so readers never re-parse the history
+                update['$set']['scout'] = compute_scout(historico)
+            self.athletes.update_one({'_id': codigo_atleta}, update, upsert=True)
+            if changed is None:
+                print(f"Stored full history for athlete {codigo_atleta}.")
+            elif changed:
+                print(f"Updated history for athlete {codigo_atleta}: seasons {', '.join(changed)} changed.")
+            else:
+                print(f"History for athlete {codigo_atleta} unchanged.")
+            return fetched_at
+        except Exception as e:
+            print(f"Error saving athlete history: {e}")
+            return None
+
+    def recent_athlete_codes(self, days):
+        """
+        Athlete codes from contracts stored in the last `days` days (by ObjectId time).
+        """
+        if self.collection is None:
+            return []
+
+        since = ObjectId.from_datetime(datetime.now(timezone.utc) - timedelta(days=days))
+        try:
+            return [c for c in self.collection.distinct('codigo_atleta', {'_id': {'$gte': since}}) if c is not None]
+        except Exception as e:
+            print(f"Error fetching recent athletes: {e}")
+            return []
+
+    def first_seen_times(self, days):
+        """
+        When contracts stored in the last `days` days were first seen by the
+        monitor (first_seen_at, else ObjectId time). Contracts found by a
+        backfill or catch-up search (with a `source`) are left out: they were
+        found after their BID publication.
+        """
+        if self.collection is None:
+            return []
+
+        since = ObjectId.from_datetime(datetime.now(timezone.utc) - timedelta(days=days))
+        try:
+            cursor = self.collection.find(
+                {'_id': {'$gte': since}, 'source': {'$exists': False}},
+                {'first_seen_at': 1}
+            )
+            return [doc.get('first_seen_at') or doc['_id'].generation_time for doc in cursor]
+        except Exception as e:
+            print(f"Error fetching first-seen times: {e}")
+            return []
+
+    def attach_history(self, contracts):
+        """
+        Fills 'historico' and 'scout' on contract documents from the athletes
+        collection (one query for the whole list). Legacy embedded histories are kept.
+        """
+        refs = {c['historico_ref'] for c in contracts if c.get('historico_ref') is not None and not c.get('historico')}
+        if self.athletes is None or not refs:
+            return contracts
+
+        try:
+            athletes = {d['_id']: d for d in self.athletes.find({'_id': {'$in': list(refs)}}, {'historico': 1, 'scout': 1})}
+        except Exception as e:
+            print(f"Error attaching athlete history: {e}")
+            return contracts
+
+        for contract in contracts:
+            athlete = athletes.get(contract.get('historico_ref'))
+            if athlete and not contract.get('historico'):
+                contract['historico'] = athlete.get('historico')
+                if athlete.get('scout'):
+                    contract['scout'] = athlete['scout']
+        return contracts
+
+    def save_contract_with_history(self, contract_data, store_history=True):
+        """
+        Saves a single contract with its history.
+        Uses upsert to update if exists. The history itself goes to the
+        athletes collection; the contract only keeps a reference to it.
+        Pass store_history=False when the history came from that collection
+        (cache hit) so its fetched_at is not bumped.
+        """
+        if self.collection is None:
+            print("Database not connected. Skipping save.")
+            return False
+
+        if not isinstance(contract_data, dict):
+            print(f"Skipping invalid item (not a dict): {contract_data}")
+            return False
+
+        # Determine unique identifier
+        # User example has 'contrato_numero', existing code used 'id_contrato'
+        # we try to use a unique combination.
+        
+        query = {}
+        if 'contrato_numero' in contract_data:
+            query['contrato_numero'] = contract_data['contrato_numero']
+        elif 'id_contrato' in contract_data:
+            query['id_contrato'] = contract_data['id_contrato']
+        else:
+            # Fallback to athlete code + club? Might not be unique for contract but good enough?
+            # Or just skip
+            if 'codigo_atleta' in contract_data and 'codigo_clube' in contract_data:
+                 query = {
+                     'codigo_atleta': contract_data['codigo_atleta'],
+                     'codigo_clube': contract_data['codigo_clube']
+                 }
+            else:
+                print(f"Skipping item without ID fields: {contract_data}")
+                return False
+        
+        try:
+            contract_data = dict(contract_data)
+            historico = contract_data.pop('historico', None)
+            update_data = {}
+            codigo_atleta = contract_data.get('codigo_atleta')
+            if historico is not None and codigo_atleta is not None:
+                stored = self.save_athlete_history(codigo_atleta, historico) if store_history else True
+                if stored:
+                    contract_data['historico_ref'] = codigo_atleta
+                    # Drops the copy embedded by older versions
+                    update_data['$unset'] = {'historico': ''}
+                else:
+                    contract_data['historico'] = historico
+            elif historico is not None:
+                contract_data['historico'] = historico
+
+            # Check if it exists first to know if we are inserting
+            existing = self.collection.find_one(query, {'_id': 1, 'social_status': 1})
+            
+            # Prepare update data
+            update_data['$set'] = contract_data
+            
+            # If new, ensure tweeted is False (if not present)
+            if not existing:
+                update_data['$setOnInsert'] = {'first_seen_at': datetime.now(timezone.utc)}
+                if 'tweeted' not in contract_data:
+                     update_data['$setOnInsert']['tweeted'] = False
+                print(f"Inserted new contract/history for {contract_data.get('nome', 'Unknown')}")
+            else:
+                # If updating, we don't reset tweeted unless we want to re-tweet updates?
+                # Usually no.
+                print(f"Updated existing contract/history for {contract_data.get('nome', 'Unknown')}")
+
+            result = self.collection.update_one(
+                query,
+                update_data,
+                upsert=True
+            )
+
+            # Enriched: publishable now on every platform it was not posted to yet
+            contract_id = existing['_id'] if existing else result.upserted_id
+            if contract_id is not None:
+                social_status = (existing or {}).get('social_status') or {}
+                platforms = [p for p in self.SOCIAL_PLATFORMS if not social_status.get(p, {}).get('posted')]
+                self.outbox.enqueue([contract_id], platforms)
+            
+            return True
+        except Exception as e:
+            print(f"Error saving to MongoDB: {e}")
+            return False
+
+    def find_contract(self, contract_data):
+        """
+        Returns the stored document for a contract (with its '_id'), or None.
+        """
+        if self.collection is None:
+            return None
+
+        query = {}
+        if 'contrato_numero' in contract_data:
+            query['contrato_numero'] = contract_data['contrato_numero']
+        elif 'id_contrato' in contract_data:
+            query['id_contrato'] = contract_data['id_contrato']
+        elif 'codigo_atleta' in contract_data and 'codigo_clube' in contract_data:
+            query = {
+                'codigo_atleta': contract_data['codigo_atleta'],
+                'codigo_clube': contract_data['codigo_clube']
+            }
+        else:
+            return None
+
+        try:
+            contract = self.collection.find_one(query)
+            if contract:
+                self.attach_history([contract])
+            return contract
+        except Exception as e:
+            print(f"Error fetching contract: {e}")
+            return None
+
+    def get_pending_posts(self, platform_name: str, limit=10):
+        """
+        Retrieves contracts that have not been posted to the specified platform yet.
+        """
+        if self.collection is None:
+            return []
+            
+        try:
+            # check if social_status.{platform_name}.posted is not True
+            # We treat missing as not posted.
+            query = {
+                f'social_status.{platform_name}.posted': {'$ne': True}
+            }
+            # Sort by _id (timestamp) ascending to prioritize oldest (failed) items first
+            return self.attach_history(list(self.collection.find(query).sort('_id', 1).limit(limit)))
+        except Exception as e:
+            print(f"Error fetching pending posts for {platform_name}: {e}")
+            return []
+
+    def claim_pending_posts(self, platform_name: str, owner, limit=10):
+        """
+        Leases up to `limit` due outbox jobs of a platform to `owner` and returns
+        their contracts, each with its job under 'outbox_job'. Jobs whose
+        contract is gone or already posted are closed on the way.
+        """
+        if self.collection is None:
+            return []
+
+        contracts = []
+        while len(contracts) < limit:
+            job = self.outbox.claim(platform_name, owner)
+            if job is None:
+                break
+            contract = self._claimed_contract(job)
+            if contract is not None:
+                contracts.append(contract)
+        return contracts
+
+    def claim_post(self, contract_id, platform_name: str, owner):
+        """
+        Leases the outbox job of one contract. Returns the contract (with
+        'outbox_job') or None when the job is not due or held by someone else.
+        """
+        if self.collection is None:
+            return None
+        job = self.outbox.claim(platform_name, owner, contract_id=contract_id)
+        return self._claimed_contract(job) if job else None
+
+    def _claimed_contract(self, job):
+        try:
+            contract = self.collection.find_one({'_id': job['contract_id']})
+        except Exception as e:
+            print(f"Error fetching contract for outbox job {job['_id']}: {e}")
+            self.outbox.release(job)
+            return None
+
+        platform_name = job['platform']
+        if contract is None or contract.get('social_status', {}).get(platform_name, {}).get('posted'):
+            self.outbox.complete(job['contract_id'], platform_name)
+            return None
+        contract['outbox_job'] = job
+        self.attach_history([contract])
+        return contract
+
+    def retry_post_later(self, contract, error=None):
+        """
+        Returns a claimed contract's job to the outbox after a failed attempt (with backoff).
+        """
+        job = contract.get('outbox_job')
+        return self.outbox.retry_later(job, error) if job and self.outbox else False
+
+    def release_post(self, contract):
+        """
+        Returns a claimed contract's job to the outbox untried.
+        """
+        job = contract.get('outbox_job')
+        return self.outbox.release(job) if job and self.outbox else False
+
+    def save_post(self, contract_id, post):
+        """
+        Stores the generated post (text, prompt_version, model) on the contract,
+        unless another worker stored one first. Returns the stored post.
+        """
+        if self.collection is None:
+            return post
+
+        try:
+            result = self.collection.update_one(
+                {'_id': contract_id, 'post': {'$exists': False}},
+                {'$set': {'post': post}}
+            )
+            if result.modified_count:
+                return post
+            existing = self.collection.find_one({'_id': contract_id}, {'post': 1})
+            return (existing or {}).get('post') or post
+        except Exception as e:
+            print(f"Error saving generated post: {e}")
+            return post
+
+    def mark_as_posted(self, contract_id, platform_name: str, post_id=None):
+        """
+        Marks a contract as posted on a specific platform.
+        """
+        if self.collection is None:
+            return False
+            
+        try:
+            self.collection.update_one(
+                {'_id': contract_id},
+                {
+                    '$set': {
+                        f'social_status.{platform_name}.posted': True,
+                        f'social_status.{platform_name}.post_id': post_id,
+                        f'social_status.{platform_name}.posted_at': Config.SEARCH_DATE # or current time
+                    }
+                }
+            )
+            self.outbox.complete(contract_id, platform_name, post_id)
+            return True
+        except Exception as e:
+            print(f"Error marking as posted on {platform_name}: {e}")
+            return False
+
+    def get_backfill_progress(self, job_id):
+        """
+        Returns {date_str: progress_doc} for a backfill job (one job per club/UF).
+        """
+        if self.backfill_progress is None:
+            return {}
+
+        try:
+            return {doc['date']: doc for doc in self.backfill_progress.find({'job': job_id})}
+        except Exception as e:
+            print(f"Error fetching backfill progress for {job_id}: {e}")
+            return {}
+
+    def update_backfill_progress(self, job_id, date_str, status, **fields):
+        """
+        Records the state of one backfill date ('done' or 'failed') plus any extra fields.
+        """
+        if self.backfill_progress is None:
+            return False
+
+        try:
+            self.backfill_progress.update_one(
+                {'_id': f'{job_id}:{date_str}'},
+                {'$set': {
+                    'job': job_id,
+                    'date': date_str,
+                    'status': status,
+                    'updated_at': datetime.now(timezone.utc),
+                    **fields
+                }},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            print(f"Error saving backfill progress for {date_str}: {e}")
+            return False
+
+    def get_search_state(self, job_id):
+        """
+        Returns {'last_searched_date', 'last_searched_at'} of a club's live search, or None.
+        """
+        if self.search_state is None:
+            return None
+
+        try:
+            return self.search_state.find_one({'_id': job_id})
+        except Exception as e:
+            print(f"Error fetching search state for {job_id}: {e}")
+            return None
+
+    def record_search(self, job_id, date_str):
+        """
+        Records a successful live search of `date_str` (dd/mm/YYYY) for a club.
+        """
+        if self.search_state is None:
+            return False
+
+        try:
+            self.search_state.update_one(
+                {'_id': job_id},
+                {'$set': {'last_searched_date': date_str, 'last_searched_at': datetime.now(timezone.utc)}},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            print(f"Error saving search state for {job_id}: {e}")
+            return False
+
+    def get_watchlist(self):
+        """
+        Enabled watchlist targets [{'uf', 'codigo_clube', 'nome'}], or [] when the collection is empty.
+        """
+        if self.watchlist is None:
+            return []
+
+        try:
+            return [
+                {'uf': str(doc['uf']).upper(), 'codigo_clube': str(doc['codigo_clube']), 'nome': doc.get('nome')}
+                for doc in self.watchlist.find({'enabled': {'$ne': False}})
+                if doc.get('uf') and doc.get('codigo_clube')
+            ]
+        except Exception as e:
+            print(f"Error fetching watchlist: {e}")
+            return []
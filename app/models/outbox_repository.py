@@ -0,0 +1,232 @@
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+
+# Job states: pending -> in_progress (leased) -> done, or back to pending with a
+# later next_attempt_at; 'failed' once max_attempts is exhausted.
+PENDING = 'pending'
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+FAILED = 'failed'
+
+def default_owner():
+    """
+    Lease owner id of this process: 'host:pid:random'.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+def job_id(contract_id, platform_name):
+    return f"{contract_id}:{platform_name}"
+
+class OutboxRepository:
+    """
+    Durable publish queue: one job per (contract, platform).
+
+    Publishers claim due jobs atomically (find_one_and_update) and hold them
+    under a lease, so several processes can publish from the same database
+    without posting a contract twice. A job whose lease expired (its owner
+    crashed) can be claimed again. Failures are rescheduled with exponential
+    backoff.
+    """
+
+    def __init__(self, collection, lease_seconds=1800, max_attempts=8, backoff_base=300, backoff_max=6 * 3600,
+                 done_ttl_seconds=30 * 86400):
+        self.collection = collection
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.done_ttl_seconds = done_ttl_seconds
+
+    @staticmethod
+    def _now():
+        return datetime.now(timezone.utc)
+
+    def ensure_indexes(self):
+        try:
+            self.collection.create_index([('platform', ASCENDING), ('state', ASCENDING), ('next_attempt_at', ASCENDING)])
+            self.collection.create_index([('contract_id', ASCENDING)])
+            self.collection.create_index([('state', ASCENDING), ('next_attempt_at', ASCENDING)])
+            self.collection.create_index([('state', ASCENDING), ('lease_until', ASCENDING)])
+            # Finished jobs are dropped after a while (the contract keeps social_status)
+            self.collection.create_index([('completed_at', ASCENDING)], expireAfterSeconds=self.done_ttl_seconds)
+        except Exception as e:
+            print(f"[Outbox] Error creating indexes: {e}")
+
+    def enqueue(self, contract_ids, platforms, delay=0):
+        """
+        Creates a pending job per (contract, platform) that does not have one yet.
+        Re-enqueueing an existing job only brings its next_attempt_at forward
+        to now + delay (it never resets state or attempts).
+        """
+        now = self._now()
+        ready_at = now + timedelta(seconds=delay)
+        operations = []
+        for contract_id in contract_ids:
+            for platform_name in platforms:
+                operations.append(UpdateOne(
+                    {'_id': job_id(contract_id, platform_name)},
+                    {
+                        '$setOnInsert': {
+                            'contract_id': contract_id,
+                            'platform': platform_name,
+                            'state': PENDING,
+                            'attempts': 0,
+                            'lease_owner': None,
+                            'lease_until': None,
+                            'created_at': now,
+                        },
+                        '$min': {'next_attempt_at': ready_at},
+                    },
+                    upsert=True
+                ))
+        if not operations:
+            return 0
+
+        try:
+            result = self.collection.bulk_write(operations, ordered=False)
+            return len(result.upserted_ids)
+        except Exception as e:
+            print(f"[Outbox] Error enqueueing jobs: {e}")
+            return 0
+
+    def claim(self, platform_name, owner, contract_id=None):
+        """
+        Atomically leases the oldest due job of a platform (or the job of one
+        contract) to `owner`. Returns the job document, or None.
+        """
+        now = self._now()
+        query = {
+            'platform': platform_name,
+            'next_attempt_at': {'$lte': now},
+            '$or': [
+                {'state': PENDING},
+                {'state': IN_PROGRESS, 'lease_until': {'$lt': now}},
+            ],
+        }
+        if contract_id is not None:
+            query['_id'] = job_id(contract_id, platform_name)
+
+        try:
+            return self.collection.find_one_and_update(
+                query,
+                {
+                    '$set': {
+                        'state': IN_PROGRESS,
+                        'lease_owner': owner,
+                        'lease_until': now + timedelta(seconds=self.lease_seconds),
+                        'claimed_at': now,
+                    },
+                    '$inc': {'attempts': 1},
+                },
+                sort=[('next_attempt_at', ASCENDING)],
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            print(f"[Outbox] Error claiming job for {platform_name}: {e}")
+            return None
+
+    def complete(self, contract_id, platform_name, post_id=None):
+        """
+        Marks a job done (whoever holds it: the post went out).
+        """
+        now = self._now()
+        try:
+            self.collection.update_one(
+                {'_id': job_id(contract_id, platform_name)},
+                {'$set': {
+                    'state': DONE,
+                    'post_id': post_id,
+                    'completed_at': now,
+                    'lease_owner': None,
+                    'lease_until': None,
+                }}
+            )
+            return True
+        except Exception as e:
+            print(f"[Outbox] Error completing job: {e}")
+            return False
+
+    def retry_later(self, job, error=None):
+        """
+        Gives up the lease after a failed attempt and reschedules the job with
+        exponential backoff (or marks it failed once max_attempts is reached).
+        """
+        attempts = job.get('attempts', 1)
+        now = self._now()
+        delay = min(self.backoff_base * 2 ** max(attempts - 1, 0), self.backoff_max)
+        state = FAILED if attempts >= self.max_attempts else PENDING
+        return self._update_leased(job, {
+            'state': state,
+            'next_attempt_at': now + timedelta(seconds=delay),
+            'last_error': error,
+            'lease_owner': None,
+            'lease_until': None,
+        })
+
+    def release(self, job, delay=None):
+        """
+        Gives up the lease without counting an attempt (the job was never
+        tried). It becomes due again after `delay` seconds (default backoff_base).
+        """
+        delay = self.backoff_base if delay is None else delay
+        return self._update_leased(job, {
+            'state': PENDING,
+            'next_attempt_at': self._now() + timedelta(seconds=delay),
+            'lease_owner': None,
+            'lease_until': None,
+        }, inc={'attempts': -1})
+
+    def forget(self, contract_ids):
+        """
+        Drops every job of the given contracts (e.g. merged duplicates).
+        """
+        try:
+            self.collection.delete_many({'contract_id': {'$in': list(contract_ids)}})
+        except Exception as e:
+            print(f"[Outbox] Error dropping jobs: {e}")
+
+    def next_due_at(self):
+        """
+        When the next job becomes claimable (a pending job's next_attempt_at
+        or an in-progress job's lease expiry), or None without open jobs.
+        """
+        candidates = []
+        try:
+            for state, field in ((PENDING, 'next_attempt_at'), (IN_PROGRESS, 'lease_until')):
+                doc = self.collection.find_one({'state': state}, {field: 1}, sort=[(field, ASCENDING)])
+                if doc and doc.get(field):
+                    candidates.append(doc[field])
+        except Exception as e:
+            print(f"[Outbox] Error reading next due job: {e}")
+            return None
+        return min(candidates) if candidates else None
+
+    def _update_leased(self, job, fields, inc=None):
+        # Only the current lease holder may update the job
+        update = {'$set': fields}
+        if inc:
+            update['$inc'] = inc
+        try:
+            result = self.collection.update_one(
+                {'_id': job['_id'], 'state': IN_PROGRESS, 'lease_owner': job.get('lease_owner')},
+                update
+            )
+            return bool(result.modified_count)
+        except Exception as e:
+            print(f"[Outbox] Error updating job {job['_id']}: {e}")
+            return False
+
+    def counts(self):
+        """
+        {state: number of jobs}, for logging.
+        """
+        try:
+            return {doc['_id']: doc['count'] for doc in self.collection.aggregate([
+                {'$group': {'_id': '$state', 'count': {'$sum': 1}}}
+            ])}
+        except Exception as e:
+            print(f"[Outbox] Error counting jobs: {e}")
+            return {}
@@ -0,0 +1,25 @@
+import asyncio
+
+
+class AsyncContractRepository:
+    """
+    Async facade over ContractRepository (pymongo is blocking).
+    """
+
+    def __init__(self, repository):
+        self.repository = repository
+
+    async def contracts_needing_history(self, contracts):
+        return await asyncio.to_thread(self.repository.contracts_needing_history, contracts)
+
+    async def find_contract(self, contract_data):
+        return await asyncio.to_thread(self.repository.find_contract, contract_data)
+
+    async def claim_pending_posts(self, platform_name, owner, limit=10):
+        return await asyncio.to_thread(self.repository.claim_pending_posts, platform_name, owner, limit)
+
+    async def claim_post(self, contract_id, platform_name, owner):
+        return await asyncio.to_thread(self.repository.claim_post, contract_id, platform_name, owner)
+
+    async def retry_post_later(self, contract, error=None):
+        return await asyncio.to_thread(self.repository.retry_post_later, contract, error)
@@ -0,0 +1,77 @@
+import time
+import numpy as np
+
+
+class CaptchaBenchmark:
+    """
+    Replays the labelled captcha corpus against solver backends and reports
+    accuracy, latency percentiles and expected attempts per successful request.
+    """
+
+    def __init__(self, corpus, limit=None):
+        self.corpus = corpus
+        self.limit = limit
+
+    def _samples(self):
+        samples = []
+        for sample in self.corpus.labelled():
+            samples.append(sample)
+            if self.limit and len(samples) >= self.limit:
+                break
+        return samples
+
+    def run_backend(self, name, solve, samples):
+        """
+        `solve` receives raw image bytes and returns the captcha text.
+        """
+        latencies = []
+        correct = 0
+        errors = 0
+        for image_bytes, label in samples:
+            started_at = time.perf_counter()
+            try:
+                answer = solve(image_bytes)
+            except Exception as e:
+                print(f"[CaptchaBenchmark] {name} failed: {e}")
+                answer = None
+                errors += 1
+            latencies.append((time.perf_counter() - started_at) * 1000)
+            if answer == label:
+                correct += 1
+
+        total = len(samples)
+        accuracy = correct / total if total else 0.0
+        return {
+            'backend': name,
+            'samples': total,
+            'accuracy': accuracy,
+            'errors': errors,
+            'p50_ms': float(np.percentile(latencies, 50)) if latencies else 0.0,
+            'p95_ms': float(np.percentile(latencies, 95)) if latencies else 0.0,
+            # Attempts are independent captchas, so the count is geometric
+            'expected_attempts': 1 / accuracy if accuracy else float('inf'),
+        }
+
+    def run(self, backends):
+        """
+        `backends` maps a backend name to its solve callable.
+        Returns the list of per-backend reports.
+        """
+        samples = self._samples()
+        print(f"[CaptchaBenchmark] Replaying {len(samples)} labelled captchas against {len(backends)} backends...")
+        reports = []
+        for name, solve in backends.items():
+            reports.append(self.run_backend(name, solve, samples))
+        return reports
+
+    @staticmethod
+    def format_report(reports):
+        lines = [f"{'backend':<32} {'n':>5} {'acc':>7} {'p50 ms':>9} {'p95 ms':>9} {'attempts':>9}"]
+        # Fastest expected time to an accepted captcha first
+        ranked = sorted(reports, key=lambda r: (r['accuracy'] == 0, r['p50_ms'] * r['expected_attempts'] if r['accuracy'] else 0))
+        for r in ranked:
+            lines.append(
+                f"{r['backend']:<32} {r['samples']:>5} {r['accuracy']:>7.1%} "
+                f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['expected_attempts']:>9.2f}"
+            )
+        return '\n'.join(lines)
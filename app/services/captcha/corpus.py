@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class CaptchaCorpus:
+    """
+    Append-only, on-disk dataset of captcha attempts.
+
+    Layout:
+        <directory>/index.jsonl        one JSON line per attempt
+        <directory>/images/<sha1>.png  raw captcha image (deduplicated by hash)
+
+    Each line holds: ts, image, answer, model, latency_ms, accepted.
+    Accepted attempts double as labelled training/benchmark samples.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.index_path = os.path.join(directory, 'index.jsonl')
+        self.images_dir = os.path.join(directory, 'images')
+        self._lock = threading.Lock()
+
+    def record(self, image_bytes, answer, model, latency_ms, accepted):
+        image_name = hashlib.sha1(image_bytes).hexdigest() + '.png'
+        entry = {
+            'ts': round(time.time(), 3),
+            'image': image_name,
+            'answer': answer,
+            'model': model,
+            'latency_ms': round(latency_ms, 1),
+            'accepted': bool(accepted),
+        }
+        try:
+            with self._lock:
+                os.makedirs(self.images_dir, exist_ok=True)
+                image_path = os.path.join(self.images_dir, image_name)
+                if not os.path.exists(image_path):
+                    with open(image_path, 'wb') as f:
+                        f.write(image_bytes)
+                with open(self.index_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        except OSError as e:
+            print(f"[CaptchaCorpus] Error recording captcha attempt: {e}")
+
+    def entries(self):
+        """
+        Yields every recorded attempt (dicts as written by record()).
+        """
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def load_image(self, entry):
+        with open(os.path.join(self.images_dir, entry['image']), 'rb') as f:
+            return f.read()
+
+    def labelled(self):
+        """
+        Yields (image_bytes, label) for attempts CBF accepted, one per image.
+        """
+        seen = set()
+        for entry in self.entries():
+            if not entry.get('accepted') or entry['image'] in seen:
+                continue
+            seen.add(entry['image'])
+            try:
+                yield self.load_image(entry), entry['answer']
+            except OSError:
+                continue
+
+    def stats_by_model(self):
+        """
+        Returns {model: {'attempts': n, 'accepted': k}} from the recorded history.
+        """
+        stats = {}
+        for entry in self.entries():
+            model_stats = stats.setdefault(entry.get('model'), {'attempts': 0, 'accepted': 0})
+            model_stats['attempts'] += 1
+            if entry.get('accepted'):
+                model_stats['accepted'] += 1
+        return stats
@@ -0,0 +1,31 @@
+import os
+import time
+
+
+class CaptchaDebugDump:
+    """
+    Opt-in dump of raw/processed captcha images for debugging.
+    The directory works as a ring buffer: once more than `max_files` images
+    exist, the oldest ones are deleted.
+    """
+
+    def __init__(self, directory, max_files=50):
+        self.directory = directory
+        self.max_files = max_files
+
+    def save(self, raw_bytes, processed_bytes):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = str(time.time_ns())
+            with open(os.path.join(self.directory, f"captcha_{stamp}_raw.png"), 'wb') as f:
+                f.write(raw_bytes)
+            with open(os.path.join(self.directory, f"captcha_{stamp}_processed.png"), 'wb') as f:
+                f.write(processed_bytes)
+            self._prune()
+        except OSError as e:
+            print(f"[CaptchaDebugDump] Error saving debug images: {e}")
+
+    def _prune(self):
+        files = sorted(f for f in os.listdir(self.directory) if f.startswith('captcha_'))
+        for filename in files[:max(0, len(files) - self.max_files)]:
+            os.remove(os.path.join(self.directory, filename))
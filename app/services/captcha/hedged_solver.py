@@ -0,0 +1,113 @@
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class HedgedCaptchaSolver:
+    """
+    Sends the same captcha to several models at once and votes per character.
+
+    Each model's vote is weighted by the log-odds of its past accuracy, so a
+    model that is usually right outweighs two that are usually wrong. Solving
+    returns as soon as every position has a leader that the models still in
+    flight can no longer overturn, or that already reached the quorum.
+    """
+
+    MIN_WEIGHT = 0.1
+
+    def __init__(self, solve_with_model, models, max_in_flight=3, quorum=2.0, captcha_length=4):
+        """
+        `solve_with_model(model, image_bytes)` must return the cleaned captcha text.
+        `quorum` is the vote weight a character needs to be accepted early.
+        """
+        self.solve_with_model = solve_with_model
+        self.models = list(models)
+        self.quorum = quorum
+        self.captcha_length = captcha_length
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='hedged-captcha')
+        self._stats = {}  # model -> [attempts, correct]
+        self._stats_lock = threading.Lock()
+
+    # --- Weights ---
+
+    def seed_stats(self, stats_by_model):
+        """
+        Seeds accuracy stats from the captcha corpus ({model: {'attempts', 'accepted'}}).
+        """
+        with self._stats_lock:
+            for model, stats in stats_by_model.items():
+                if model in self.models:
+                    self._stats[model] = [stats['attempts'], stats['accepted']]
+
+    def record_outcome(self, model, correct):
+        with self._stats_lock:
+            stats = self._stats.setdefault(model, [0, 0])
+            stats[0] += 1
+            if correct:
+                stats[1] += 1
+
+    def weight(self, model):
+        with self._stats_lock:
+            attempts, correct = self._stats.get(model, (0, 0))
+        # Laplace-smoothed accuracy; an unknown model starts at 2/3 (weight ~0.69)
+        p = (correct + 2) / (attempts + 3)
+        return max(self.MIN_WEIGHT, math.log(p / (1 - p)))
+
+    # --- Solving ---
+
+    def _is_decided(self, votes, remaining_weight):
+        for position in votes:
+            ranked = sorted(position.values(), reverse=True)
+            if not ranked:
+                return False
+            leader = ranked[0]
+            runner_up = ranked[1] if len(ranked) > 1 else 0.0
+            if leader < self.quorum and leader - runner_up <= remaining_weight:
+                return False
+        return True
+
+    def solve(self, image_bytes, models=None):
+        """
+        Solves a preprocessed captcha image with `models` (default: all).
+        Returns (text, answers) where `answers` maps each model that replied
+        to its own answer. `text` is empty if no model produced a usable answer.
+        """
+        models = self.models if models is None else models
+        weights = {model: self.weight(model) for model in models}
+        futures = {self.executor.submit(self.solve_with_model, model, image_bytes): model for model in models}
+
+        votes = [{} for _ in range(self.captcha_length)]
+        answers = {}
+        remaining_weight = sum(weights.values())
+
+        try:
+            for future in as_completed(futures):
+                model = futures[future]
+                remaining_weight -= weights[model]
+                try:
+                    answer = future.result()
+                except Exception as e:
+                    print(f"[HedgedCaptchaSolver] Model {model} failed: {e}")
+                    continue
+
+                if len(answer) != self.captcha_length:
+                    print(f"[HedgedCaptchaSolver] Model {model} returned unusable answer '{answer}'.")
+                    continue
+
+                answers[model] = answer
+                for position, char in zip(votes, answer):
+                    position[char] = position.get(char, 0.0) + weights[model]
+
+                if self._is_decided(votes, remaining_weight):
+                    break
+        finally:
+            # Drop calls that have not started yet; running ones finish in the background
+            for future in futures:
+                future.cancel()
+
+        if not answers:
+            return '', answers
+
+        text = ''.join(max(position, key=position.get) for position in votes)
+        print(f"[HedgedCaptchaSolver] Consensus '{text}' from {len(answers)}/{len(models)} models: {answers}")
+        return text, answers
@@ -0,0 +1,183 @@
+import io
+import os
+import numpy as np
+from PIL import Image
+
+
+class LocalCaptchaSolver:
+    """
+    Offline captcha solver: segments the thresholded captcha into glyphs and
+    classifies each glyph against labelled exemplars (nearest neighbour on
+    normalized bitmaps). Trained from images already produced by
+    GeminiService._preprocess_image, so it runs in a few milliseconds on CPU.
+    """
+
+    GLYPH_SIZE = (20, 24)  # width, height of the normalized glyph bitmap
+    CAPTCHA_LENGTH = 4
+    MAX_EXEMPLARS_PER_LABEL = 40
+    SOFTMAX_TEMPERATURE = 0.03
+    MIN_GLYPH_PIXELS = 8
+
+    def __init__(self, labels=None, vectors=None):
+        self.labels = np.asarray(labels if labels is not None else [], dtype='<U1')
+        size = self.GLYPH_SIZE[0] * self.GLYPH_SIZE[1]
+        self.vectors = np.asarray(vectors, dtype=np.float32) if vectors is not None else np.zeros((0, size), dtype=np.float32)
+
+    # --- Persistence ---
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a trained solver. Returns None if the model file does not exist.
+        """
+        if not path or not os.path.exists(path):
+            return None
+        data = np.load(path)
+        solver = cls(labels=data['labels'], vectors=data['vectors'])
+        print(f"[LocalCaptchaSolver] Loaded {len(solver.labels)} exemplars from {path}.")
+        return solver
+
+    def save(self, path):
+        np.savez_compressed(path, labels=self.labels, vectors=self.vectors)
+        print(f"[LocalCaptchaSolver] Saved {len(self.labels)} exemplars to {path}.")
+
+    @property
+    def is_trained(self):
+        return len(self.labels) > 0
+
+    # --- Segmentation ---
+
+    def _to_binary(self, image_bytes):
+        img = Image.open(io.BytesIO(image_bytes)).convert("L")
+        return np.asarray(img) < 128  # True where there is ink
+
+    def _split_runs(self, ink):
+        """
+        Splits the image into glyph column ranges using the vertical projection.
+        Merges/splits runs until we get CAPTCHA_LENGTH glyphs.
+        """
+        columns = ink.sum(axis=0) > 0
+        if not columns.any():
+            return []
+
+        # Find [start, end) runs of inked columns
+        padded = np.concatenate(([False], columns, [False]))
+        edges = np.flatnonzero(padded[1:] != padded[:-1])
+        runs = [[int(s), int(e)] for s, e in zip(edges[::2], edges[1::2])]
+
+        # Drop specks that survived thresholding
+        runs = [r for r in runs if ink[:, r[0]:r[1]].sum() >= self.MIN_GLYPH_PIXELS] or runs
+
+        # Too many runs: merge across the smallest gap
+        while len(runs) > self.CAPTCHA_LENGTH:
+            gaps = [runs[i + 1][0] - runs[i][1] for i in range(len(runs) - 1)]
+            i = int(np.argmin(gaps))
+            runs[i] = [runs[i][0], runs[i + 1][1]]
+            del runs[i + 1]
+
+        # Too few runs: split the widest run at its weakest column
+        while len(runs) < self.CAPTCHA_LENGTH:
+            widths = [r[1] - r[0] for r in runs]
+            i = int(np.argmax(widths))
+            start, end = runs[i]
+            if end - start < 4:
+                break
+            profile = ink[:, start:end].sum(axis=0)
+            margin = max(1, (end - start) // 4)
+            cut = start + margin + int(np.argmin(profile[margin:-margin]))
+            runs[i:i + 1] = [[start, cut], [cut, end]]
+
+        return runs
+
+    def _normalize(self, glyph):
+        rows = np.flatnonzero(glyph.any(axis=1))
+        cols = np.flatnonzero(glyph.any(axis=0))
+        if len(rows) == 0 or len(cols) == 0:
+            return None
+        glyph = glyph[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+        img = Image.fromarray((glyph * 255).astype(np.uint8)).resize(self.GLYPH_SIZE, Image.BILINEAR)
+        vector = np.asarray(img, dtype=np.float32).ravel() / 255.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def segment(self, image_bytes):
+        """
+        Returns a list of normalized glyph vectors (one per character).
+        """
+        ink = self._to_binary(image_bytes)
+        glyphs = []
+        for start, end in self._split_runs(ink):
+            vector = self._normalize(ink[:, start:end])
+            if vector is not None:
+                glyphs.append(vector)
+        return glyphs
+
+    # --- Training ---
+
+    def fit(self, samples):
+        """
+        Trains from (image_bytes, label) pairs. Samples whose segmentation does
+        not match the label length are skipped.
+        Returns the number of samples used.
+        """
+        labels = list(self.labels)
+        vectors = list(self.vectors)
+        counts = {}
+        for label in labels:
+            counts[label] = counts.get(label, 0) + 1
+
+        used = 0
+        for image_bytes, label in samples:
+            label = (label or '').upper()
+            if len(label) != self.CAPTCHA_LENGTH:
+                continue
+            glyphs = self.segment(image_bytes)
+            if len(glyphs) != len(label):
+                continue
+            for char, vector in zip(label, glyphs):
+                if counts.get(char, 0) >= self.MAX_EXEMPLARS_PER_LABEL:
+                    continue
+                labels.append(char)
+                vectors.append(vector)
+                counts[char] = counts.get(char, 0) + 1
+            used += 1
+
+        self.labels = np.asarray(labels, dtype='<U1')
+        if vectors:
+            self.vectors = np.vstack(vectors).astype(np.float32)
+        return used
+
+    # --- Inference ---
+
+    def _classify(self, glyphs):
+        """
+        Returns (chars, probabilities) for a stack of glyph vectors.
+        """
+        similarities = np.stack(glyphs) @ self.vectors.T  # (n_glyphs, n_exemplars)
+        classes = np.unique(self.labels)
+        # Best similarity per class for every glyph
+        per_class = np.stack([similarities[:, self.labels == c].max(axis=1) for c in classes], axis=1)
+        logits = (per_class - per_class.max(axis=1, keepdims=True)) / self.SOFTMAX_TEMPERATURE
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        best = probs.argmax(axis=1)
+        return ''.join(classes[best]), probs[np.arange(len(best)), best]
+
+    def solve(self, image_bytes):
+        """
+        Solves a preprocessed captcha image.
+        Returns (text, confidence) where confidence is in [0, 1].
+        """
+        if not self.is_trained:
+            return '', 0.0
+        try:
+            glyphs = self.segment(image_bytes)
+        except Exception as e:
+            print(f"[LocalCaptchaSolver] Error segmenting captcha: {e}")
+            return '', 0.0
+
+        if len(glyphs) != self.CAPTCHA_LENGTH:
+            return '', 0.0
+
+        text, probs = self._classify(glyphs)
+        return text, float(np.prod(probs))
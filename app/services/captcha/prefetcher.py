@@ -0,0 +1,144 @@
+import threading
+import time
+
+
+class CaptchaPrefetcher:
+    """
+    Keeps a small bounded buffer of fetched-and-solved captchas so the next CBF
+    request does not wait for captcha download + solving.
+
+    CBF keeps one valid captcha per session, so every buffered captcha holds
+    the pooled CBF session that fetched it; the buffer can never outgrow the
+    session pool. A new captcha is fetched as soon as a session is released,
+    i.e. right after the previous CBF request returns, and overlaps with
+    whatever the caller does next. Captchas older than `max_age` seconds are
+    discarded (their session goes back to the pool) and fetched again.
+    """
+
+    def __init__(self, cbf_service, gemini_service, size=None, max_age=120):
+        # Captcha fetches go through CBFService, which charges the shared 'cbf' rate bucket
+        self.cbf_service = cbf_service
+        self.gemini_service = gemini_service
+        self.size = size or cbf_service.max_concurrency
+        self.max_age = max_age
+
+        self._buffer = []  # [(captcha_text, session, fetched_at)]
+        self._demand = 0
+        self._running = False
+        self._cond = threading.Condition()
+        self._workers = []
+
+    def start(self, expected):
+        """
+        Starts prefetching for `expected` upcoming CBF requests.
+        """
+        with self._cond:
+            self._demand = expected
+            if self._running:
+                self._cond.notify_all()
+                return
+            self._running = True
+        self._workers = [
+            threading.Thread(target=self._run, name=f'captcha-prefetcher-{i}', daemon=True)
+            for i in range(self.size)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def stop(self):
+        """
+        Stops the workers and drops any buffered captchas.
+        """
+        with self._cond:
+            self._running = False
+            self._demand = 0
+            dropped = self._buffer
+            self._buffer = []
+            self._cond.notify_all()
+        for _, session, _ in dropped:
+            self.cbf_service.release_session(session)
+        for worker in self._workers:
+            worker.join(timeout=5)
+        self._workers = []
+        if dropped:
+            print(f"[CaptchaPrefetcher] Stopped. Dropped {len(dropped)} unused captcha(s).")
+
+    def _checkout(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return None
+            session = self.cbf_service.checkout_session(timeout=1)
+            if session:
+                return session
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and self._demand <= 0:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                self._demand -= 1
+
+            session = self._checkout()
+            if session is None:
+                return
+
+            captcha_text = None
+            try:
+                b64 = self.cbf_service.get_captcha_base64(session=session)
+                if b64:
+                    captcha_text = self.gemini_service.solve_captcha(b64)
+            except Exception as e:
+                print(f"[CaptchaPrefetcher] Error prefetching captcha: {e}")
+
+            with self._cond:
+                if captcha_text and self._running:
+                    self._buffer.append((captcha_text, session, time.time()))
+                    session = None
+                elif self._running:
+                    self._demand += 1  # try again
+                self._cond.notify_all()
+
+            if session is not None:
+                self.cbf_service.release_session(session)
+                if not captcha_text:
+                    time.sleep(1)
+
+    def _drop_stale(self):
+        now = time.time()
+        stale = [entry for entry in self._buffer if now - entry[2] > self.max_age]
+        if not stale:
+            return
+        print(f"[CaptchaPrefetcher] Discarding {len(stale)} stale captcha(s).")
+        self._buffer = [entry for entry in self._buffer if now - entry[2] <= self.max_age]
+        for _, session, _ in stale:
+            self.cbf_service.release_session(session)
+        self._demand += len(stale)
+        self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """
+        Returns (captcha_text, session) for a fresh, solved captcha. The CBF
+        request must be sent through `session`, which the caller then returns
+        with cbf_service.release_session().
+        Returns (None, None) on timeout or if the prefetcher is stopped.
+        """
+        deadline = time.time() + timeout if timeout else None
+        with self._cond:
+            # Ask for one more if nothing is buffered or coming
+            if not self._buffer and self._demand <= 0:
+                self._demand = 1
+                self._cond.notify_all()
+            while True:
+                self._drop_stale()
+                if self._buffer:
+                    captcha_text, session, _ = self._buffer.pop(0)
+                    return captcha_text, session
+                if not self._running:
+                    return None, None
+                remaining = deadline - time.time() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    return None, None
+                self._cond.wait(timeout=remaining)
@@ -0,0 +1,77 @@
+import io
+import numpy as np
+from PIL import Image
+
+
+# Otsu can be fooled by very clean or very noisy images; keep it in a sane band
+MIN_THRESHOLD = 60
+MAX_THRESHOLD = 180
+# An ink pixel with fewer inked 8-neighbours than this is treated as noise
+MIN_NEIGHBOURS = 2
+CROP_MARGIN = 2
+
+
+def otsu_threshold(gray):
+    """
+    Returns the threshold that maximizes between-class variance of the histogram.
+    """
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_bg = np.cumsum(hist)
+    weight_fg = weight_bg[-1] - weight_bg
+    sum_bg = np.cumsum(hist * levels)
+    mean_bg = np.divide(sum_bg, weight_bg, out=np.zeros(256), where=weight_bg > 0)
+    mean_fg = np.divide(sum_bg[-1] - sum_bg, weight_fg, out=np.zeros(256), where=weight_fg > 0)
+    variance = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.clip(np.argmax(variance), MIN_THRESHOLD, MAX_THRESHOLD))
+
+
+def remove_specks(ink, min_neighbours=MIN_NEIGHBOURS):
+    """
+    Drops isolated ink pixels (fewer than `min_neighbours` inked 8-neighbours).
+    """
+    padded = np.pad(ink, 1).astype(np.uint8)
+    h, w = ink.shape
+    neighbours = sum(
+        padded[1 + dy:1 + dy + h, 1 + dx:1 + dx + w]
+        for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+        if dy or dx
+    )
+    return ink & (neighbours >= min_neighbours)
+
+
+def crop_to_ink(ink, margin=CROP_MARGIN):
+    rows = np.flatnonzero(ink.any(axis=1))
+    cols = np.flatnonzero(ink.any(axis=0))
+    if len(rows) == 0:
+        return ink
+    top, bottom = max(rows[0] - margin, 0), min(rows[-1] + margin + 1, ink.shape[0])
+    left, right = max(cols[0] - margin, 0), min(cols[-1] + margin + 1, ink.shape[1])
+    return ink[top:bottom, left:right]
+
+
+def binarize(image_bytes):
+    """
+    Returns a boolean array (True = ink) with adaptive thresholding, speck
+    removal and cropping to the character bounding box applied.
+    """
+    gray = np.asarray(Image.open(io.BytesIO(image_bytes)).convert("L"))
+    ink = gray < otsu_threshold(gray)
+    return crop_to_ink(remove_specks(ink))
+
+
+def to_png(ink):
+    """
+    Encodes an ink mask as a 1-bit PNG (black characters on white).
+    """
+    img = Image.fromarray(~ink).convert("1")
+    buf = io.BytesIO()
+    img.save(buf, format='PNG', optimize=True)
+    return buf.getvalue()
+
+
+def preprocess_captcha(image_bytes):
+    """
+    Raw captcha bytes -> minimal 1-bit PNG ready for the vision model or the local solver.
+    """
+    return to_png(binarize(image_bytes))
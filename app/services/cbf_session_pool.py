@@ -0,0 +1,169 @@
+import json
+import os
+import queue
+import re
+import threading
+import time
+import requests
+
+
+class CBFSession:
+    """
+    One CBF browser-like session: its own cookies and CSRF token.
+    CBF binds the current captcha to the session, so a captcha must be
+    answered through the same CBFSession that fetched it.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.http = requests.Session()
+        self.csrf_token = None
+        self.initialized = False
+
+    def set_csrf_token(self, token):
+        self.csrf_token = token
+        self.http.headers.update({'X-CSRF-TOKEN': token})
+
+    def to_state(self):
+        return {
+            'cookies': requests.utils.dict_from_cookiejar(self.http.cookies),
+            'csrf_token': self.csrf_token,
+            'saved_at': time.time(),
+        }
+
+    def load_state(self, state):
+        self.http.cookies = requests.utils.cookiejar_from_dict(state.get('cookies', {}))
+        if state.get('csrf_token'):
+            self.set_csrf_token(state['csrf_token'])
+        self.initialized = True
+
+
+class CBFSessionPool:
+    """
+    Pool of N CBFSessions checked out by callers for a captcha -> request flow.
+
+    Sessions are initialized lazily (homepage load to get cookies + CSRF
+    token) and refresh themselves when CBF answers 419/403. Cookies and tokens
+    are persisted to disk so a restart can skip the homepage load while the
+    server-side session is still alive.
+    """
+
+    SAVE_INTERVAL = 30
+
+    def __init__(self, base_url, size=1, state_path=None, max_state_age=3600, rate_limiter=None):
+        self.base_url = base_url
+        self.size = size
+        self.state_path = state_path
+        self.max_state_age = max_state_age
+        self.rate_limiter = rate_limiter
+        self.sessions = [CBFSession(i) for i in range(size)]
+        self._available = queue.Queue()
+        for session in self.sessions:
+            self._available.put(session)
+        self._init_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._last_save = 0.0
+        self._load_state()
+
+    @property
+    def default(self):
+        """
+        Session used by callers that don't check one out (single-threaded scripts).
+        """
+        return self.sessions[0]
+
+    # --- Checkout ---
+
+    def checkout(self, timeout=None):
+        """
+        Returns an initialized session, blocking until one is free.
+        Returns None on timeout.
+        """
+        try:
+            session = self._available.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if not session.initialized:
+            self.initialize(session)
+        return session
+
+    def checkin(self, session):
+        if session is not None:
+            self._available.put(session)
+
+    # --- Initialization / refresh ---
+
+    def initialize(self, session):
+        """
+        Loads the homepage to get fresh cookies and the CSRF token.
+        """
+        with self._init_lock:
+            print(f"[CBFSessionPool] Session {session.index}: visiting home page to get CSRF token...")
+            try:
+                if self.rate_limiter:
+                    self.rate_limiter.acquire('cbf')
+                response = session.http.get(self.base_url)
+                response.raise_for_status()
+
+                match = re.search(r'<meta name="csrf-token" content="([^"]+)">', response.text)
+                if match:
+                    session.set_csrf_token(match.group(1))
+                    print(f"[CBFSessionPool] Session {session.index}: CSRF Token found.")
+                else:
+                    print(f"[CBFSessionPool] Warning: Could not find CSRF token in homepage (session {session.index}).")
+                session.initialized = True
+            except Exception as e:
+                print(f"[CBFSessionPool] Error visiting homepage (session {session.index}): {e}")
+                return False
+        self.save(force=True)
+        return True
+
+    def refresh(self, session):
+        """
+        Drops the session's cookies/token (expired CSRF, 419/403) and starts over.
+        """
+        print(f"[CBFSessionPool] Session {session.index} expired. Refreshing...")
+        session.http.cookies.clear()
+        session.http.headers.pop('X-CSRF-TOKEN', None)
+        session.csrf_token = None
+        session.initialized = False
+        return self.initialize(session)
+
+    # --- Persistence ---
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                states = json.load(f)
+        except Exception as e:
+            print(f"[CBFSessionPool] Could not load session state: {e}")
+            return
+
+        warm = 0
+        for session, state in zip(self.sessions, states):
+            if state and time.time() - state.get('saved_at', 0) <= self.max_state_age:
+                session.load_state(state)
+                warm += 1
+        if warm:
+            print(f"[CBFSessionPool] Warm start: restored {warm}/{self.size} session(s) from {self.state_path}.")
+
+    def save(self, force=False):
+        if not self.state_path:
+            return
+        with self._save_lock:
+            if not force and time.time() - self._last_save < self.SAVE_INTERVAL:
+                return
+            self._last_save = time.time()
+            states = [s.to_state() if s.initialized else None for s in self.sessions]
+            try:
+                directory = os.path.dirname(self.state_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = self.state_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(states, f)
+                os.replace(tmp_path, self.state_path)
+            except OSError as e:
+                print(f"[CBFSessionPool] Could not save session state: {e}")
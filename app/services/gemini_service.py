@@ -1,199 +1,499 @@
-import base64
-import sys
-import time
-import io
-from PIL import Image, ImageFilter
-from google import genai
-from google.genai import types
-from app.config import Config
-
-import json
-
-class GeminiService:
-    def __init__(self):
-        self.api_key = Config.GOOGLE_API_KEY
-        self.client = genai.Client(api_key=self.api_key)
-
-    TEXT_MODELS = [
-        'models/gemma-3-27b-it',
-        'models/gemma-3-12b-it',
-        'models/gemma-3-4b-it', 
-        'models/gemma-3-1b-it',
-        'models/gemini-2.5-flash',
-    ]
-
-    def _preprocess_image(self, image_bytes):
-        """
-        Converts image to grayscale and applies thresholding to remove noise.
-        """
-        try:
-            img = Image.open(io.BytesIO(image_bytes)).convert("L")
-            
-            # Thresholding: pixels darker than 120 become 0 (black), others 255 (white)
-            # This handles "dark, thick strokes" vs "light noise".
-            # Adjust threshold as needed based on the sample image brightness.
-            threshold = 120 
-            img = img.point(lambda p: 0 if p < threshold else 255)
-            
-            # Save preprocessed debug image
-            img.save("last_captcha_processed.png")
-            
-            # Convert back to bytes
-            img_byte_arr = io.BytesIO()
-            img.save(img_byte_arr, format='PNG')
-            return img_byte_arr.getvalue()
-        except Exception as e:
-            print(f"Error processing image: {e}")
-            return image_bytes
-
-    def _generate_with_retry(self, contents, temperature=0.0, is_vision=False):
-        """
-        Robust generation with model rotation and waiting strategy.
-        """
-        models = self.TEXT_MODELS
-        
-        max_cycles = 2 # How many times to cycle through the entire list
-        cycle_count = 0
-        
-        while cycle_count < max_cycles:
-            for model in models:
-                try:
-                    # Clean model name if needed (sometimes 'models/' prefix is optional but genai usually handles it)
-                    print(f"Attempting to generate content using model: {model}")
-                    response = self.client.models.generate_content(
-                        model=model,
-                        contents=contents,
-                        config=types.GenerateContentConfig(temperature=temperature)
-                    )
-                    return response.text.strip()
-                except Exception as e:
-                    error_str = str(e).lower()
-                    if "429" in error_str or "resource_exhausted" in error_str or "exhausted" in error_str:
-                        print(f"Model {model} exhausted (429). Trying next model...")
-                        time.sleep(0.5) 
-                        continue
-                    elif "404" in error_str or "not_found" in error_str:
-                        print(f"Model {model} not found (404). Removing from list and trying next...")
-                        # Optional: Remove from list to avoid hitting it again in next cycle
-                        # models.remove(model) # Dangerous to modify list while iterating
-                        continue
-                    else:
-                        print(f"Error calling Gemini with model {model}: {e}")
-                        continue
-            
-            # If we exit the for loop, it means ALL models failed in this cycle
-            cycle_count += 1
-            if cycle_count < max_cycles:
-                print("All models exhausted. Waiting 60 seconds before next cycle...")
-                time.sleep(60)
-            else:
-                print("Max retry cycles reached. All models failed.")
-        
-        raise Exception("All models failed after retries.")
-
-    def solve_captcha(self, base64_image_str):
-        clean_base64 = base64_image_str.strip('"').strip()
-        
-        try:
-            image_bytes = base64.b64decode(clean_base64)
-            
-            # Preprocess image (remove noise)
-            processed_bytes = self._preprocess_image(image_bytes)
-            
-            # Save for debugging
-            with open("last_captcha.png", "wb") as f:
-                f.write(image_bytes)
-            print("Saved captcha image to last_captcha.png")
-            
-        except Exception as e:
-            print(f"Error decoding base64: {e}")
-            sys.exit(1)
-        
-        prompt = """
-        Act as a robust OCR system designed to solve noisy CAPTCHAs. Analyze the provided image focusing on the BLACK characters against the WHITE background.
-
-Instructions:
-1. Identifying exactly 4 uppercase letters (A-Z).
-2. Do not include numbers; strictly output letters.
-3. The characters are thick and dark.
-
-Output: Return ONLY the 4 letters found, with no additional text or whitespace.
-        """
-
-        text = self._generate_with_retry(
-            contents=[
-                types.Part.from_text(text=prompt),
-                types.Part.from_bytes(data=processed_bytes, mime_type="image/png")
-            ],
-            temperature=0.0,
-            is_vision=True
-        )
-        # Clean result (keep only alphanumeric, max 4 chars)
-        import re
-        clean_text = re.sub(r'[^a-zA-Z0-9]', '', text)
-        return clean_text[:4].upper()
-
-    def generate_tweet_text(self, contract_data):
-        """
-        Generates a creative tweet about the contract.
-        """
-    
-        # Prepare data for JSON serialization (remove ObjectId)
-        data_for_prompt = contract_data.copy()
-        if '_id' in data_for_prompt:
-            del data_for_prompt['_id']
-        
-        json_input = json.dumps(data_for_prompt, indent=2, ensure_ascii=False, default=str)
-
-        prompt_text = f"""
-        # ROLE
-Você é o "Leão do BID", o setorista digital do Fortaleza Esporte Clube. Sua função é anunciar novas contratações e movimentações no BID da CBF para o Twitter (X), agindo não apenas como um notificador, mas como um analista que explica ao torcedor quem é o jogador que está chegando.
-
-# TASK
-Analise o JSON do BID. Se for "Contrato Definitivo", trate como uma **NOVA CONTRATAÇÃO (COMPRA/AQUISIÇÃO)**. Analise o histórico de partidas fornecido para traçar um perfil rápido do atleta (se é titular, se faz gols, se é indisciplinado) e gerar valor na notícia.
-
-# STEP-BY-STEP PROCESS (Chain of Thought)
-
-1.  **CLASSIFICAÇÃO DO NEGÓCIO (Regra de Ouro)**:
-    * **Contrato Definitivo**: O atleta foi **ADQUIRIDO/COMPRADO**. É um **REFORÇO** chegando ao Pici. Nunca trate como renovação. Use termos como "É DO LEÃO", "REFORÇO", "NOVO CONTRATADO".
-    * **Empréstimo**: Reforço chegando por tempo determinado.
-    * **Rescisão**: Saída de jogador.
-
-2.  **ANÁLISE DE SCOUT (Mineração do `historico`)**:
-    * Olhe para os jogos mais recentes no array `historico`. O objetivo é responder: "Como esse cara vem jogando?".
-    * **Ritmo de Jogo**:
-        * Se tem muitos jogos recentes: "Chega com ritmo de jogo".
-        * Se tem poucos jogos: "Busca recuperar espaço".
-    * **Perfil Tático (Titular vs Reserva)**:
-        * Verifique o array `alteracoes` dentro dos jogos.
-        * Se o atleta aparece muito como "ENTROU": Ele costuma ser **opção de segundo tempo**.
-        * Se ele joga e não aparece em "ENTROU" (ou aparece como "SAIU" no fim): Ele costuma ser **titular**.
-    * **Disciplina e Gols**:
-        * Verifique `penalidades` (Cartões). Média alta = "Jogador de pegada forte/intenso".
-        * Verifique `gols`. Se tiver, destaque o "faro de gol".
-
-3.  **FORMATAÇÃO VISUAL (Padrão Twitter)**:
-    * **TEXTO LIMPO (CRÍTICO)**: Use APENAS texto padrão normal. NÃO use fontes Unicode (negrito matemático, itálico, etc) pois o Twitter bloqueia.
-    * Substitua "Fortaleza" por **@fortalezaec**.
-
-4.  **MONTAGEM DO TWEET**:
-    * **Linha 1:** Emoji (🦁, ✍️, 🆕, 📝, 📊 ) + [MANCHETE EM CAIXA ALTA].
-    * **Linha 3:** Anuncie a importação/chegada do atleta [Nome do Jogador] ao @fortalezaec.
-    * **Linha 5 (O Pulo do Gato):** A análise feita no passo 2.
-    * **Linha 7:** #FortalezaEC
-
-# JSON INPUT
-"""+json_input+"""
-# OUTPUT FORMAT
-Apenas o texto final do tweet.
-        """
-
-        try:
-            return self._generate_with_retry(contents=[types.Part.from_text(text=prompt_text)], is_vision=False)
-        except Exception as e:
-            print(f"Error generating tweet with Gemini: {e}")
-            # Fallback text if AI fails
-            nome = contract_data.get('nome', 'Jogador')
-            apelido = contract_data.get('apelido', 'Desconhecido')
-            tipo_contrato = contract_data.get('tipo_contrato', '')
-            return f"BID Publicado: {nome} ({apelido}) - {tipo_contrato}. #FortalezaEC"
+import base64
+import json
+import re
+import sys
+import time
+import threading
+from datetime import datetime, timezone
+from google import genai
+from google.genai import types
+from app.config import Config
+from app.services.captcha.local_solver import LocalCaptchaSolver
+from app.services.captcha.preprocessing import preprocess_captcha
+from app.services.captcha.debug_dump import CaptchaDebugDump
+from app.services.captcha.corpus import CaptchaCorpus
+from app.services.captcha.hedged_solver import HedgedCaptchaSolver
+from app.services.model_router import ModelRouter
+from app.services.rate_limiter import get_rate_limiter
+from app.services.prompt_builder import build_tweet_input
+from app.services.llm_cache import LLMResponseCache, DiskCacheStore, contents_digest, model_family
+
+class GeminiService:
+    def __init__(self):
+        self.api_key = Config.GOOGLE_API_KEY
+        self.client = genai.Client(api_key=self.api_key)
+        self.local_solver = self._load_local_solver()
+        self.debug_dump = CaptchaDebugDump(Config.CAPTCHA_DEBUG_DIR, Config.CAPTCHA_DEBUG_MAX_FILES) if Config.CAPTCHA_DEBUG_DIR else None
+        self.router = ModelRouter(Config.MODEL_ROUTER_STATE_PATH)
+        self.rate_limiter = get_rate_limiter()
+        self.cache = self._build_cache()
+
+        # Captcha attempts waiting for CBF's verdict, keyed by answer
+        self.corpus = CaptchaCorpus(Config.CAPTCHA_CORPUS_DIR) if Config.CAPTCHA_CORPUS_DIR else None
+        self._pending_captchas = {}
+        self._pending_lock = threading.Lock()
+        self._hedged_solver = None
+
+    @property
+    def hedged_solver(self):
+        """
+        Created on first use so the thread pool only exists in hedged mode.
+        """
+        if self._hedged_solver is None:
+            self._hedged_solver = HedgedCaptchaSolver(
+                self.solve_processed_with_model,
+                self.VISION_MODELS,
+                max_in_flight=Config.CAPTCHA_HEDGE_MAX_IN_FLIGHT,
+                quorum=Config.CAPTCHA_HEDGE_QUORUM
+            )
+            if self.corpus:
+                self._hedged_solver.seed_stats(self.corpus.stats_by_model())
+        return self._hedged_solver
+
+    def _build_cache(self):
+        if not Config.LLM_CACHE_ENABLED:
+            return None
+        try:
+            store = DiskCacheStore(Config.LLM_CACHE_DIR, Config.LLM_CACHE_MAX_FILES) if Config.LLM_CACHE_DIR else None
+        except OSError as e:
+            print(f"Could not open LLM cache directory, using memory only: {e}")
+            store = None
+        disabled = [t.strip() for t in (Config.LLM_CACHE_DISABLED_TASKS or '').split(',') if t.strip()]
+        return LLMResponseCache(
+            max_entries=Config.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=Config.LLM_CACHE_TTL_SECONDS,
+            store=store,
+            disabled_tasks=disabled
+        )
+
+    def cache_stats(self):
+        """
+        Hit/miss counters of the response cache (None when disabled).
+        """
+        return self.cache.stats() if self.cache else None
+
+    @staticmethod
+    def _families(models):
+        return list(dict.fromkeys(model_family(m) for m in models))
+
+    def _load_local_solver(self):
+        """
+        Loads the offline captcha solver if a trained model is available.
+        """
+        try:
+            return LocalCaptchaSolver.load(Config.CAPTCHA_SOLVER_MODEL)
+        except Exception as e:
+            print(f"Could not load local captcha solver: {e}")
+            return None
+
+    # Longest wait for a model to come back; a captcha solve holds a CBF session meanwhile
+    MAX_RETRY_WAIT = 120
+
+    TEXT_MODELS = [
+        'models/gemma-3-27b-it',
+        'models/gemma-3-12b-it',
+        'models/gemma-3-4b-it', 
+        'models/gemma-3-1b-it',
+        'models/gemini-2.5-flash',
+    ]
+
+    # gemma-3-1b is text-only, so it is never asked to read a captcha
+    VISION_MODELS = [
+        'models/gemma-3-27b-it',
+        'models/gemma-3-12b-it',
+        'models/gemma-3-4b-it',
+        'models/gemini-2.5-flash',
+    ]
+
+    def _preprocess_image(self, image_bytes):
+        """
+        Adaptive thresholding, noise removal and crop to the characters.
+        Returns a minimal 1-bit PNG (smaller vision payload).
+        """
+        try:
+            return preprocess_captcha(image_bytes)
+        except Exception as e:
+            print(f"Error processing image: {e}")
+            return image_bytes
+
+    # Bump when the tweet template changes; stored with each generated post
+    TWEET_PROMPT_VERSION = 'v2'
+
+    # Tweet instructions shared by single and batched generation
+    TWEET_PROMPT = """
+# ROLE
+Você é o "Leão do BID", o setorista digital do Fortaleza Esporte Clube. Sua função é anunciar novas contratações e movimentações no BID da CBF para o Twitter (X), agindo não apenas como um notificador, mas como um analista que explica ao torcedor quem é o jogador que está chegando.
+
+# TASK
+Analise o JSON do BID. Se for "Contrato Definitivo", trate como uma **NOVA CONTRATAÇÃO (COMPRA/AQUISIÇÃO)**. Analise o histórico de partidas fornecido para traçar um perfil rápido do atleta (se é titular, se faz gols, se é indisciplinado) e gerar valor na notícia.
+
+# STEP-BY-STEP PROCESS (Chain of Thought)
+
+1.  **CLASSIFICAÇÃO DO NEGÓCIO (Regra de Ouro)**:
+    * **Contrato Definitivo**: O atleta foi **ADQUIRIDO/COMPRADO**. É um **REFORÇO** chegando ao Pici. Nunca trate como renovação. Use termos como "É DO LEÃO", "REFORÇO", "NOVO CONTRATADO".
+    * **Empréstimo**: Reforço chegando por tempo determinado.
+    * **Rescisão**: Saída de jogador.
+
+2.  **ANÁLISE DE SCOUT (campos `scout` e `ultimos_jogos`)**:
+    * O campo `scout` já traz os números calculados de todo o histórico (jogos por temporada, titularidades, entradas no segundo tempo, gols e cartões por jogo, forma recente em `recent`). O array `ultimos_jogos` traz as partidas mais recentes. O objetivo é responder: "Como esse cara vem jogando?".
+    * **Ritmo de Jogo**:
+        * Se tem muitos jogos recentes: "Chega com ritmo de jogo".
+        * Se tem poucos jogos: "Busca recuperar espaço".
+    * **Perfil Tático (Titular vs Reserva)**:
+        * Use `scout.start_share` e `scout.sub_appearances` (entradas como "ENTROU").
+        * Se o atleta entra muito no decorrer dos jogos: Ele costuma ser **opção de segundo tempo**.
+        * Se a maioria dos jogos é como titular: Ele costuma ser **titular**.
+    * **Disciplina e Gols**:
+        * Verifique `scout.cards_per_game` (Cartões). Média alta = "Jogador de pegada forte/intenso".
+        * Verifique `scout.goals`. Se tiver, destaque o "faro de gol".
+
+3.  **FORMATAÇÃO VISUAL (Padrão Twitter)**:
+    * **TEXTO LIMPO (CRÍTICO)**: Use APENAS texto padrão normal. NÃO use fontes Unicode (negrito matemático, itálico, etc) pois o Twitter bloqueia.
+    * Substitua "Fortaleza" por **@fortalezaec**.
+
+4.  **MONTAGEM DO TWEET**:
+    * **Linha 1:** Emoji (🦁, ✍️, 🆕, 📝, 📊 ) + [MANCHETE EM CAIXA ALTA].
+    * **Linha 3:** Anuncie a importação/chegada do atleta [Nome do Jogador] ao @fortalezaec.
+    * **Linha 5 (O Pulo do Gato):** A análise feita no passo 2.
+    * **Linha 7:** #FortalezaEC
+
+"""
+
+    CAPTCHA_PROMPT = """
+        Act as a robust OCR system designed to solve noisy CAPTCHAs. Analyze the provided image focusing on the BLACK characters against the WHITE background.
+
+Instructions:
+1. Identifying exactly 4 uppercase letters (A-Z).
+2. Do not include numbers; strictly output letters.
+3. The characters are thick and dark.
+
+Output: Return ONLY the 4 letters found, with no additional text or whitespace.
+        """
+
+    def _generate_with_model(self, model, contents, temperature=0.0):
+        """
+        Single generation call against one model (no rotation, no retries).
+        Waits for the model's own rate-limit bucket.
+        """
+        self.rate_limiter.acquire(f"gemini:{model}")
+        response = self.client.models.generate_content(
+            model=model,
+            contents=contents,
+            config=types.GenerateContentConfig(temperature=temperature)
+        )
+        return response.text.strip()
+
+    def _with_budget_first(self, models):
+        """
+        Keeps the router's order but moves models whose local rate budget is
+        empty to the end, so we don't block on one while another is free.
+        """
+        return sorted(models, key=lambda m: not self.rate_limiter.available(f"gemini:{m}"))
+
+    def _generate_with_retry(self, contents, temperature=0.0, is_vision=False):
+        """
+        Robust generation with model rotation and waiting strategy.
+        Models are tried fastest-healthy-first according to the router; models
+        cooling down (429/404) or with an open circuit are skipped.
+        Returns (text, model that answered). The model is returned rather than
+        kept on the instance because captcha and post calls run concurrently.
+        """
+        task = 'captcha' if is_vision else 'text'
+        candidates = self.VISION_MODELS if is_vision else self.TEXT_MODELS
+        
+        max_cycles = 2 # How many times to cycle through the entire list
+        cycle_count = 0
+        models = self._with_budget_first(self.router.route(task, candidates))
+
+        # Same request already answered by this model family? (captchas: same exact image)
+        digest = None
+        if self.cache and self.cache.enabled_for(task):
+            digest = contents_digest(contents, temperature)
+            cached = self.cache.get(task, self._families(models or candidates), digest)
+            if cached:
+                print(f"[GeminiService] Cache hit for {task} (answered by {cached['model']}, saved ~{cached.get('latency', 0):.1f}s).")
+                return cached['text'], cached['model']
+        
+        while cycle_count < max_cycles:
+            for model in models:
+                started_at = time.perf_counter()
+                try:
+                    # Clean model name if needed (sometimes 'models/' prefix is optional but genai usually handles it)
+                    print(f"Attempting to generate content using model: {model}")
+                    text = self._generate_with_model(model, contents, temperature)
+                    latency = time.perf_counter() - started_at
+                    self.router.record_success(task, model, latency)
+                    if digest:
+                        self.cache.put(task, model, digest, text, latency)
+                    return text, model
+                except Exception as e:
+                    print(f"Error calling Gemini with model {model}: {e}")
+                    self.router.record_failure(task, model, e)
+                    continue
+            
+            # If we exit the for loop, it means ALL models failed (or are unavailable) in this cycle
+            cycle_count += 1
+            if cycle_count < max_cycles:
+                wait_time = self.router.seconds_until_available(task, candidates)
+                if wait_time > self.MAX_RETRY_WAIT:
+                    # Every model is disabled (404), quota-blocked for long or behind an open breaker
+                    raise Exception(f"All models unavailable for the next {wait_time}s.")
+                print(f"All models unavailable. Waiting {wait_time}s for the earliest reset...")
+                time.sleep(wait_time)
+                # Probe the soonest-reset models even if the clock is a hair early
+                models = self._with_budget_first(self.router.route(task, candidates)) or self.router.soonest_available(task, candidates)
+            else:
+                print("Max retry cycles reached. All models failed.")
+        
+        raise Exception("All models failed after retries.")
+
+    def _captcha_contents(self, processed_bytes):
+        return [
+            types.Part.from_text(text=self.CAPTCHA_PROMPT),
+            types.Part.from_bytes(data=processed_bytes, mime_type="image/png")
+        ]
+
+    def _clean_captcha_text(self, text):
+        # Clean result (keep only alphanumeric, max 4 chars)
+        clean_text = re.sub(r'[^a-zA-Z0-9]', '', text)
+        return clean_text[:4].upper()
+
+    def solve_captcha_with_model(self, image_bytes, model):
+        """
+        Solves a raw captcha image with one specific backend, without fallback.
+        `model` is either 'local' or one of TEXT_MODELS. Used by the benchmark.
+        """
+        processed_bytes = self._preprocess_image(image_bytes)
+        if model == 'local':
+            if not self.local_solver:
+                return ''
+            return self.local_solver.solve(processed_bytes)[0]
+        return self.solve_processed_with_model(model, processed_bytes)
+
+    def solve_processed_with_model(self, model, processed_bytes):
+        started_at = time.perf_counter()
+        try:
+            text = self._generate_with_model(model, self._captcha_contents(processed_bytes))
+        except Exception as e:
+            self.router.record_failure('captcha', model, e)
+            raise
+        self.router.record_success('captcha', model, time.perf_counter() - started_at)
+        return self._clean_captcha_text(text)
+
+    def solve_captcha(self, base64_image_str, hedged=None):
+        clean_base64 = base64_image_str.strip('"').strip()
+        
+        try:
+            image_bytes = base64.b64decode(clean_base64)
+            
+            # Preprocess image (remove noise)
+            processed_bytes = self._preprocess_image(image_bytes)
+            
+            # Save for debugging (opt-in, see CAPTCHA_DEBUG_DIR)
+            if self.debug_dump:
+                self.debug_dump.save(image_bytes, processed_bytes)
+            
+        except Exception as e:
+            print(f"Error decoding base64: {e}")
+            sys.exit(1)
+
+        started_at = time.perf_counter()
+
+        # Try the offline solver first; only go to Gemini when it is unsure.
+        if self.local_solver:
+            local_text, confidence = self.local_solver.solve(processed_bytes)
+            if local_text and confidence >= Config.CAPTCHA_LOCAL_MIN_CONFIDENCE:
+                print(f"Captcha solved locally: {local_text} (confidence {confidence:.2f})")
+                self._remember_captcha(image_bytes, local_text, 'local', started_at)
+                return local_text
+            print(f"Local solver confidence too low ({confidence:.2f}). Falling back to Gemini...")
+
+        if hedged is None:
+            hedged = Config.CAPTCHA_HEDGED
+        if hedged:
+            healthy_models = self.router.route('captcha', self.VISION_MODELS)
+            hedged_text, answers = self.hedged_solver.solve(processed_bytes, models=healthy_models)
+            if hedged_text:
+                self._remember_captcha(image_bytes, hedged_text, 'hedged', started_at, answers)
+                return hedged_text
+            print("Hedged solving produced no answer. Falling back to sequential rotation...")
+
+        contents = self._captcha_contents(processed_bytes)
+        text, model = self._generate_with_retry(
+            contents=contents,
+            temperature=0.0,
+            is_vision=True
+        )
+        clean_text = self._clean_captcha_text(text)
+        # Kept so a rejected answer can be dropped from the response cache
+        cache_digest = contents_digest(contents, 0.0) if self.cache else None
+        self._remember_captcha(image_bytes, clean_text, model, started_at, cache_digest=cache_digest)
+        return clean_text
+
+    def _remember_captcha(self, image_bytes, answer, model, started_at, answers=None, cache_digest=None):
+        """
+        Keeps the attempt until CBF tells us whether the answer was accepted
+        (see report_captcha_result).
+        """
+        latency_ms = (time.perf_counter() - started_at) * 1000
+        with self._pending_lock:
+            self._pending_captchas[answer] = (image_bytes, model, latency_ms, answers or {}, cache_digest)
+            # Answers that never get reported (crashes, aborted retries) should not pile up
+            while len(self._pending_captchas) > 50:
+                self._pending_captchas.pop(next(iter(self._pending_captchas)))
+
+    def report_captcha_result(self, captcha_text, accepted):
+        """
+        Records whether CBF accepted a captcha answer returned by solve_captcha.
+        The attempt is appended to the labelled captcha corpus and, for hedged
+        answers, updates the per-model voting weights.
+        """
+        with self._pending_lock:
+            pending = self._pending_captchas.pop(captcha_text, None)
+        if pending is None:
+            return
+        image_bytes, model, latency_ms, answers, cache_digest = pending
+
+        if not accepted and cache_digest:
+            self.cache.invalidate('captcha', self._families(self.VISION_MODELS), cache_digest)
+
+        if self.corpus:
+            self.corpus.record(image_bytes, captcha_text, model, latency_ms, accepted)
+
+        # We only know a model was right/wrong when its answer matches the one CBF judged
+        for voter, answer in answers.items():
+            if accepted or answer == captcha_text:
+                correct = accepted and answer == captcha_text
+                self.hedged_solver.record_outcome(voter, correct)
+                if self.corpus:
+                    self.corpus.record(image_bytes, answer, voter, latency_ms, correct)
+
+    def generate_tweet_text(self, contract_data):
+        """
+        Generates a creative tweet about the contract.
+        """
+        return self.generate_post(contract_data)['text']
+
+    def generate_post(self, contract_data):
+        """
+        Generates the post for a contract once, platform-neutral.
+        Returns {'text', 'prompt_version', 'model', 'generated_at'}; model is
+        'fallback' when every model failed and the template text was used.
+        """
+        json_input = self._tweet_input(contract_data)
+        prompt_text = (
+            self.TWEET_PROMPT
+            + "# JSON INPUT\n" + json_input + "\n"
+            + "# OUTPUT FORMAT\nApenas o texto final do tweet.\n"
+        )
+
+        try:
+            text, model = self._generate_with_retry(contents=[types.Part.from_text(text=prompt_text)], is_vision=False)
+        except Exception as e:
+            print(f"Error generating tweet with Gemini: {e}")
+            text = self._fallback_post_text(contract_data)
+            model = 'fallback'
+
+        return self._post(text, model)
+
+    def _tweet_input(self, contract_data):
+        # Only what the template uses: contract fields, scout summary, last matches
+        json_input, prompt_stats = build_tweet_input(
+            contract_data,
+            token_budget=Config.TWEET_PROMPT_TOKEN_BUDGET,
+            recent=Config.TWEET_PROMPT_RECENT_MATCHES
+        )
+        print(f"[GeminiService] Tweet prompt input: {prompt_stats['chars']} chars (~{prompt_stats['tokens']} tokens), "
+              f"{prompt_stats['matches']} recent matches"
+              + (" [over budget]" if prompt_stats['over_budget'] else ""))
+        return json_input
+
+    def generate_posts(self, contracts, batch_size=None):
+        """
+        Batch version of generate_post: up to batch_size contracts per LLM
+        call, answered as a JSON array of {"id", "texto"}. Contracts missing
+        from a malformed or partial answer fall back to generate_post.
+        Returns {str(contract['_id']): post}.
+        """
+        batch_size = batch_size or Config.TWEET_BATCH_SIZE
+        posts = {}
+        for i in range(0, len(contracts), batch_size):
+            batch = contracts[i:i + batch_size]
+            if len(batch) > 1:
+                posts.update(self._generate_post_batch(batch))
+            for contract in batch:
+                key = str(contract['_id'])
+                if key not in posts:
+                    posts[key] = self.generate_post(contract)
+        return posts
+
+    def _generate_post_batch(self, contracts):
+        items = ','.join(
+            '{"id":' + json.dumps(str(c['_id'])) + ',"contrato":' + self._tweet_input(c) + '}'
+            for c in contracts
+        )
+        prompt_text = (
+            self.TWEET_PROMPT
+            + "# JSON INPUT\n"
+            + "Uma lista de contratos; escreva um tweet independente para cada um.\n"
+            + "[" + items + "]\n"
+            + "# OUTPUT FORMAT\n"
+            + 'Apenas um array JSON, um objeto por contrato, no formato [{"id": "<id do contrato>", "texto": "<tweet>"}].\n'
+        )
+
+        try:
+            response, model = self._generate_with_retry(contents=[types.Part.from_text(text=prompt_text)], is_vision=False)
+        except Exception as e:
+            print(f"Error generating tweet batch with Gemini: {e}")
+            return {}
+
+        texts = self._parse_post_batch(response, {str(c['_id']) for c in contracts})
+        if len(texts) < len(contracts):
+            print(f"[GeminiService] Batch answer covered {len(texts)}/{len(contracts)} contracts. Generating the rest one by one.")
+        return {key: self._post(text, model) for key, text in texts.items()}
+
+    @staticmethod
+    def _parse_post_batch(response, expected_ids):
+        """
+        Extracts {id: texto} from a batch answer, ignoring unknown ids and
+        empty texts. Returns {} when the answer is not a JSON array.
+        """
+        text = response.strip()
+        # Models often wrap JSON in a markdown fence
+        fence = re.match(r'^```(?:json)?\s*(.*?)\s*```$', text, re.DOTALL)
+        if fence:
+            text = fence.group(1)
+        try:
+            items = json.loads(text)
+        except ValueError:
+            start, end = text.find('['), text.rfind(']')
+            try:
+                items = json.loads(text[start:end + 1]) if start != -1 and end > start else None
+            except ValueError:
+                items = None
+        if not isinstance(items, list):
+            return {}
+
+        texts = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            key, body = str(item.get('id')), item.get('texto')
+            if key in expected_ids and isinstance(body, str) and body.strip():
+                texts[key] = body.strip()
+        return texts
+
+    def _fallback_post_text(self, contract_data):
+        # Fallback text if AI fails
+        nome = contract_data.get('nome', 'Jogador')
+        apelido = contract_data.get('apelido', 'Desconhecido')
+        tipo_contrato = contract_data.get('tipo_contrato', '')
+        return f"BID Publicado: {nome} ({apelido}) - {tipo_contrato}. #FortalezaEC"
+
+    def _post(self, text, model):
+        return {
+            'text': text,
+            'prompt_version': self.TWEET_PROMPT_VERSION,
+            'model': model,
+            'generated_at': datetime.now(timezone.utc),
+        }
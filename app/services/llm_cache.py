@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+def contents_digest(contents, temperature=0.0):
+    """
+    Content address of a generate_content request: prompt text, exact bytes
+    of inline images (mime type included) and temperature.
+    """
+    h = hashlib.sha256(f"temperature={temperature}".encode('utf-8'))
+    for part in contents:
+        text = getattr(part, 'text', None)
+        inline = getattr(part, 'inline_data', None)
+        if text is not None:
+            h.update(b'\x00text\x00' + text.encode('utf-8'))
+        elif inline is not None and getattr(inline, 'data', None) is not None:
+            h.update(b'\x00bytes\x00' + (inline.mime_type or '').encode('utf-8') + b'\x00' + inline.data)
+        else:
+            h.update(b'\x00str\x00' + str(part).encode('utf-8'))
+    return h.hexdigest()
+
+def model_family(model):
+    """
+    'gemini-2.5-flash' -> 'gemini', 'models/gemma-3-27b-it' -> 'gemma'.
+    The 'models/' prefix is dropped: the family ends up in a file name.
+    """
+    return model.rsplit('/', 1)[-1].split('-', 1)[0]
+
+class DiskCacheStore:
+    """
+    Second cache tier: one JSON file per entry, oldest files evicted past max_files.
+    """
+
+    def __init__(self, directory, max_files=5000):
+        self.directory = directory
+        self.max_files = max_files
+        self._puts = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key):
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, key, entry):
+        # Unique temp file: threads (or processes sharing the directory) may write the same key
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f"{key}.", suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"[LLMCache] Could not write cache entry: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._puts += 1
+        if self._puts % 50 == 0:
+            self._evict()
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        try:
+            files = [os.path.join(self.directory, n) for n in os.listdir(self.directory) if n.endswith('.json')]
+            if len(files) <= self.max_files:
+                return
+            files.sort(key=os.path.getmtime)
+            for path in files[:len(files) - self.max_files]:
+                os.remove(path)
+        except OSError as e:
+            print(f"[LLMCache] Could not evict cache entries: {e}")
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of Gemini responses keyed by (task, model family,
+    request digest). A memory LRU sits in front of an optional persistent
+    store; entries expire after ttl_seconds. Tasks in disabled_tasks are
+    never cached.
+    """
+
+    def __init__(self, max_entries=500, ttl_seconds=7 * 86400, store=None, disabled_tasks=()):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self.disabled_tasks = set(disabled_tasks)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'memory_hits': 0, 'store_hits': 0, 'misses': 0, 'saved_seconds': 0.0}
+
+    @staticmethod
+    def _key(task, family, digest):
+        return f"{task}-{family}-{digest}"
+
+    def enabled_for(self, task):
+        return task not in self.disabled_tasks
+
+    def get(self, task, families, digest):
+        """
+        Returns the first fresh entry ({'text', 'model', 'latency'}) among the
+        given model families (in preference order), or None.
+        """
+        if not self.enabled_for(task):
+            return None
+
+        now = time.time()
+        for family in families:
+            key = self._key(task, family, digest)
+            with self._lock:
+                entry = self._memory.get(key)
+                if entry is not None:
+                    self._memory.move_to_end(key)
+            tier = 'memory_hits'
+            if entry is None and self.store:
+                entry = self.store.load(key)
+                tier = 'store_hits'
+            if entry is None:
+                continue
+            if now - entry.get('created_at', 0) > self.ttl_seconds:
+                self._forget(key)
+                continue
+            if tier == 'store_hits':
+                self._remember(key, entry)
+            with self._lock:
+                self.counters['hits'] += 1
+                self.counters[tier] += 1
+                self.counters['saved_seconds'] += entry.get('latency', 0.0)
+            return entry
+
+        with self._lock:
+            self.counters['misses'] += 1
+        return None
+
+    def put(self, task, model, digest, text, latency):
+        if not self.enabled_for(task):
+            return
+        key = self._key(task, model_family(model), digest)
+        entry = {'text': text, 'model': model, 'latency': latency, 'created_at': time.time()}
+        self._remember(key, entry)
+        if self.store:
+            self.store.save(key, entry)
+
+    def invalidate(self, task, families, digest):
+        """
+        Drops a cached response (e.g. a captcha answer CBF rejected).
+        """
+        for family in families:
+            self._forget(self._key(task, family, digest))
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            counters['entries'] = len(self._memory)
+        lookups = counters['hits'] + counters['misses']
+        counters['hit_rate'] = round(counters['hits'] / lookups, 3) if lookups else 0.0
+        counters['saved_seconds'] = round(counters['saved_seconds'], 2)
+        return counters
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _forget(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.store:
+            self.store.delete(key)
@@ -0,0 +1,183 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+
+
+class ModelRouter:
+    """
+    Tracks the health of each Gemini model and orders models for each call.
+
+    - Quota (429) and not-found (404) cooldowns are per model, since quotas
+      and availability do not depend on what we ask.
+    - Latency, success rate and the circuit breaker are per (task, model):
+      a model can be fine for tweet text and useless for vision captchas.
+
+    Healthy models are ordered by expected latency (EWMA latency divided by
+    EWMA success rate). State is persisted to a JSON file so a restart does
+    not start by hitting exhausted models again.
+    """
+
+    ALPHA = 0.3
+    DEFAULT_LATENCY = 5.0  # prior for models we have not measured yet (seconds)
+    RATE_LIMIT_COOLDOWN = 60
+    NOT_FOUND_COOLDOWN = 24 * 3600
+    FAILURE_THRESHOLD = 3  # consecutive failures that open the breaker
+    BREAKER_COOLDOWN = 120
+    MAX_BREAKER_COOLDOWN = 3600
+    MIN_RETRY_WAIT = 60  # after a full round of failures that set no cooldown
+    SAVE_INTERVAL = 30
+
+    def __init__(self, state_path=None):
+        self.state_path = state_path
+        self.cooldowns = {}  # model -> {'until': ts, 'reason': '429'|'404'}
+        self.stats = {}      # 'task|model' -> {latency, success, failures, open_until, breaker_cooldown}
+        self._lock = threading.Lock()
+        # Serializes writers of the state file (they share its .tmp path)
+        self._save_lock = threading.Lock()
+        self._last_save = 0.0
+        self._load()
+
+    # --- Persistence ---
+
+    def _load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+            now = time.time()
+            self.cooldowns = {m: c for m, c in state.get('cooldowns', {}).items() if c['until'] > now}
+            self.stats = state.get('stats', {})
+            print(f"[ModelRouter] Restored state: {len(self.cooldowns)} model(s) cooling down.")
+        except Exception as e:
+            print(f"[ModelRouter] Could not load state from {self.state_path}: {e}")
+
+    def save(self):
+        if not self.state_path:
+            return
+        with self._save_lock:
+            with self._lock:
+                state = {'cooldowns': dict(self.cooldowns), 'stats': {k: dict(v) for k, v in self.stats.items()}}
+            try:
+                directory = os.path.dirname(self.state_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = self.state_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, self.state_path)
+                self._last_save = time.time()
+            except OSError as e:
+                print(f"[ModelRouter] Could not save state: {e}")
+
+    def _maybe_save(self, force=False):
+        if force or time.time() - self._last_save >= self.SAVE_INTERVAL:
+            self.save()
+
+    # --- Routing ---
+
+    def _stats(self, task, model):
+        return self.stats.setdefault(f"{task}|{model}", {
+            'latency': None,
+            'success': 1.0,
+            'failures': 0,
+            'open_until': 0.0,
+            'breaker_cooldown': self.BREAKER_COOLDOWN,
+        })
+
+    def _available_at(self, task, model):
+        cooldown = self.cooldowns.get(model, {}).get('until', 0.0)
+        stats = self.stats.get(f"{task}|{model}")
+        open_until = stats['open_until'] if stats else 0.0
+        return max(cooldown, open_until)
+
+    def _expected_latency(self, task, model):
+        stats = self.stats.get(f"{task}|{model}")
+        if not stats or stats['latency'] is None:
+            return self.DEFAULT_LATENCY
+        return stats['latency'] / max(stats['success'], 0.05)
+
+    def route(self, task, models):
+        """
+        Returns the currently healthy models for `task`, fastest first.
+        """
+        now = time.time()
+        with self._lock:
+            healthy = [m for m in models if self._available_at(task, m) <= now]
+            return sorted(healthy, key=lambda m: self._expected_latency(task, m))
+
+    def seconds_until_available(self, task, models):
+        """
+        Seconds until the first unavailable model can be tried again.
+        Models that failed below the breaker threshold (5xx, timeouts) look
+        available right away; then MIN_RETRY_WAIT is used instead of 0.
+        """
+        now = time.time()
+        with self._lock:
+            times = [self._available_at(task, m) for m in models]
+        if not times:
+            return 0
+        return max(0, math.ceil(min(times) - now)) or self.MIN_RETRY_WAIT
+
+    def soonest_available(self, task, models):
+        """
+        Models ordered by when their cooldown/breaker ends. Used to probe after
+        waiting, even if the clock says a reset is a few milliseconds away.
+        """
+        with self._lock:
+            return sorted(models, key=lambda m: self._available_at(task, m))
+
+    # --- Feedback ---
+
+    def record_success(self, task, model, latency):
+        with self._lock:
+            stats = self._stats(task, model)
+            if stats['latency'] is None:
+                stats['latency'] = latency
+            else:
+                stats['latency'] = (1 - self.ALPHA) * stats['latency'] + self.ALPHA * latency
+            stats['success'] = (1 - self.ALPHA) * stats['success'] + self.ALPHA
+            was_open = stats['failures'] >= self.FAILURE_THRESHOLD
+            stats['failures'] = 0
+            stats['open_until'] = 0.0
+            stats['breaker_cooldown'] = self.BREAKER_COOLDOWN
+            self.cooldowns.pop(model, None)
+        if was_open:
+            print(f"[ModelRouter] Circuit for {model} ({task}) closed again.")
+        self._maybe_save(force=was_open)
+
+    def record_failure(self, task, model, error):
+        """
+        Classifies the error: 429 -> quota cooldown (honouring the retry delay
+        from the error if present), 404 -> long cooldown, anything else counts
+        towards the circuit breaker.
+        """
+        error_str = str(error).lower()
+        now = time.time()
+        with self._lock:
+            stats = self._stats(task, model)
+            stats['success'] = (1 - self.ALPHA) * stats['success']
+
+            if "429" in error_str or "resource_exhausted" in error_str or "exhausted" in error_str:
+                retry_after = self._parse_retry_delay(error_str) or self.RATE_LIMIT_COOLDOWN
+                self.cooldowns[model] = {'until': now + retry_after, 'reason': '429'}
+                print(f"[ModelRouter] {model} rate limited. Cooling down for {retry_after:.0f}s.")
+            elif "404" in error_str or "not_found" in error_str:
+                self.cooldowns[model] = {'until': now + self.NOT_FOUND_COOLDOWN, 'reason': '404'}
+                print(f"[ModelRouter] {model} not found. Disabled for {self.NOT_FOUND_COOLDOWN // 3600}h.")
+            else:
+                stats['failures'] += 1
+                if stats['failures'] >= self.FAILURE_THRESHOLD:
+                    # Half-open after the cooldown; each further failure doubles it
+                    stats['open_until'] = now + stats['breaker_cooldown']
+                    print(f"[ModelRouter] Circuit for {model} ({task}) open for {stats['breaker_cooldown']}s.")
+                    stats['breaker_cooldown'] = min(stats['breaker_cooldown'] * 2, self.MAX_BREAKER_COOLDOWN)
+        self._maybe_save(force=True)
+
+    @staticmethod
+    def _parse_retry_delay(error_str):
+        match = re.search(r"retry in ([\d.]+)s", error_str) or re.search(r"retrydelay['\"]?:\s*['\"]?([\d.]+)s", error_str)
+        return float(match.group(1)) if match else None
@@ -0,0 +1,144 @@
+import math
+import time
+from datetime import datetime, timedelta, timezone, date
+from zoneinfo import ZoneInfo
+import numpy as np
+
+def parse_windows(value):
+    """
+    'MM-DD:MM-DD,...' -> [((month, day), (month, day)), ...] (inclusive, may wrap the year).
+    """
+    windows = []
+    for item in (value or '').split(','):
+        if ':' not in item:
+            continue
+        try:
+            start, end = (tuple(int(p) for p in part.strip().split('-')) for part in item.split(':', 1))
+            date(2001, *start), date(2001, *end)
+        except (TypeError, ValueError):
+            print(f"[PollScheduler] Ignoring invalid transfer window: {item!r}")
+            continue
+        windows.append((start, end))
+    return windows
+
+class PollScheduler:
+    """
+    Plans BID searches where contracts actually show up.
+
+    Contracts' first_seen_at (or their ObjectId time) over the last
+    `history_days` days build a weekday x hour histogram in the club's
+    timezone. A day's budget of `polls_per_day` searches is spread across
+    the week proportionally to sqrt(arrival rate) per slot, which minimises
+    the expected detection delay for a fixed number of searches. Transfer
+    windows multiply the rate by `window_boost` (doubled in their last
+    `closing_days` days); the yearly average stays at polls_per_day.
+    Intervals are clamped to [min_interval, max_interval].
+    """
+
+    def __init__(self, repository, polls_per_day=24, min_interval=900, max_interval=4 * 3600,
+                 history_days=365, tz='America/Fortaleza', transfer_windows=(), window_boost=4.0,
+                 closing_days=7, prior=1.0, refresh_seconds=86400):
+        self.repository = repository
+        self.polls_per_day = polls_per_day
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.history_days = history_days
+        self.tz = ZoneInfo(tz)
+        self.windows = list(transfer_windows)
+        self.window_boost = window_boost
+        self.closing_days = closing_days
+        self.prior = prior
+        self.refresh_seconds = refresh_seconds
+
+        self.histogram = np.zeros((7, 24))
+        self._weights = np.ones((7, 24))
+        self._calendar_norm = 1.0
+        self._refreshed_at = None
+        self.next_run_at = None
+
+    # --- Learning ---
+
+    def refresh(self):
+        """
+        Rebuilds the weekday x hour histogram from stored contracts.
+        """
+        histogram = np.zeros((7, 24))
+        for seen_at in self.repository.first_seen_times(self.history_days):
+            local = self._local(seen_at)
+            histogram[local.weekday(), local.hour] += 1
+        self.histogram = histogram
+        self._weights = np.sqrt(histogram + self.prior)
+        self._weights /= self._weights.mean()
+        self._calendar_norm = self._yearly_calendar_mean()
+        self._refreshed_at = time.monotonic()
+        print(f"[PollScheduler] Learned from {int(histogram.sum())} contract(s) over {self.history_days} days.")
+
+    def _ensure_fresh(self):
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.refresh_seconds:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[PollScheduler] Could not refresh histogram: {e}")
+                self._refreshed_at = time.monotonic()
+
+    # --- Calendar ---
+
+    def _window_factor(self, day):
+        """
+        Rate multiplier of a calendar day (1 outside transfer windows).
+        """
+        for start, end in self.windows:
+            key = (day.month, day.day)
+            inside = start <= key <= end if start <= end else (key >= start or key <= end)
+            if not inside:
+                continue
+            end_date = date(day.year if key <= end else day.year + 1, *end)
+            closing = (end_date - day).days < self.closing_days
+            return self.window_boost * (2 if closing else 1)
+        return 1.0
+
+    def _yearly_calendar_mean(self):
+        # Mean sqrt(window factor) over a year, so windows redistribute the budget instead of adding to it
+        start = date(2001, 1, 1)
+        return float(np.mean([math.sqrt(self._window_factor(start + timedelta(days=i))) for i in range(365)]))
+
+    # --- Planning ---
+
+    def _local(self, moment):
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.astimezone(self.tz)
+
+    def interval_at(self, moment):
+        """
+        Seconds between searches planned for the hour containing `moment`.
+        """
+        self._ensure_fresh()
+        local = self._local(moment)
+        polls_per_hour = (self.polls_per_day / 24.0) * self._weights[local.weekday(), local.hour]
+        polls_per_hour *= math.sqrt(self._window_factor(local.date())) / self._calendar_norm
+        return min(max(3600.0 / polls_per_hour, self.min_interval), self.max_interval)
+
+    def plan_next_run(self, now=None):
+        """
+        Integrates the planned search rate from `now` until one search is
+        due, so a quiet night followed by a busy morning is not stuck on the
+        night's long interval. Stores and returns next_run_at (UTC).
+        """
+        now = now or datetime.now(timezone.utc)
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=timezone.utc)
+        moment, credit = now, 0.0
+        while True:
+            interval = self.interval_at(moment)
+            hour_end = moment.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            step = (hour_end - moment).total_seconds()
+            if credit + step / interval >= 1:
+                self.next_run_at = moment + timedelta(seconds=(1 - credit) * interval)
+                return self.next_run_at
+            credit += step / interval
+            moment = hour_end
+
+    def seconds_until_next_run(self, now=None):
+        now = now or datetime.now(timezone.utc)
+        return max((self.plan_next_run(now) - now).total_seconds(), 0.0)
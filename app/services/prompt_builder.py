@@ -0,0 +1,51 @@
+import json
+from app.services.scout_stats import compute_scout, recent_matches
+
+# Storage/bookkeeping fields the tweet template never uses. outbox_job changes
+# on every retry, so leaving it in would also defeat the LLM response cache.
+INTERNAL_FIELDS = {
+    '_id', 'historico', 'historico_ref', 'scout', 'social_status', 'tweeted', 'post',
+    'outbox_job', 'first_seen_at', 'source',
+}
+
+def estimate_tokens(text):
+    # ~4 characters per token for Portuguese/JSON; close enough for a budget
+    return len(text) // 4 + 1
+
+def compact_json(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str)
+
+def build_tweet_input(contract_data, token_budget, recent=5):
+    """
+    Returns (json_input, stats) for the tweet prompt: the contract fields,
+    the scout summary (precomputed on the athlete, or computed here) and the
+    last `recent` matches, serialized compactly. Matches are dropped, oldest
+    first, until the input fits in token_budget.
+    """
+    data = {k: v for k, v in contract_data.items() if k not in INTERNAL_FIELDS}
+    historico = contract_data.get('historico')
+
+    scout = contract_data.get('scout')
+    if not scout and historico:
+        scout = compute_scout(historico)
+    if scout:
+        data['scout'] = scout
+
+    matches = recent_matches(historico, recent) if historico else []
+    while True:
+        if matches:
+            data['ultimos_jogos'] = matches
+        else:
+            data.pop('ultimos_jogos', None)
+        json_input = compact_json(data)
+        if not matches or estimate_tokens(json_input) <= token_budget:
+            break
+        matches = matches[:-1]
+
+    stats = {
+        'chars': len(json_input),
+        'tokens': estimate_tokens(json_input),
+        'matches': len(matches),
+        'over_budget': estimate_tokens(json_input) > token_budget,
+    }
+    return json_input, stats
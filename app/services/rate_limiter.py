@@ -0,0 +1,185 @@
+import threading
+import time
+from pymongo.errors import DuplicateKeyError
+from app.config import Config
+
+
+def parse_rate(spec):
+    """
+    Parses 'LIMIT/SECONDS' (e.g. '29/60') into (limit, period).
+    """
+    limit, period = spec.split('/')
+    return float(limit), float(period)
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` tokens, refilled at
+    `capacity / period` tokens per second.
+    """
+
+    def __init__(self, name, capacity, period, tokens=None, updated_at=None):
+        self.name = name
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity if tokens is None else tokens
+        self.updated_at = updated_at or time.time()
+        self._refill(time.time())
+
+    def _refill(self, now):
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def reserve(self, n=1):
+        """
+        Takes `n` tokens if available. Returns 0 on success, otherwise the
+        number of seconds to wait before they will be.
+        """
+        self._refill(time.time())
+        if self.tokens >= n:
+            self.tokens -= n
+            return 0.0
+        return (n - self.tokens) / self.rate
+
+
+class MongoBucketStore:
+    """
+    Persists bucket levels in MongoDB so a restart does not start with full
+    buckets (and burst into the remote rate limits). Every reservation is
+    written, so a burst right before a crash is not forgotten.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def load(self, name):
+        try:
+            return self.collection.find_one({'_id': name})
+        except Exception as e:
+            print(f"[RateLimiter] Error loading bucket {name}: {e}")
+            return None
+
+    def save(self, name, tokens, updated_at):
+        """
+        Stores a bucket snapshot. Snapshots are written outside the limiter
+        lock and may arrive out of order, so an older one never replaces a
+        newer one.
+        """
+        try:
+            self.collection.update_one(
+                {'_id': name, 'updated_at': {'$not': {'$gt': updated_at}}},
+                {'$set': {'tokens': tokens, 'updated_at': updated_at}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            pass  # a newer snapshot is already stored
+        except Exception as e:
+            print(f"[RateLimiter] Error saving bucket {name}: {e}")
+
+
+class RateLimiter:
+    """
+    Named token buckets shared by every service in the process.
+
+    Bucket names are '<family>' or '<family>:<key>' (e.g. 'gemini:models/gemma-3-27b-it');
+    a bucket without its own limit inherits the limit of its family.
+    """
+
+    def __init__(self, limits=None, store=None):
+        self.limits = dict(limits or {})  # name/family -> (limit, period)
+        self.store = store
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+    def configure(self, name, spec):
+        with self._lock:
+            self.limits[name] = parse_rate(spec) if isinstance(spec, str) else spec
+            self.buckets.pop(name, None)
+
+    def attach_store(self, store):
+        """
+        Enables persistence; existing buckets are re-created from stored state.
+        """
+        with self._lock:
+            self.store = store
+            self.buckets.clear()
+
+    def _bucket(self, name):
+        """
+        Returns the bucket for `name` (None when unlimited). Stored state is
+        loaded without holding the lock, so a slow store never blocks the
+        other buckets.
+        """
+        with self._lock:
+            bucket = self.buckets.get(name)
+            if bucket:
+                return bucket
+            family = name.split(':', 1)[0]
+            limit = self.limits.get(name) or self.limits.get(family)
+            store = self.store
+        if not limit:
+            return None
+        state = store.load(name) if store else None
+        if state:
+            bucket = TokenBucket(name, limit[0], limit[1], state['tokens'], state['updated_at'])
+        else:
+            bucket = TokenBucket(name, limit[0], limit[1])
+        with self._lock:
+            # Another thread may have created it meanwhile
+            return self.buckets.setdefault(name, bucket)
+
+    def _reserve(self, name, n):
+        bucket = self._bucket(name)
+        if bucket is None:
+            return 0.0  # unlimited
+        with self._lock:
+            wait = bucket.reserve(n)
+            store = self.store
+            snapshot = (bucket.tokens, bucket.updated_at)
+        if wait == 0 and store:
+            store.save(name, *snapshot)
+        return wait
+
+    def available(self, name, n=1):
+        """
+        True if `n` requests could be made right now (does not consume tokens).
+        """
+        bucket = self._bucket(name)
+        if bucket is None:
+            return True
+        with self._lock:
+            bucket._refill(time.time())
+            return bucket.tokens >= n
+
+    def acquire(self, name, n=1):
+        """
+        Blocks until `n` requests are allowed on bucket `name`.
+        """
+        while True:
+            wait = self._reserve(name, n)
+            if wait <= 0:
+                return
+            if wait >= 1:
+                print(f"[RateLimiter] '{name}' budget exhausted. Waiting {wait:.1f}s...")
+            time.sleep(wait)
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    Process-wide limiter configured from Config.
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter({
+                'cbf': parse_rate(Config.RATE_LIMIT_CBF),
+                'gemini': parse_rate(Config.RATE_LIMIT_GEMINI),
+                'twitter': parse_rate(Config.RATE_LIMIT_TWITTER),
+                'threads': parse_rate(Config.RATE_LIMIT_THREADS),
+            })
+        return _rate_limiter
@@ -0,0 +1,147 @@
+from datetime import datetime
+import numpy as np
+
+# Recent form window (matches)
+RECENT_MATCHES = 10
+
+def _count(value):
+    if isinstance(value, list):
+        return len(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return 0
+
+def _mentions(items, word):
+    """
+    Number of entries in a CBF list (alteracoes, penalidades) whose values mention `word`.
+    """
+    if not isinstance(items, list):
+        return 0
+    total = 0
+    for item in items:
+        values = item.values() if isinstance(item, dict) else [item]
+        if any(isinstance(v, str) and word in v.upper() for v in values):
+            total += 1
+    return total
+
+def _match_date(match):
+    for key in ('data', 'data_jogo', 'data_partida'):
+        value = match.get(key)
+        if isinstance(value, str):
+            for fmt in ('%d/%m/%Y', '%Y-%m-%d', '%d/%m/%Y %H:%M', '%Y-%m-%d %H:%M:%S'):
+                try:
+                    return datetime.strptime(value.strip(), fmt)
+                except ValueError:
+                    continue
+    return None
+
+def _by_season(historico):
+    """
+    Normalizes historico to {season: [match, ...]}. CBF organises it by
+    season; a flat list is grouped by the year of each match.
+    """
+    if isinstance(historico, dict):
+        return {str(season): [m for m in matches if isinstance(m, dict)]
+                for season, matches in historico.items() if isinstance(matches, list)}
+    seasons = {}
+    if isinstance(historico, list):
+        for match in historico:
+            if isinstance(match, dict):
+                date = _match_date(match)
+                seasons.setdefault(str(date.year) if date else 'unknown', []).append(match)
+    return seasons
+
+def recent_matches(historico, n=RECENT_MATCHES):
+    """
+    The athlete's last `n` matches, most recent first (by date when known).
+    """
+    matches = [m for season in _by_season(historico).values() for m in season]
+    dated = [(i, _match_date(m)) for i, m in enumerate(matches)]
+    if any(date for _, date in dated):
+        dated.sort(key=lambda item: item[1] or datetime.min, reverse=True)
+    return [matches[i] for i, _ in dated[:n]]
+
+def _ratio(num, den):
+    return round(float(num) / den, 2) if den else 0.0
+
+def compute_scout(historico, recent=RECENT_MATCHES):
+    """
+    Deterministic scout summary of an athlete's historico: games per season,
+    starts vs. substitute appearances ("ENTROU"), goals and cards per game,
+    and recent form over the last `recent` matches.
+
+    One pass extracts a row per match; the aggregates are numpy reductions.
+    """
+    seasons = _by_season(historico)
+
+    season_names = []
+    rows = []  # (season_idx, entered, subbed_off, goals, yellow, red, cards, timestamp)
+    for idx, (season, matches) in enumerate(seasons.items()):
+        season_names.append(season)
+        for match in matches:
+            penalidades = match.get('penalidades')
+            date = _match_date(match)
+            rows.append((
+                idx,
+                1 if _mentions(match.get('alteracoes'), 'ENTROU') else 0,
+                1 if _mentions(match.get('alteracoes'), 'SAIU') else 0,
+                _count(match.get('gols')),
+                _mentions(penalidades, 'AMAREL'),
+                _mentions(penalidades, 'VERMELH'),
+                _count(penalidades),
+                date.timestamp() if date else np.nan,
+            ))
+
+    if not rows:
+        return {'games': 0, 'seasons': {}}
+
+    data = np.array(rows, dtype=float)
+    season_idx = data[:, 0].astype(int)
+    entered, goals, yellow, red, cards = data[:, 1], data[:, 3], data[:, 4], data[:, 5], data[:, 6]
+    starts = 1 - entered
+    games = len(data)
+
+    n_seasons = len(season_names)
+    per_season = {
+        'games': np.bincount(season_idx, minlength=n_seasons),
+        'starts': np.bincount(season_idx, weights=starts, minlength=n_seasons),
+        'goals': np.bincount(season_idx, weights=goals, minlength=n_seasons),
+        'cards': np.bincount(season_idx, weights=cards, minlength=n_seasons),
+    }
+
+    # Most recent matches: by date when known, else the order CBF returned them in
+    timestamps = data[:, 7]
+    if not np.isnan(timestamps).all():
+        order = np.argsort(np.nan_to_num(timestamps, nan=-np.inf), kind='stable')[::-1]
+    else:
+        order = np.arange(games)
+    last = order[:recent]
+    last_dates = timestamps[last]
+    last_game = None if np.isnan(last_dates).all() else datetime.fromtimestamp(np.nanmax(last_dates)).strftime('%d/%m/%Y')
+
+    return {
+        'games': games,
+        'starts': int(starts.sum()),
+        'sub_appearances': int(entered.sum()),
+        'start_share': _ratio(starts.sum(), games),
+        'subbed_off': int(data[:, 2].sum()),
+        'goals': int(goals.sum()),
+        'goals_per_game': _ratio(goals.sum(), games),
+        'cards': int(cards.sum()),
+        'yellow_cards': int(yellow.sum()),
+        'red_cards': int(red.sum()),
+        'cards_per_game': _ratio(cards.sum(), games),
+        'seasons': {
+            season: {key: int(values[i]) for key, values in per_season.items()}
+            for i, season in enumerate(season_names) if per_season['games'][i]
+        },
+        'recent': {
+            'games': int(len(last)),
+            'starts': int(starts[last].sum()),
+            'goals': int(goals[last].sum()),
+            'cards': int(cards[last].sum()),
+            'last_game': last_game,
+        },
+    }
@@ -0,0 +1,81 @@
+import re
+
+HASHTAG_RE = re.compile(r'#(\w+)')
+HANDLE_RE = re.compile(r'@\w+')
+
+TWITTER_MAX_LENGTH = 280
+THREADS_MAX_LENGTH = 500
+
+# Code point ranges Twitter counts as 1 (everything else, e.g. emoji, counts as 2)
+_TWITTER_LIGHT_RANGES = ((0, 4351), (8192, 8205), (8208, 8223), (8242, 8247))
+
+def twitter_length(text):
+    """
+    Weighted length as counted by Twitter.
+    """
+    return sum(
+        1 if any(lo <= ord(ch) <= hi for lo, hi in _TWITTER_LIGHT_RANGES) else 2
+        for ch in text
+    )
+
+def _split_hashtag_footer(text):
+    """
+    Returns (body, footer), footer being the trailing lines made only of hashtags.
+    """
+    lines = text.rstrip().split('\n')
+    footer = []
+    while lines and lines[-1].strip() and all(w.startswith('#') for w in lines[-1].split()):
+        footer.insert(0, lines.pop())
+    return '\n'.join(lines).rstrip(), '\n'.join(footer)
+
+def truncate(text, max_length, length=len):
+    """
+    Shortens text to max_length (measured with `length`) at a word boundary,
+    keeping the hashtag footer.
+    """
+    if length(text) <= max_length:
+        return text
+
+    body, footer = _split_hashtag_footer(text)
+    suffix = ('…\n\n' + footer) if footer else '…'
+    budget = max_length - length(suffix)
+    if budget <= 0:
+        return footer[:max_length] if footer else text[:max_length]
+
+    cut = body
+    while cut and length(cut) > budget:
+        cut = cut[:len(cut) - max(1, (length(cut) - budget) // 2)]
+    if ' ' in cut and len(cut) < len(body):
+        cut = cut[:cut.rfind(' ')]
+    return cut.rstrip(' ,;:-\n') + suffix
+
+def render_twitter(text):
+    return truncate(text.strip(), TWITTER_MAX_LENGTH, length=twitter_length)
+
+def parse_handle_map(value):
+    """
+    'twitter_handle:threads_handle,...' -> {'@twitter_handle': '@threads_handle'}
+    """
+    mapping = {}
+    for pair in (value or '').split(','):
+        if ':' in pair:
+            src, dst = (p.strip().lstrip('@') for p in pair.split(':', 1))
+            if src and dst:
+                mapping[f'@{src}'.lower()] = f'@{dst}'
+    return mapping
+
+def render_threads(text, handle_map=None):
+    """
+    Threads: mapped @-handles, a single topic tag (the first hashtag of the
+    footer, else of the text; the others become plain words) and its
+    500-character limit.
+    """
+    handle_map = handle_map or {}
+    text = HANDLE_RE.sub(lambda m: handle_map.get(m.group(0).lower(), m.group(0)), text.strip())
+
+    _, footer = _split_hashtag_footer(text)
+    footer_start = len(text) - len(footer) if footer else 0
+    topic = next((m.start() for m in HASHTAG_RE.finditer(text) if m.start() >= footer_start), None)
+    text = HASHTAG_RE.sub(lambda m: m.group(0) if m.start() == topic else m.group(1), text)
+
+    return truncate(text, THREADS_MAX_LENGTH)
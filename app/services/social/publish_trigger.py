@@ -0,0 +1,114 @@
+import threading
+from datetime import datetime, timezone
+from pymongo.errors import OperationFailure, PyMongoError
+
+# Outbox changes that can make a job due: a new job, or a job (re)scheduled
+# (enqueue bringing next_attempt_at forward after enrichment, retry backoff).
+# Claims, completions and releases do not wake publishers.
+CHANGE_PIPELINE = [
+    {'$match': {'$or': [
+        {'operationType': 'insert'},
+        {'updateDescription.updatedFields.next_attempt_at': {'$exists': True}},
+    ]}}
+]
+
+class PublishTrigger:
+    """
+    Wakes the publisher as soon as an outbox job may be due.
+
+    Watches the outbox collection with a change stream (jobs are enqueued or
+    brought forward the moment a contract is saved with its history). A
+    standalone mongod has no change streams; then the trigger falls back to
+    polling for due jobs every `poll_interval` seconds. Either way wait()
+    also returns when the earliest scheduled job (a retry after backoff, an
+    expired lease) becomes due.
+    """
+
+    def __init__(self, outbox, poll_interval=5.0, debounce=1.0, max_wait=300.0):
+        self.outbox = outbox
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.mode = None
+
+        self._event = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._resume_token = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='publish-trigger', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def notify(self):
+        """
+        Asks the waiting publisher to re-check the outbox.
+        """
+        self._event.set()
+
+    def wait(self):
+        """
+        Blocks until an outbox job is due, then lets `debounce` seconds pass
+        so jobs enqueued together are published in one run.
+        Returns False once the trigger was stopped.
+        """
+        while not self._stop.is_set():
+            self._event.clear()
+            until_due = self._seconds_until_due()
+            if until_due is not None and until_due <= 0:
+                self._stop.wait(self.debounce)
+                return not self._stop.is_set()
+            # Without a change stream nothing wakes us early: re-check every poll_interval
+            max_wait = self.max_wait if self.mode == 'change_stream' else self.poll_interval
+            self._event.wait(max_wait if until_due is None else min(until_due, max_wait))
+        return False
+
+    def _seconds_until_due(self):
+        next_due = self.outbox.next_due_at()
+        if next_due is None:
+            return None
+        if next_due.tzinfo is None:
+            next_due = next_due.replace(tzinfo=timezone.utc)
+        return (next_due - datetime.now(timezone.utc)).total_seconds()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._watch()
+            except OperationFailure as e:
+                if self.mode != 'change_stream':
+                    # Standalone mongod: change streams need a replica set
+                    print(f"[PublishTrigger] Change streams unavailable ({e.code}). Polling every {self.poll_interval}s.")
+                    self.mode = 'polling'
+                    return
+                # E.g. the resume point fell off the oplog: open a fresh stream
+                print(f"[PublishTrigger] Could not resume change stream: {e}. Restarting it...")
+                self._resume_token = None
+                self._stop.wait(self.poll_interval)
+            except PyMongoError as e:
+                print(f"[PublishTrigger] Change stream interrupted: {e}. Resuming...")
+                self._stop.wait(self.poll_interval)
+
+    def _watch(self):
+        with self.outbox.collection.watch(CHANGE_PIPELINE, resume_after=self._resume_token) as stream:
+            if self.mode != 'change_stream':
+                print("[PublishTrigger] Watching the outbox through a change stream.")
+            self.mode = 'change_stream'
+            # Re-check anything enqueued before the stream opened
+            self._event.set()
+            while not self._stop.is_set() and stream.alive:
+                change = stream.try_next()
+                self._resume_token = stream.resume_token
+                if change is not None:
+                    self._event.set()
+                elif self._stop.wait(0.2):
+                    return
@@ -0,0 +1,115 @@
+import queue
+import threading
+
+
+class PublishWorker:
+    """
+    Publishes contracts to a single SocialProvider from its own thread and queue.
+
+    Each provider paces itself (its rate bucket is acquired inside publish())
+    and retries failed posts with exponential backoff, so a slow or
+    rate-limited platform never delays the others. After `max_failures`
+    consecutive failed contracts the worker considers the platform down and
+    skips the rest of its queue; those contracts stay pending for the next cycle.
+
+    Contracts claimed from the outbox (ContractRepository.claim_pending_posts)
+    give their job back when done: rescheduled with backoff after a failure,
+    released untried when skipped.
+    """
+
+    def __init__(self, provider, repository, max_attempts=3, backoff_base=30, backoff_max=600, max_failures=3):
+        self.provider = provider
+        self.repository = repository
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_failures = max_failures
+
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+        self._consecutive_failures = 0
+        self._last_error = None
+        self.stats = {'posted': 0, 'failed': 0, 'skipped': 0}
+
+    @property
+    def name(self):
+        return self.provider.name
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f'publish-{self.name}', daemon=True)
+        self._thread.start()
+
+    def submit(self, contract, text):
+        """
+        Queues a contract with its platform-neutral post text.
+        """
+        self._queue.put((contract, text))
+
+    def new_cycle(self):
+        """
+        Gives a platform that was considered down another chance.
+        """
+        self._consecutive_failures = 0
+
+    def join(self):
+        """
+        Blocks until everything submitted so far has been handled.
+        """
+        self._queue.join()
+
+    def stop(self):
+        self._stop.set()
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop.is_set():
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                contract, text = item
+                if self._consecutive_failures >= self.max_failures:
+                    self.stats['skipped'] += 1
+                    self.repository.release_post(contract)
+                    continue
+                if self._publish_with_retry(contract, text):
+                    self._consecutive_failures = 0
+                    self.stats['posted'] += 1
+                else:
+                    self._consecutive_failures += 1
+                    self.stats['failed'] += 1
+                    self.repository.retry_post_later(contract, self._last_error)
+                    if self._consecutive_failures >= self.max_failures:
+                        print(f"[PublishWorker:{self.name}] {self._consecutive_failures} failures in a row. Pausing until next cycle.")
+            finally:
+                self._queue.task_done()
+
+    def _publish_with_retry(self, contract, text):
+        platform_name = self.name
+        rendered = self.provider.render(text)
+        self._last_error = None
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                print(f"[PublishWorker:{platform_name}] Posting {contract.get('nome', 'Unknown')} (attempt {attempt})...")
+                post_id = self.provider.publish(rendered)
+                if post_id:
+                    self.repository.mark_as_posted(contract['_id'], platform_name, post_id)
+                    print(f"[PublishWorker:{platform_name}] Marked as posted.")
+                    return True
+                print(f"[PublishWorker:{platform_name}] Failed to post.")
+                self._last_error = 'no post id returned'
+            except Exception as e:
+                print(f"[PublishWorker:{platform_name}] Error publishing: {e}")
+                self._last_error = str(e)
+
+            if attempt < self.max_attempts:
+                delay = min(self.backoff_base * 2 ** (attempt - 1), self.backoff_max)
+                if self._stop.wait(delay):
+                    return False
+        return False
@@ -1,18 +1,25 @@
-from abc import ABC, abstractmethod
-
-class SocialProvider(ABC):
-    @abstractmethod
-    def publish(self, text: str) -> str | None:
-        """
-        Publishes the given text to the platform.
-        Returns the ID of the published post if successful, None otherwise.
-        """
-        pass
-    
-    @property
-    @abstractmethod
-    def name(self) -> str:
-        """
-        Returns the name of the provider (e.g., 'twitter', 'threads').
-        """
-        pass
+from abc import ABC, abstractmethod
+
+class SocialProvider(ABC):
+    @abstractmethod
+    def publish(self, text: str) -> str | None:
+        """
+        Publishes the given text to the platform.
+        Returns the ID of the published post if successful, None otherwise.
+        """
+        pass
+    
+    def render(self, text: str) -> str:
+        """
+        Adapts the platform-neutral post text (generated once per contract)
+        to this platform: length limits, handles, hashtag rules.
+        """
+        return text
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """
+        Returns the name of the provider (e.g., 'twitter', 'threads').
+        """
+        pass
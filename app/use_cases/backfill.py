@@ -0,0 +1,164 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from app.services.cbf_service import CaptchaRejectedError
+
+def generate_date_range(start_date_str, end_date_str):
+    start_date = datetime.strptime(start_date_str, "%d/%m/%Y")
+    end_date = datetime.strptime(end_date_str, "%d/%m/%Y")
+
+    return [
+        (start_date + timedelta(days=i)).strftime("%d/%m/%Y")
+        for i in range((end_date - start_date).days + 1)
+    ]
+
+class BackfillUseCase:
+    """
+    Searches the BID for every date in a range and saves the contracts found.
+
+    Dates run concurrently (one worker per CBF session, pacing comes from the
+    shared 'cbf' rate bucket), failed dates are retried with exponential
+    backoff, and per-date progress is stored in MongoDB so an interrupted
+    backfill resumes where it stopped.
+    """
+
+    def __init__(self, cbf_service, gemini_service, repository, enrich_use_case=None,
+                 max_attempts=5, backoff_base=2, backoff_max=60, source='backfill'):
+        self.cbf_service = cbf_service
+        self.gemini_service = gemini_service
+        self.repository = repository
+        # Optional EnrichAthleteUseCase: fetch history for the contracts found in the same pass
+        self.enrich_use_case = enrich_use_case
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Tag stored on contracts this use case inserts (see ContractRepository.save_contracts)
+        self.source = source
+
+    @staticmethod
+    def job_id(uf, codigo_clube):
+        return f"{uf}:{codigo_clube}"
+
+    def _search_date(self, date_str, uf, codigo_clube):
+        """
+        One captcha -> search attempt. Returns the results list, or None on failure.
+        """
+        with self.cbf_service.session_scope() as session:
+            base64_str = self.cbf_service.get_captcha_base64(session=session)
+            if not base64_str:
+                return None
+            captcha_text = self.gemini_service.solve_captcha(base64_str)
+            try:
+                results = self.cbf_service.perform_search(
+                    captcha_text, search_date=date_str, session=session, uf=uf, codigo_clube=codigo_clube
+                )
+            except CaptchaRejectedError:
+                self.gemini_service.report_captcha_result(captcha_text, False)
+                return None
+        # None is a request failure, not a verdict on the captcha
+        if results is not None:
+            self.gemini_service.report_captcha_result(captcha_text, True)
+        return results
+
+    def _process_date(self, date_str, uf, codigo_clube, attempts_done=0):
+        """
+        Searches a date until it succeeds or max_attempts is reached.
+        Returns (results, attempts, error).
+        """
+        attempt = attempts_done
+        error = None
+        while attempt < self.max_attempts:
+            attempt += 1
+            try:
+                results = self._search_date(date_str, uf, codigo_clube)
+                if results is not None:
+                    return results, attempt, None
+                error = 'search failed'
+            except Exception as e:
+                error = str(e)
+
+            if attempt < self.max_attempts:
+                delay = min(self.backoff_base * 2 ** (attempt - 1), self.backoff_max)
+                print(f"[BackfillUseCase] {date_str}: attempt {attempt} failed ({error}). Retrying in {delay}s...")
+                time.sleep(delay)
+        return None, attempt, error
+
+    def _run_date(self, job_id, date_str, uf, codigo_clube, attempts_done):
+        results, attempts, error = self._process_date(date_str, uf, codigo_clube, attempts_done)
+        if results is None:
+            print(f"[BackfillUseCase] {date_str}: giving up after {attempts} attempts ({error}).")
+            self.repository.update_backfill_progress(job_id, date_str, 'failed', attempts=attempts, error=error)
+            return False, 0
+
+        saved = self.repository.save_contracts(results, source=self.source) if results else []
+        enriched = 0
+        if self.enrich_use_case:
+            for athlete in self.repository.contracts_needing_history(results):
+                if self.enrich_use_case.execute(athlete, check_existing=False):
+                    enriched += 1
+
+        self.repository.update_backfill_progress(
+            job_id, date_str, 'done',
+            attempts=attempts, results=len(results), new_contracts=len(saved), enriched=enriched, error=None
+        )
+        return True, len(results)
+
+    def execute(self, start_date, end_date, uf, codigo_clube, workers=None, force=False):
+        """
+        Backfills [start_date, end_date] (dd/mm/YYYY). Dates already marked as
+        done are skipped unless force is set; failed dates resume their attempt
+        count. Returns a summary dict.
+        """
+        return self.run_dates(generate_date_range(start_date, end_date), uf, codigo_clube, workers, force)
+
+    def run_dates(self, dates, uf, codigo_clube, workers=None, force=False):
+        """
+        Same as execute for an explicit list of dates, started in the given order.
+        """
+        job_id = self.job_id(uf, codigo_clube)
+        progress = {} if force else self.repository.get_backfill_progress(job_id)
+
+        pending = []
+        for date_str in dates:
+            doc = progress.get(date_str)
+            if doc and doc.get('status') == 'done':
+                continue
+            # A date that exhausted its attempts in a previous run gets a fresh budget
+            attempts_done = doc.get('attempts', 0) if doc else 0
+            if attempts_done >= self.max_attempts:
+                attempts_done = 0
+            pending.append((date_str, attempts_done))
+
+        workers = workers or self.cbf_service.max_concurrency
+        print(f"[BackfillUseCase] Job {job_id}: {len(dates)} dates, {len(dates) - len(pending)} already done, "
+              f"{len(pending)} to process with {workers} worker(s).")
+
+        summary = {'dates': len(dates), 'skipped': len(dates) - len(pending), 'done': 0, 'failed': 0, 'results': 0}
+        started_at = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._run_date, job_id, date_str, uf, codigo_clube, attempts_done): date_str
+                for date_str, attempts_done in pending
+            }
+            for future in as_completed(futures):
+                date_str = futures[future]
+                try:
+                    ok, n_results = future.result()
+                except Exception as e:
+                    print(f"[BackfillUseCase] {date_str}: unexpected error: {e}")
+                    ok, n_results = False, 0
+
+                summary['done' if ok else 'failed'] += 1
+                summary['results'] += n_results
+                finished = summary['done'] + summary['failed']
+                rate = finished / (max(time.monotonic() - started_at, 1e-6) / 60)
+
+                print(f"[BackfillUseCase] {date_str}: {'done' if ok else 'FAILED'} ({n_results} items). "
+                      f"{finished}/{len(pending)} dates, {rate:.1f} dates/min.")
+
+        summary['dates_per_minute'] = round(
+            (summary['done'] + summary['failed']) / max(time.monotonic() - started_at, 1e-6) * 60, 2
+        )
+        print(f"[BackfillUseCase] Job {job_id} finished: {summary}")
+        return summary
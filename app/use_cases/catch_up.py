@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+DATE_FORMAT = "%d/%m/%Y"
+
+class CatchUpUseCase:
+    """
+    Searches dates the live monitor missed.
+
+    The live search only covers the current date, so days the process was
+    down (and whatever was published on the last searched day after its last
+    search) are never seen. Each club's last successful live search is
+    stored; every date from it up to yesterday that the backfill progress
+    does not mark as done (plus earlier catch-up dates that failed) is
+    searched again through BackfillUseCase, newest first, at most `max_days`
+    back.
+    """
+
+    def __init__(self, backfill_use_case, repository, uf, codigo_clube, max_days=30):
+        self.backfill_use_case = backfill_use_case
+        self.repository = repository
+        self.uf = uf
+        self.codigo_clube = codigo_clube
+        self.max_days = max_days
+
+    @property
+    def job_id(self):
+        return self.backfill_use_case.job_id(self.uf, self.codigo_clube)
+
+    def record_search(self, date_str):
+        """
+        Marks a successful live search of `date_str` for the club.
+        """
+        return self.repository.record_search(self.job_id, date_str)
+
+    def missing_dates(self, today=None):
+        """
+        Dates (dd/mm/YYYY, newest first) that still need a catch-up search.
+        """
+        today = (today or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        state = self.repository.get_search_state(self.job_id)
+        if not state or not state.get('last_searched_date'):
+            # Nothing searched yet: the initial range is for backfill.py
+            return []
+
+        oldest = today - timedelta(days=self.max_days)
+        last_searched = max(datetime.strptime(state['last_searched_date'], DATE_FORMAT), oldest)
+        progress = self.repository.get_backfill_progress(self.job_id)
+
+        missing = set()
+        day = last_searched
+        while day < today:
+            missing.add(day)
+            day += timedelta(days=1)
+        for date_str, doc in progress.items():
+            if doc.get('status') == 'failed':
+                day = datetime.strptime(date_str, DATE_FORMAT)
+                if oldest <= day < today:
+                    missing.add(day)
+
+        return [
+            day.strftime(DATE_FORMAT) for day in sorted(missing, reverse=True)
+            if progress.get(day.strftime(DATE_FORMAT), {}).get('status') != 'done'
+        ]
+
+    def execute(self, today=None):
+        """
+        Runs the catch-up searches. Returns the backfill summary, or None when nothing was missing.
+        """
+        dates = self.missing_dates(today)
+        if not dates:
+            return None
+        print(f"[CatchUpUseCase] {len(dates)} missed date(s) for {self.job_id}: {', '.join(dates)}")
+        return self.backfill_use_case.run_dates(dates, self.uf, self.codigo_clube)
@@ -1,55 +1,106 @@
-import time
-
-class EnrichAthleteUseCase:
-    def __init__(self, cbf_service, gemini_service, repository):
-        self.cbf_service = cbf_service
-        self.gemini_service = gemini_service
-        self.repository = repository
-
-    def execute(self, athlete, max_retries=5):
-        """
-        Fetches history for a single athlete and saves it (upsert).
-        """
-        codigo_atleta = athlete.get('codigo_atleta')
-        if not codigo_atleta:
-            print("[EnrichUseCase] Skipping athlete without 'codigo_atleta'.")
-            return False
-
-        # Check if we already have history for this contract
-        if self.repository.has_history_for_contract(athlete):
-            print(f"[EnrichUseCase] Skipping enrichment for {athlete.get('nome', 'Unknown')} (already exists).")
-            return True
-
-        print(f"\n[EnrichUseCase] Enriching: {athlete.get('nome', 'Unknown')} ({codigo_atleta})...")
-
-        history_data = None
-        for attempt in range(max_retries):
-            try:
-                # 1. Fetch Captcha
-                b64_hist = self.cbf_service.get_captcha_base64()
-                cap_hist = self.gemini_service.solve_captcha(b64_hist)
-                
-                # 2. Fetch History
-                history_resp = self.cbf_service.get_atleta_historico(codigo_atleta, cap_hist)
-                
-                if history_resp is not None:
-                    history_data = history_resp
-                    break
-                else:
-                    print(f"[EnrichUseCase] History fetch failed (attempt {attempt+1}). Retrying...")
-                    time.sleep(1)
-            except Exception as e:
-                print(f"[EnrichUseCase] Error: {e}")
-                time.sleep(1)
-        
-        if history_data:
-            # Merge
-            athlete['historico'] = history_data
-            
-            # Save
-            self.repository.save_contract_with_history(athlete)
-            print("[EnrichUseCase] History merged and saved.")
-            return True
-        else:
-            print(f"[EnrichUseCase] Failed to fetch history for {codigo_atleta}.")
-            return False
+import time
+from app.services.cbf_service import CaptchaRejectedError
+
+class EnrichAthleteUseCase:
+    def __init__(self, cbf_service, gemini_service, repository, prefetcher=None):
+        self.cbf_service = cbf_service
+        self.gemini_service = gemini_service
+        self.repository = repository
+        # Optional CaptchaPrefetcher; when running, captchas come already solved
+        self.prefetcher = prefetcher
+
+    def _get_captcha(self):
+        """
+        Returns (captcha_text, session). The history request must go through the
+        CBF session the captcha belongs to; the caller releases it afterwards.
+        """
+        if self.prefetcher:
+            captcha_text, session = self.prefetcher.get(timeout=120)
+            if captcha_text:
+                return captcha_text, session
+
+        session = self.cbf_service.checkout_session()
+        try:
+            b64_hist = self.cbf_service.get_captcha_base64(session=session)
+            captcha_text = self.gemini_service.solve_captcha(b64_hist) if b64_hist else None
+        except Exception:
+            self.cbf_service.release_session(session)
+            raise
+        return captcha_text, session
+
+    def execute(self, athlete, max_retries=5, check_existing=True):
+        """
+        Fetches history for a single athlete and saves it (upsert).
+        Pass check_existing=False when the caller already filtered the athletes
+        with ContractRepository.contracts_needing_history.
+        """
+        codigo_atleta = athlete.get('codigo_atleta')
+        if not codigo_atleta:
+            print("[EnrichUseCase] Skipping athlete without 'codigo_atleta'.")
+            return False
+
+        # Check if we already have history for this contract
+        if check_existing and self.repository.has_history_for_contract(athlete):
+            print(f"[EnrichUseCase] Skipping enrichment for {athlete.get('nome', 'Unknown')} (already exists).")
+            return True
+
+        # Another contract of the same athlete may have fetched it recently
+        cached = self.repository.get_athlete_history(codigo_atleta)
+        if cached:
+            athlete['historico'] = cached
+            self.repository.save_contract_with_history(athlete, store_history=False)
+            print(f"[EnrichUseCase] Reused cached history for {athlete.get('nome', 'Unknown')} ({codigo_atleta}).")
+            return True
+
+        print(f"\n[EnrichUseCase] Enriching: {athlete.get('nome', 'Unknown')} ({codigo_atleta})...")
+        history_data = self.fetch_history(codigo_atleta, max_retries=max_retries)
+        
+        if history_data:
+            # Merge
+            athlete['historico'] = history_data
+            
+            # Save
+            self.repository.save_contract_with_history(athlete)
+            print("[EnrichUseCase] History merged and saved.")
+            return True
+        else:
+            print(f"[EnrichUseCase] Failed to fetch history for {codigo_atleta}.")
+            return False
+
+    def fetch_history(self, codigo_atleta, max_retries=5):
+        """
+        Captcha -> atleta-historico-json with retries. Returns the history or None.
+        """
+        history_data = None
+        for attempt in range(max_retries):
+            session = None
+            try:
+                # 1. Fetch Captcha (prefetched when available)
+                cap_hist, session = self._get_captcha()
+                if not cap_hist:
+                    print(f"[EnrichUseCase] Could not get a captcha (attempt {attempt+1}). Retrying...")
+                    time.sleep(1)
+                    continue
+                
+                # 2. Fetch History (through the session the captcha belongs to)
+                history_resp = self.cbf_service.get_atleta_historico(codigo_atleta, cap_hist, session=session)
+                
+                if history_resp is not None:
+                    self.gemini_service.report_captcha_result(cap_hist, True)
+                    history_data = history_resp
+                    break
+                else:
+                    print(f"[EnrichUseCase] History fetch failed (attempt {attempt+1}). Retrying...")
+                    time.sleep(1)
+            except CaptchaRejectedError:
+                self.gemini_service.report_captcha_result(cap_hist, False)
+                print(f"[EnrichUseCase] Captcha rejected (attempt {attempt+1}). Retrying...")
+                time.sleep(1)
+            except Exception as e:
+                print(f"[EnrichUseCase] Error: {e}")
+                time.sleep(1)
+            finally:
+                # Frees the session so the next captcha is fetched while we save
+                self.cbf_service.release_session(session)
+
+        return history_data
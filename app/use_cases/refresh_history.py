@@ -0,0 +1,41 @@
+class RefreshHistoryUseCase:
+    """
+    Re-fetches the history of athletes with recent contracts once their stored
+    history is older than Config.HISTORY_TTL_HOURS. The repository diffs the
+    response season by season, so only changes are written.
+    """
+
+    def __init__(self, enrich_use_case, repository, days):
+        # Reuses EnrichAthleteUseCase's captcha -> history flow
+        self.enrich_use_case = enrich_use_case
+        self.repository = repository
+        self.days = days
+
+    def execute(self, max_athletes=None):
+        """
+        Returns the number of athletes refreshed.
+        """
+        if not self.days:
+            return 0
+
+        codigos = self.repository.recent_athlete_codes(self.days)
+        fresh = self.repository.fresh_history_codes(codigos)
+        stale = [c for c in codigos if c not in fresh]
+        if max_athletes is not None:
+            stale = stale[:max_athletes]
+        if not stale:
+            print("[RefreshHistoryUseCase] All recent athletes have fresh history.")
+            return 0
+
+        print(f"[RefreshHistoryUseCase] Refreshing history for {len(stale)} of {len(codigos)} recent athlete(s)...")
+        refreshed = 0
+        for codigo_atleta in stale:
+            history = self.enrich_use_case.fetch_history(codigo_atleta)
+            if history is None:
+                print(f"[RefreshHistoryUseCase] Could not refresh {codigo_atleta}.")
+                continue
+            if self.repository.save_athlete_history(codigo_atleta, history):
+                refreshed += 1
+
+        print(f"[RefreshHistoryUseCase] Refreshed {refreshed}/{len(stale)} athlete(s).")
+        return refreshed
@@ -1,45 +1,61 @@
-import time
-
-class SearchBidUseCase:
-    def __init__(self, cbf_service, gemini_service):
-        self.cbf_service = cbf_service
-        self.gemini_service = gemini_service
-
-    def execute(self, max_retries=10):
-        """
-        Executes the search process: Fetch Captcha -> Solve -> Search.
-        Returns a list of results (athletes) or None if search failed after retries.
-        """
-        print("\n[SearchUseCase] Starting search process...")
-        
-        for i in range(max_retries):
-            # We can let the controller handle rate limiting, or handle it here?
-            # Ideally the use case just does "one attempt" or "one logical operation".
-            # But since "searching" implies "beating the captcha", the retry loop fits here.
-            
-            try:
-                print(f"[SearchUseCase] Attempt {i+1}/{max_retries}...")
-                
-                # 1. Fetch Captcha
-                base64_str = self.cbf_service.get_captcha_base64()
-                
-                # 2. Solve Captcha
-                captcha_text = self.gemini_service.solve_captcha(base64_str)
-                print(f"[SearchUseCase] Captcha Solved: {captcha_text}")
-                
-                # 3. Perform Search
-                results = self.cbf_service.perform_search(captcha_text)
-                
-                if results is not None:
-                    print(f"[SearchUseCase] Success! Found {len(results)} items.")
-                    return results
-                else:
-                    print("[SearchUseCase] Search failed (invalid captcha). Retrying...")
-                    time.sleep(1)
-            
-            except Exception as e:
-                print(f"[SearchUseCase] Error: {e}")
-                time.sleep(1)
-        
-        print("[SearchUseCase] Failed to get valid results after max retries.")
-        return []
+import time
+from app.services.cbf_service import CaptchaRejectedError
+
+class SearchBidUseCase:
+    def __init__(self, cbf_service, gemini_service):
+        self.cbf_service = cbf_service
+        self.gemini_service = gemini_service
+
+    def execute(self, max_retries=10, search_date=None, uf=None, codigo_clube=None):
+        """
+        Executes the search process: Fetch Captcha -> Solve -> Search.
+        uf/codigo_clube default to the configured club (see CBFService.perform_search).
+        Returns a list of results (athletes) or None if search failed after retries.
+        """
+        print(f"\n[SearchUseCase] Starting search process{f' for {uf}:{codigo_clube}' if uf else ''}...")
+        
+        for i in range(max_retries):
+            # We can let the controller handle rate limiting, or handle it here?
+            # Ideally the use case just does "one attempt" or "one logical operation".
+            # But since "searching" implies "beating the captcha", the retry loop fits here.
+            
+            try:
+                print(f"[SearchUseCase] Attempt {i+1}/{max_retries}...")
+                
+                # The captcha is bound to the CBF session that fetched it
+                with self.cbf_service.session_scope() as session:
+                    # 1. Fetch Captcha
+                    base64_str = self.cbf_service.get_captcha_base64(session=session)
+                    if not base64_str:
+                        print("[SearchUseCase] Could not fetch captcha. Retrying...")
+                        time.sleep(1)
+                        continue
+                    
+                    # 2. Solve Captcha
+                    captcha_text = self.gemini_service.solve_captcha(base64_str)
+                    print(f"[SearchUseCase] Captcha Solved: {captcha_text}")
+                    
+                    # 3. Perform Search
+                    results = self.cbf_service.perform_search(
+                        captcha_text, search_date=search_date, session=session, uf=uf, codigo_clube=codigo_clube
+                    )
+                
+                if results is not None:
+                    self.gemini_service.report_captcha_result(captcha_text, True)
+                    print(f"[SearchUseCase] Success! Found {len(results)} items.")
+                    return results
+                else:
+                    # Network error or expired session: CBF never checked the captcha
+                    print("[SearchUseCase] Search request failed. Retrying...")
+                    time.sleep(1)
+            
+            except CaptchaRejectedError:
+                self.gemini_service.report_captcha_result(captcha_text, False)
+                print("[SearchUseCase] Search failed (invalid captcha). Retrying...")
+                time.sleep(1)
+            except Exception as e:
+                print(f"[SearchUseCase] Error: {e}")
+                time.sleep(1)
+        
+        print("[SearchUseCase] Failed to get valid results after max retries.")
+        return None
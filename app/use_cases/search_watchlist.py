@@ -0,0 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor
+
+def parse_watchlist(value):
+    """
+    'UF:CLUB[:name],...' -> [{'uf', 'codigo_clube', 'nome'}, ...]
+    """
+    targets = []
+    for item in (value or '').split(','):
+        parts = [p.strip() for p in item.split(':')]
+        if len(parts) < 2 or not parts[0] or not parts[1]:
+            continue
+        targets.append({
+            'uf': parts[0].upper(),
+            'codigo_clube': parts[1],
+            'nome': parts[2] if len(parts) > 2 and parts[2] else None,
+        })
+    return targets
+
+def contract_key(contract):
+    for field in ('id_contrato', 'contrato_numero'):
+        if contract.get(field):
+            return (field, contract[field])
+    return ('athlete', contract.get('codigo_atleta'), contract.get('codigo_clube'))
+
+def merge_results(targets, outcomes):
+    """
+    Combines per-target search outcomes (a results list, or None when the
+    search failed). Returns (results, searched): every contract at most once
+    and the targets whose search succeeded.
+    """
+    results, seen, searched = [], set(), []
+    for target, found in zip(targets, outcomes):
+        if found is None:
+            print(f"[WatchlistUseCase] Search failed for {target['uf']}:{target['codigo_clube']}.")
+            continue
+        searched.append(target)
+        for contract in found:
+            key = contract_key(contract)
+            if key not in seen:
+                seen.add(key)
+                results.append(contract)
+    print(f"[WatchlistUseCase] {len(searched)}/{len(targets)} target(s) searched, {len(results)} unique item(s).")
+    return results, searched
+
+class SearchWatchlistUseCase:
+    """
+    Searches the BID for every (UF, club) target of the watchlist.
+
+    Targets come from the 'watchlist' collection when it has any, else from
+    the configured defaults, and are read again every cycle. Searches run
+    concurrently on the shared CBF session pool (one worker per session)
+    and are paced by the shared 'cbf' rate bucket, so adding clubs adds
+    searches but no sessions or captcha solvers.
+    """
+
+    def __init__(self, search_use_case, repository, default_targets, workers=1):
+        self.search_use_case = search_use_case
+        self.repository = repository
+        self.default_targets = default_targets
+        self.workers = workers
+
+    def targets(self):
+        return self.repository.get_watchlist() or self.default_targets
+
+    def execute(self, search_date=None):
+        """
+        Returns (results, searched): every contract found (each at most once
+        across targets) and the targets whose search succeeded.
+        """
+        targets = self.targets()
+        print(f"\n[WatchlistUseCase] Searching {len(targets)} target(s)...")
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(targets)))) as executor:
+            outcomes = list(executor.map(
+                lambda t: self.search_use_case.execute(search_date=search_date, uf=t['uf'], codigo_clube=t['codigo_clube']),
+                targets
+            ))
+        return merge_results(targets, outcomes)
@@ -1,54 +1,104 @@
-import time
-from app.services.social.social_provider import SocialProvider
-
-class SyncSocialUseCase:
-    def __init__(self, repository, gemini_service, providers: list[SocialProvider]):
-        self.repository = repository
-        self.gemini_service = gemini_service
-        self.providers = providers
-
-    def execute(self, limit=5, delay_seconds=65):
-        """
-        Processes pending posts for all registered social providers.
-        """
-        print("\n[SyncSocialUseCase] Syncing Pending Posts for all providers ---")
-        
-        for provider in self.providers:
-            platform_name = provider.name
-            print(f"\n--- Checking {platform_name} ---")
-            
-            pending = self.repository.get_pending_posts(platform_name, limit=limit)
-             
-            if not pending:
-                print(f"No pending posts for {platform_name}.")
-                continue
-
-            print(f"Found {len(pending)} pending posts for {platform_name}. Processing...")
-            
-            for i, contract in enumerate(pending):
-                try:
-                    print(f"Posting {i+1}/{len(pending)}: {contract.get('nome', 'Unknown')} to {platform_name}...")
-                    
-                    # Generate text - reusing the same logic for all platforms for now
-                    # Ideally we might want platform-specific prompts later.
-                    post_text = self.gemini_service.generate_tweet_text(contract)
-                    
-                    post_id = provider.publish(post_text)
-                    
-                    if post_id:
-                        self.repository.mark_as_posted(contract['_id'], platform_name, post_id)
-                        print(f"Marked as posted on {platform_name}.")
-                        
-                        # Rate limit delay between posts on the same platform
-                        if i < len(pending) - 1:
-                            print(f"Waiting {delay_seconds}s for rate limit safety on {platform_name}...")
-                            time.sleep(delay_seconds)
-                    else:
-                        print(f"Failed to post to {platform_name}.")
-                        # Continue to next item or break? 
-                        # If simple failure, maybe break to avoid spamming errors if service is down.
-                        break
-    
-                except Exception as e:
-                    print(f"Error executing sync for {platform_name}: {e}")
-                    break
+from app.services.social.social_provider import SocialProvider
+from app.services.social.publish_worker import PublishWorker
+from app.models.outbox_repository import default_owner
+from app.config import Config
+
+class SyncSocialUseCase:
+    def __init__(self, repository, gemini_service, providers: list[SocialProvider]):
+        self.repository = repository
+        self.gemini_service = gemini_service
+        self.providers = providers
+        # provider name -> PublishWorker, started on first use and kept across cycles
+        self.workers = {}
+        # Lease owner of the outbox jobs this process claims
+        self.owner = default_owner()
+
+    def ensure_post(self, contract):
+        """
+        Returns the platform-neutral post for a contract, generating and storing
+        it the first time. Every platform (and every retry) reuses it, so each
+        contract costs exactly one LLM call.
+        """
+        post = contract.get('post')
+        if not post or not post.get('text'):
+            post = self.gemini_service.generate_post(contract)
+            post = self.repository.save_post(contract['_id'], post)
+            contract['post'] = post
+        return post
+
+    def ensure_posts(self, contracts):
+        """
+        Batch version of ensure_post: contracts without a stored post are
+        generated together (GeminiService.generate_posts) and stored.
+        Contracts sharing an '_id' get the same post.
+        """
+        missing = {}
+        for contract in contracts:
+            post = contract.get('post')
+            if not post or not post.get('text'):
+                missing.setdefault(str(contract['_id']), contract)
+        if not missing:
+            return
+
+        print(f"[SyncSocialUseCase] Generating {len(missing)} post(s)...")
+        posts = self.gemini_service.generate_posts(list(missing.values()))
+        stored = {key: self.repository.save_post(missing[key]['_id'], post) for key, post in posts.items()}
+        for contract in contracts:
+            post = stored.get(str(contract['_id']))
+            if post and not contract.get('post'):
+                contract['post'] = post
+
+    def worker_for(self, provider):
+        """
+        The provider's PublishWorker, started on first use.
+        """
+        worker = self.workers.get(provider.name)
+        if worker is None:
+            worker = PublishWorker(
+                provider,
+                self.repository,
+                max_attempts=Config.PUBLISH_MAX_ATTEMPTS,
+                backoff_base=Config.PUBLISH_BACKOFF_SECONDS
+            )
+            self.workers[provider.name] = worker
+        worker.start()
+        return worker
+
+    def execute(self, limit=5):
+        """
+        Processes pending posts for all registered social providers.
+        Up to `limit` due jobs per provider are claimed from the outbox, so
+        other publisher processes never get the same ones. Each provider
+        publishes from its own worker (see PublishWorker); returns once every
+        queued post was handled.
+        """
+        print("\n[SyncSocialUseCase] Syncing Pending Posts for all providers ---")
+
+        pending_by_provider = {
+            provider.name: self.repository.claim_pending_posts(provider.name, self.owner, limit=limit)
+            for provider in self.providers
+        }
+        # Every post still to be written, in as few LLM calls as possible
+        self.ensure_posts([c for pending in pending_by_provider.values() for c in pending])
+        
+        # One worker per provider: platforms publish concurrently, each at its own pace
+        for provider in self.providers:
+            platform_name = provider.name
+            pending = pending_by_provider[platform_name]
+            if not pending:
+                print(f"No pending posts for {platform_name}.")
+                continue
+
+            print(f"Found {len(pending)} pending posts for {platform_name}. Queueing...")
+            worker = self.worker_for(provider)
+            worker.new_cycle()
+            for contract in pending:
+                try:
+                    # Generated once per contract, rendered locally per platform
+                    worker.submit(contract, self.ensure_post(contract)['text'])
+                except Exception as e:
+                    print(f"Error preparing post for {platform_name}: {e}")
+                    self.repository.retry_post_later(contract, str(e))
+
+        for worker in self.workers.values():
+            worker.join()
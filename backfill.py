@@ -0,0 +1,44 @@
+import argparse
+from app.services.cbf_service import CBFService
+from app.services.gemini_service import GeminiService
+from app.models.contract_repository import ContractRepository
+from app.services.rate_limiter import get_rate_limiter, MongoBucketStore
+from app.use_cases.backfill import BackfillUseCase
+from app.use_cases.enrich_athlete import EnrichAthleteUseCase
+from app.config import Config
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Backfill BID contracts for a date range (resumable).")
+    parser.add_argument('--start', required=True, help="First date (dd/mm/YYYY)")
+    parser.add_argument('--end', required=True, help="Last date (dd/mm/YYYY)")
+    parser.add_argument('--uf', default=Config.SEARCH_UF, help="Club state (default: %(default)s)")
+    parser.add_argument('--club', default=Config.SEARCH_CLUB_CODE, help="CBF club code (default: %(default)s)")
+    parser.add_argument('--enrich', action='store_true', help="Also fetch athlete history in the same pass")
+    parser.add_argument('--workers', type=int, default=None, help="Concurrent dates (default: CBF session pool size)")
+    parser.add_argument('--max-attempts', type=int, default=5, help="Attempts per date before marking it failed")
+    parser.add_argument('--force', action='store_true', help="Ignore stored progress and redo every date")
+    return parser
+
+def run_backfill(start, end, uf, club, enrich=False, workers=None, max_attempts=5, force=False):
+    cbf_service = CBFService()
+    gemini_service = GeminiService()
+    repository = ContractRepository()
+
+    # Start from the persisted CBF budget instead of a full bucket
+    if Config.RATE_LIMIT_PERSIST and repository.db is not None:
+        get_rate_limiter().attach_store(MongoBucketStore(repository.db['rate_limits']))
+
+    cbf_service.initialize_session()
+
+    enrich_use_case = EnrichAthleteUseCase(cbf_service, gemini_service, repository) if enrich else None
+    backfill = BackfillUseCase(cbf_service, gemini_service, repository,
+                               enrich_use_case=enrich_use_case, max_attempts=max_attempts)
+    return backfill.execute(start, end, uf, club, workers=workers, force=force)
+
+def main():
+    args = build_parser().parse_args()
+    run_backfill(args.start, args.end, args.uf, args.club, enrich=args.enrich,
+                 workers=args.workers, max_attempts=args.max_attempts, force=args.force)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import sys
+from app.config import Config
+from app.services.gemini_service import GeminiService
+from app.services.captcha.corpus import CaptchaCorpus
+from app.services.captcha.benchmark import CaptchaBenchmark
+
+def main():
+    # Optional: limit the number of replayed captchas (each Gemini backend costs one call per sample)
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    corpus = CaptchaCorpus(Config.CAPTCHA_CORPUS_DIR)
+    gemini_service = GeminiService()
+
+    backends = {}
+    if gemini_service.local_solver:
+        backends['local'] = lambda image: gemini_service.solve_captcha_with_model(image, 'local')
+    for model in GeminiService.TEXT_MODELS:
+        backends[model] = lambda image, model=model: gemini_service.solve_captcha_with_model(image, model)
+
+    benchmark = CaptchaBenchmark(corpus, limit=limit)
+    reports = benchmark.run(backends)
+    print()
+    print(CaptchaBenchmark.format_report(reports))
+
+if __name__ == "__main__":
+    main()
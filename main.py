@@ -1,7 +1,12 @@
+from app.config import Config
 from app.controllers.bid_controller import BidController
+from app.controllers.async_bid_controller import AsyncBidController
 
 def main():
-    controller = BidController()
+    if Config.EXECUTION_MODE == 'async':
+        controller = AsyncBidController()
+    else:
+        controller = BidController()
     controller.run()
 
 if __name__ == "__main__":
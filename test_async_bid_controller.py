@@ -0,0 +1,142 @@
+import unittest
+import asyncio
+import os
+import sys
+import threading
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from app.controllers.async_bid_controller import AsyncBidController
+from app.services.async_adapters import AsyncContractRepository
+from app.use_cases.sync_social import SyncSocialUseCase
+
+class FakeRepository:
+    def __init__(self, pending=()):
+        # Contract ids with a due outbox job from an earlier cycle
+        self.pending = list(pending)
+        self.claimed = set()
+        self.posted = []
+        self.retried = []
+        self._lock = threading.Lock()
+
+    def contracts_needing_history(self, contracts):
+        return contracts
+
+    def find_contract(self, athlete):
+        return {'_id': athlete['id_contrato'], 'nome': athlete['nome']}
+
+    def claim_post(self, contract_id, platform_name, owner):
+        # Only one claim per (contract, platform) wins the lease
+        with self._lock:
+            if (contract_id, platform_name) in self.claimed:
+                return None
+            self.claimed.add((contract_id, platform_name))
+        return {'_id': contract_id, 'nome': contract_id, 'outbox_job': {'_id': f'{contract_id}:{platform_name}'}}
+
+    def claim_pending_posts(self, platform_name, owner, limit=10):
+        claimed = [self.claim_post(cid, platform_name, owner) for cid in self.pending[:limit]]
+        return [c for c in claimed if c]
+
+    def save_post(self, contract_id, post):
+        return post
+
+    def mark_as_posted(self, contract_id, platform_name, post_id=None):
+        with self._lock:
+            self.posted.append((contract_id, platform_name))
+
+    def retry_post_later(self, contract, error=None):
+        self.retried.append(contract['_id'])
+
+    def release_post(self, contract):
+        pass
+
+class FakeProvider:
+    def __init__(self, name):
+        self.name = name
+
+    def render(self, text):
+        return text
+
+    def publish(self, text):
+        return f'{self.name}-post'
+
+class FakeEnrich:
+    def __init__(self):
+        self.enriched = []
+
+    def execute(self, athlete, max_retries=5, check_existing=True):
+        athlete['historico'] = {}
+        self.enriched.append(athlete['id_contrato'])
+        return True
+
+class TestAsyncBidController(unittest.TestCase):
+
+    def make_controller(self, results, repository):
+        gemini = MagicMock()
+        gemini.generate_post.return_value = {'text': 'post'}
+        gemini.generate_posts.side_effect = lambda contracts: {str(c['_id']): {'text': 'post'} for c in contracts}
+
+        # Only the collaborators run_cycle uses; services are never built
+        controller = AsyncBidController.__new__(AsyncBidController)
+        controller.cbf_service = MagicMock(max_concurrency=2)
+        controller.watchlist_use_case = MagicMock()
+        controller.watchlist_use_case.execute.return_value = (results, [{'uf': 'CE', 'codigo_clube': '1'}])
+        controller.enrich_use_case = FakeEnrich()
+        controller.sync_use_case = SyncSocialUseCase(repository, gemini, [FakeProvider('twitter'), FakeProvider('threads')])
+        controller.providers = controller.sync_use_case.providers
+        controller.repo = AsyncContractRepository(repository)
+        self.addCleanup(lambda: [w.stop() for w in controller.sync_use_case.workers.values()])
+        return controller
+
+    def run_cycle(self, controller):
+        return asyncio.run(asyncio.wait_for(controller.run_cycle(), timeout=10))
+
+    def test_search_results_are_enriched_and_published(self):
+        results = [
+            {'id_contrato': 'c1', 'codigo_atleta': 1, 'nome': 'A'},
+            {'id_contrato': 'c2', 'codigo_atleta': 2, 'nome': 'B'},
+        ]
+        repository = FakeRepository()
+        controller = self.make_controller(results, repository)
+
+        searched = self.run_cycle(controller)
+
+        self.assertEqual(searched, [{'uf': 'CE', 'codigo_clube': '1'}])
+        self.assertEqual(sorted(controller.enrich_use_case.enriched), ['c1', 'c2'])
+        self.assertEqual(sorted(repository.posted), [
+            ('c1', 'threads'), ('c1', 'twitter'), ('c2', 'threads'), ('c2', 'twitter'),
+        ])
+
+    def test_cycle_ends_when_search_finds_nothing(self):
+        repository = FakeRepository()
+        controller = self.make_controller([], repository)
+
+        self.run_cycle(controller)
+
+        self.assertEqual(controller.enrich_use_case.enriched, [])
+        self.assertEqual(repository.posted, [])
+
+    def test_contract_is_posted_once_per_platform(self):
+        # c1 failed last cycle (claimed from the outbox) and is enriched again now
+        repository = FakeRepository(pending=['c1'])
+        controller = self.make_controller([{'id_contrato': 'c1', 'codigo_atleta': 1, 'nome': 'A'}], repository)
+
+        self.run_cycle(controller)
+
+        self.assertEqual(sorted(repository.posted), [('c1', 'threads'), ('c1', 'twitter')])
+        self.assertEqual(controller.sync_use_case.gemini_service.generate_post.call_count, 0)
+
+    def test_post_generated_this_cycle_is_reused(self):
+        controller = self.make_controller([], FakeRepository())
+        controller.sync_use_case.ensure_post = MagicMock()
+        controller._posts = {'c1': {'text': 'post'}}
+        controller._post_locks = {}
+
+        post = asyncio.run(controller._get_post({'_id': 'c1'}, asyncio.Semaphore(1)))
+
+        self.assertEqual(post, {'text': 'post'})
+        controller.sync_use_case.ensure_post.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
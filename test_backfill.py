@@ -0,0 +1,91 @@
+import unittest
+import os
+import sys
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from app.use_cases.backfill import BackfillUseCase, generate_date_range
+
+class FakeCBF:
+    max_concurrency = 2
+
+    def __init__(self, failures=None):
+        # date -> number of failed searches before it succeeds
+        self.failures = dict(failures or {})
+        self.searched = []
+
+    @contextmanager
+    def session_scope(self):
+        yield object()
+
+    def get_captcha_base64(self, session=None):
+        return 'b64'
+
+    def perform_search(self, captcha_text, search_date=None, session=None, uf=None, codigo_clube=None):
+        self.searched.append(search_date)
+        if self.failures.get(search_date, 0) > 0:
+            self.failures[search_date] -= 1
+            return None
+        return [{'id_contrato': f'{search_date}-1', 'nome': 'Atleta'}]
+
+class FakeRepository:
+    def __init__(self, progress=None):
+        self.progress = dict(progress or {})
+        self.saved = []
+
+    def get_backfill_progress(self, job_id):
+        return {date: doc for (job, date), doc in self.progress.items() if job == job_id}
+
+    def update_backfill_progress(self, job_id, date_str, status, **fields):
+        self.progress[(job_id, date_str)] = {'status': status, **fields}
+
+    def save_contracts(self, contracts, source=None):
+        self.saved.extend(contracts)
+        return contracts
+
+class TestBackfill(unittest.TestCase):
+
+    def setUp(self):
+        self.gemini = MagicMock()
+        self.gemini.solve_captcha.return_value = 'ABCD'
+
+    def test_generate_date_range(self):
+        self.assertEqual(generate_date_range('30/11/2025', '02/12/2025'), ['30/11/2025', '01/12/2025', '02/12/2025'])
+
+    def test_retries_failed_dates_and_records_progress(self):
+        cbf = FakeCBF(failures={'02/11/2025': 2})
+        repo = FakeRepository()
+        use_case = BackfillUseCase(cbf, self.gemini, repo, backoff_base=0)
+
+        summary = use_case.execute('01/11/2025', '03/11/2025', 'CE', '63238')
+
+        self.assertEqual(summary['done'], 3)
+        self.assertEqual(summary['failed'], 0)
+        self.assertEqual(len(repo.saved), 3)
+        self.assertEqual(repo.progress[('CE:63238', '02/11/2025')]['attempts'], 3)
+
+    def test_resumes_skipping_done_dates(self):
+        repo = FakeRepository({('CE:63238', '01/11/2025'): {'status': 'done', 'attempts': 1}})
+        cbf = FakeCBF()
+        use_case = BackfillUseCase(cbf, self.gemini, repo, backoff_base=0)
+
+        summary = use_case.execute('01/11/2025', '02/11/2025', 'CE', '63238')
+
+        self.assertEqual(summary['skipped'], 1)
+        self.assertEqual(cbf.searched, ['02/11/2025'])
+
+    def test_gives_up_after_max_attempts(self):
+        cbf = FakeCBF(failures={'01/11/2025': 10})
+        repo = FakeRepository()
+        use_case = BackfillUseCase(cbf, self.gemini, repo, max_attempts=3, backoff_base=0)
+
+        summary = use_case.execute('01/11/2025', '01/11/2025', 'CE', '63238')
+
+        self.assertEqual(summary['failed'], 1)
+        self.assertEqual(len(cbf.searched), 3)
+        self.assertEqual(repo.progress[('CE:63238', '01/11/2025')]['status'], 'failed')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import os
+import sys
+import threading
+import time
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from app.services.captcha.prefetcher import CaptchaPrefetcher
+
+class FakeCBF:
+    def __init__(self, size=2):
+        self.max_concurrency = size
+        self.free = [f'session-{i}' for i in range(size)]
+        self.released = []
+        self._cond = threading.Condition()
+
+    def checkout_session(self, timeout=None):
+        with self._cond:
+            if not self.free:
+                self._cond.wait(timeout=timeout)
+            return self.free.pop(0) if self.free else None
+
+    def release_session(self, session):
+        with self._cond:
+            self.released.append(session)
+            self.free.append(session)
+            self._cond.notify()
+
+    def get_captcha_base64(self, session=None):
+        return f'b64-{session}'
+
+class TestCaptchaPrefetcher(unittest.TestCase):
+
+    def make_prefetcher(self, **kwargs):
+        self.cbf = FakeCBF()
+        gemini = MagicMock()
+        gemini.solve_captcha.side_effect = lambda b64: f'captcha-{b64[4:]}'
+        prefetcher = CaptchaPrefetcher(self.cbf, gemini, **kwargs)
+        self.addCleanup(prefetcher.stop)
+        return prefetcher
+
+    def wait_for_buffer(self, prefetcher, count):
+        deadline = time.time() + 5
+        while len(prefetcher._buffer) < count and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(prefetcher._buffer), count)
+
+    def test_get_returns_captcha_with_its_session(self):
+        prefetcher = self.make_prefetcher()
+        prefetcher.start(expected=1)
+
+        captcha_text, session = prefetcher.get(timeout=5)
+
+        self.assertEqual(captcha_text, f'captcha-{session}')
+        self.assertNotIn(session, self.cbf.free)
+
+    def test_stale_captchas_are_dropped_and_sessions_released(self):
+        prefetcher = self.make_prefetcher(max_age=60)
+        prefetcher.start(expected=2)
+        self.wait_for_buffer(prefetcher, 2)
+        with prefetcher._cond:
+            prefetcher._buffer = [(text, session, fetched_at - 120) for text, session, fetched_at in prefetcher._buffer]
+            stale = [session for _, session, _ in prefetcher._buffer]
+
+        captcha_text, session = prefetcher.get(timeout=5)
+
+        self.assertEqual(sorted(self.cbf.released[:2]), sorted(stale))
+        self.assertEqual(captcha_text, f'captcha-{session}')
+
+    def test_stop_releases_buffered_sessions(self):
+        prefetcher = self.make_prefetcher()
+        prefetcher.start(expected=2)
+        self.wait_for_buffer(prefetcher, 2)
+
+        prefetcher.stop()
+
+        self.assertEqual(sorted(self.cbf.released), ['session-0', 'session-1'])
+        self.assertEqual(prefetcher._buffer, [])
+
+    def test_get_returns_nothing_when_stopped_or_timed_out(self):
+        prefetcher = self.make_prefetcher()
+        self.assertEqual(prefetcher.get(timeout=1), (None, None))
+
+        prefetcher.start(expected=0)
+        # Both sessions are busy elsewhere, so nothing can be prefetched
+        self.cbf.free = []
+        started = time.time()
+        self.assertEqual(prefetcher.get(timeout=0.2), (None, None))
+        self.assertLess(time.time() - started, 2)
+
+if __name__ == '__main__':
+    unittest.main()
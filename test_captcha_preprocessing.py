@@ -0,0 +1,61 @@
+import unittest
+import io
+import os
+import sys
+import tempfile
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+from PIL import Image
+from app.services.captcha.preprocessing import binarize, preprocess_captcha, remove_specks, otsu_threshold
+from app.services.captcha.debug_dump import CaptchaDebugDump
+
+def to_bytes(array):
+    buf = io.BytesIO()
+    Image.fromarray(array).save(buf, format='PNG')
+    return buf.getvalue()
+
+def noisy_captcha():
+    """Light background, two dark thick bars and scattered dark specks."""
+    gray = np.full((50, 150), 220, dtype=np.uint8)
+    gray[15:35, 40:50] = 30
+    gray[15:35, 90:100] = 30
+    gray[5, 5] = gray[45, 140] = gray[2, 120] = 20
+    return gray
+
+class TestCaptchaPreprocessing(unittest.TestCase):
+
+    def test_otsu_splits_dark_from_light(self):
+        threshold = otsu_threshold(noisy_captcha())
+        self.assertTrue(30 < threshold <= 220)
+
+    def test_specks_removed_and_cropped_to_characters(self):
+        ink = binarize(to_bytes(noisy_captcha()))
+        # 20 rows x 60 cols of characters plus the crop margin on each side
+        self.assertEqual(ink.shape, (24, 64))
+        self.assertEqual(ink.sum(), 2 * 20 * 10)
+
+    def test_remove_specks_keeps_strokes(self):
+        ink = np.zeros((5, 5), dtype=bool)
+        ink[0, 0] = True
+        ink[2:4, 2:4] = True
+        cleaned = remove_specks(ink)
+        self.assertFalse(cleaned[0, 0])
+        self.assertEqual(cleaned.sum(), 4)
+
+    def test_output_is_one_bit_png(self):
+        raw = to_bytes(noisy_captcha())
+        processed = preprocess_captcha(raw)
+        self.assertEqual(Image.open(io.BytesIO(processed)).mode, '1')
+        self.assertLess(len(processed), len(raw))
+
+    def test_debug_dump_is_a_ring_buffer(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dump = CaptchaDebugDump(tmp, max_files=4)
+            for _ in range(5):
+                dump.save(b'raw', b'processed')
+            self.assertEqual(len(os.listdir(tmp)), 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import os
+import sys
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.getcwd())
+
+from app.services.cbf_service import CBFService, CaptchaRejectedError
+from app.use_cases.search_bid import SearchBidUseCase
+from app.use_cases.enrich_athlete import EnrichAthleteUseCase
+
+class FakeCBF:
+    def __init__(self, outcomes):
+        # Each outcome is a result, None (request failed) or CaptchaRejectedError
+        self.outcomes = list(outcomes)
+
+    @contextmanager
+    def session_scope(self):
+        yield object()
+
+    def checkout_session(self, timeout=None):
+        return object()
+
+    def release_session(self, session):
+        pass
+
+    def get_captcha_base64(self, session=None):
+        return 'b64'
+
+    def _next(self):
+        outcome = self.outcomes.pop(0)
+        if outcome is CaptchaRejectedError:
+            raise CaptchaRejectedError('Captcha inválido')
+        return outcome
+
+    def perform_search(self, captcha_text, search_date=None, session=None, uf=None, codigo_clube=None):
+        return self._next()
+
+    def get_atleta_historico(self, codigo_atleta, captcha_text, session=None):
+        return self._next()
+
+class TestCaptchaVerdict(unittest.TestCase):
+
+    def setUp(self):
+        sleep_patcher = patch('time.sleep')
+        sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+        self.gemini = MagicMock()
+        self.gemini.solve_captcha.return_value = 'ABCD'
+
+    def reported(self):
+        return [call.args[1] for call in self.gemini.report_captcha_result.call_args_list]
+
+    def test_search_only_reports_captchas_cbf_judged(self):
+        cbf = FakeCBF([None, CaptchaRejectedError, [{'id_contrato': 'a'}]])
+
+        results = SearchBidUseCase(cbf, self.gemini).execute(max_retries=3)
+
+        self.assertEqual(results, [{'id_contrato': 'a'}])
+        self.assertEqual(self.reported(), [False, True])
+
+    def test_history_only_reports_captchas_cbf_judged(self):
+        cbf = FakeCBF([None, CaptchaRejectedError, {'2025': []}])
+
+        history = EnrichAthleteUseCase(cbf, self.gemini, MagicMock()).fetch_history(7, max_retries=3)
+
+        self.assertEqual(history, {'2025': []})
+        self.assertEqual(self.reported(), [False, True])
+
+    def test_history_status_false_is_a_rejection(self):
+        service = CBFService.__new__(CBFService)
+        service.base_url = 'https://bid.cbf.com.br/'
+        service.rate_limiter = MagicMock()
+        service.pool = MagicMock()
+        session = MagicMock()
+        session.http.post.return_value.status_code = 200
+        session.http.post.return_value.json.return_value = {'status': False, 'messages': ['Captcha inválido']}
+
+        with self.assertRaises(CaptchaRejectedError):
+            service.get_atleta_historico(7, 'ABCD', session=session)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import os
+import sys
+from datetime import datetime
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from app.use_cases.backfill import BackfillUseCase
+from app.use_cases.catch_up import CatchUpUseCase
+
+TODAY = datetime(2025, 12, 10, 15, 30)
+
+class TestCatchUp(unittest.TestCase):
+
+    def make_use_case(self, state=None, progress=None, max_days=30):
+        repository = MagicMock()
+        repository.get_search_state.return_value = state
+        repository.get_backfill_progress.return_value = progress or {}
+        backfill = MagicMock()
+        backfill.job_id.side_effect = BackfillUseCase.job_id
+        return CatchUpUseCase(backfill, repository, 'CE', '63238', max_days=max_days), backfill, repository
+
+    def test_missed_days_newest_first(self):
+        use_case, backfill, _ = self.make_use_case(
+            state={'last_searched_date': '07/12/2025'},
+            progress={'08/12/2025': {'status': 'done'}, '01/12/2025': {'status': 'failed'}}
+        )
+
+        use_case.execute(today=TODAY)
+
+        backfill.run_dates.assert_called_once_with(
+            ['09/12/2025', '07/12/2025', '01/12/2025'], 'CE', '63238'
+        )
+
+    def test_nothing_missing_after_todays_search(self):
+        use_case, backfill, _ = self.make_use_case(state={'last_searched_date': '10/12/2025'})
+
+        self.assertIsNone(use_case.execute(today=TODAY))
+        backfill.run_dates.assert_not_called()
+
+    def test_long_outage_is_capped_and_first_run_skipped(self):
+        use_case, _, _ = self.make_use_case(state={'last_searched_date': '01/01/2025'}, max_days=3)
+        self.assertEqual(use_case.missing_dates(TODAY), ['09/12/2025', '08/12/2025', '07/12/2025'])
+
+        use_case, _, _ = self.make_use_case(state=None)
+        self.assertEqual(use_case.missing_dates(TODAY), [])
+
+    def test_record_search_uses_club_job(self):
+        use_case, _, repository = self.make_use_case()
+
+        use_case.record_search('10/12/2025')
+
+        repository.record_search.assert_called_once_with('CE:63238', '10/12/2025')
+
+if __name__ == '__main__':
+    unittest.main()
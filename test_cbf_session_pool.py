@@ -0,0 +1,82 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.getcwd())
+
+from app.services.cbf_session_pool import CBFSessionPool
+
+HOMEPAGE = '<html><head><meta name="csrf-token" content="token-123"></head></html>'
+
+def fake_homepage(*args, **kwargs):
+    response = MagicMock()
+    response.text = HOMEPAGE
+    response.raise_for_status.return_value = None
+    return response
+
+class TestCBFSessionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmp.name, 'sessions.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @patch('requests.Session.get', side_effect=fake_homepage)
+    def test_checkout_initializes_lazily(self, mock_get):
+        pool = CBFSessionPool('https://bid.cbf.com.br', size=2)
+        self.assertEqual(mock_get.call_count, 0)
+
+        session = pool.checkout()
+        self.assertEqual(session.csrf_token, 'token-123')
+        self.assertEqual(session.http.headers['X-CSRF-TOKEN'], 'token-123')
+        self.assertEqual(mock_get.call_count, 1)
+
+        # Two sessions, two concurrent flows; the third waits
+        other = pool.checkout()
+        self.assertIsNot(session, other)
+        self.assertIsNone(pool.checkout(timeout=0.01))
+
+        pool.checkin(session)
+        self.assertIs(pool.checkout(timeout=0.01), session)
+
+    @patch('requests.Session.get', side_effect=fake_homepage)
+    def test_warm_start_skips_homepage(self, mock_get):
+        pool = CBFSessionPool('https://bid.cbf.com.br', size=1, state_path=self.state_path)
+        pool.checkout().http.cookies.set('laravel_session', 'abc')
+        pool.save(force=True)
+        mock_get.reset_mock()
+
+        restarted = CBFSessionPool('https://bid.cbf.com.br', size=1, state_path=self.state_path)
+        session = restarted.checkout()
+        self.assertEqual(mock_get.call_count, 0)
+        self.assertEqual(session.csrf_token, 'token-123')
+        self.assertEqual(session.http.cookies.get('laravel_session'), 'abc')
+
+    @patch('requests.Session.get', side_effect=fake_homepage)
+    def test_stale_state_is_ignored(self, mock_get):
+        pool = CBFSessionPool('https://bid.cbf.com.br', size=1, state_path=self.state_path)
+        pool.checkout()
+        pool.save(force=True)
+        mock_get.reset_mock()
+
+        restarted = CBFSessionPool('https://bid.cbf.com.br', size=1, state_path=self.state_path, max_state_age=-1)
+        restarted.checkout()
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('requests.Session.get', side_effect=fake_homepage)
+    def test_refresh_drops_cookies(self, mock_get):
+        pool = CBFSessionPool('https://bid.cbf.com.br', size=1)
+        session = pool.checkout()
+        session.http.cookies.set('laravel_session', 'expired')
+
+        pool.refresh(session)
+        self.assertIsNone(session.http.cookies.get('laravel_session'))
+        self.assertEqual(session.csrf_token, 'token-123')
+        self.assertEqual(mock_get.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
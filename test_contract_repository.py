@@ -0,0 +1,164 @@
+import unittest
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.getcwd())
+
+from pymongo.errors import BulkWriteError, OperationFailure
+from app.models.contract_repository import ContractRepository, _history_update
+
+class TestContractRepository(unittest.TestCase):
+
+    def setUp(self):
+        client = MagicMock()
+        collections = {}
+        client.__getitem__.return_value.__getitem__.side_effect = lambda name: collections.setdefault(name, MagicMock())
+        patcher = patch.object(ContractRepository, '_get_client', return_value=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.repo = ContractRepository()
+        self.collection = self.repo.collection
+
+    def test_indexes_created_at_startup(self):
+        keys = [call.args[0] for call in self.collection.create_index.call_args_list]
+        self.assertIn([('id_contrato', 1)], keys)
+        self.assertIn([('codigo_atleta', 1), ('codigo_clube', 1)], keys)
+        self.assertIn([('social_status.twitter.posted', 1)], keys)
+        unique = [call for call in self.collection.create_index.call_args_list if call.kwargs.get('unique')]
+        self.assertEqual(unique[0].args[0], [('id_contrato', 1)])
+
+    def test_duplicates_are_merged_so_the_unique_index_builds(self):
+        self.collection.reset_mock()
+        self.collection.create_index.side_effect = [OperationFailure('E11000 duplicate key', code=11000)] + [None] * 10
+        self.collection.aggregate.return_value = [{'_id': 'x', 'ids': [2, 1], 'count': 2}]
+        posted = {'posted': True, 'post_id': 'p1'}
+        self.collection.find.return_value = [
+            {'_id': 2, 'id_contrato': 'x', 'social_status': {'twitter': posted}, 'post': {'text': 'T'}},
+            {'_id': 1, 'id_contrato': 'x'},
+        ]
+
+        self.repo.ensure_indexes()
+
+        query, update = self.collection.update_one.call_args.args
+        self.assertEqual(query, {'_id': 1})
+        self.assertEqual(update['$set'], {'social_status.twitter': posted, 'post': {'text': 'T'}})
+        self.collection.delete_many.assert_called_once_with({'_id': {'$in': [2]}})
+        self.repo.outbox.collection.delete_many.assert_called_once_with({'contract_id': {'$in': [2]}})
+        unique = [call for call in self.collection.create_index.call_args_list if call.kwargs.get('unique')]
+        self.assertEqual(len(unique), 2)
+        # The other indexes are still created
+        keys = [call.args[0] for call in self.collection.create_index.call_args_list]
+        self.assertIn([('contrato_numero', 1)], keys)
+
+    def test_save_contracts_is_one_bulk_write(self):
+        self.collection.bulk_write.return_value = MagicMock(upserted_ids={1: 'oid-b'})
+        contracts = [
+            {'id_contrato': 'a', 'nome': 'A'},
+            {'id_contrato': 'b', 'nome': 'B'},
+            {'id_contrato': 'b', 'nome': 'B duplicate'},
+            {'nome': 'no id'},
+        ]
+
+        saved = self.repo.save_contracts(contracts)
+
+        self.collection.bulk_write.assert_called_once()
+        operations = self.collection.bulk_write.call_args.args[0]
+        self.assertEqual(len(operations), 2)
+        self.assertFalse(self.collection.bulk_write.call_args.kwargs['ordered'])
+        self.assertEqual(saved, [{'id_contrato': 'b', 'nome': 'B', '_id': 'oid-b'}])
+        self.collection.find_one.assert_not_called()
+
+    def test_concurrent_duplicate_is_not_reported_as_new(self):
+        self.collection.bulk_write.side_effect = BulkWriteError({
+            'writeErrors': [{'index': 0, 'code': 11000, 'errmsg': 'duplicate key'}],
+            'upserted': [{'index': 1, '_id': 'oid-b'}],
+        })
+
+        saved = self.repo.save_contracts([{'id_contrato': 'a'}, {'id_contrato': 'b'}])
+
+        self.assertEqual([c['id_contrato'] for c in saved], ['b'])
+
+    def test_contracts_needing_history_is_one_query(self):
+        self.collection.find.return_value = [{'contrato_numero': 'N1', 'codigo_atleta': 1}]
+        contracts = [
+            {'contrato_numero': 'N1', 'codigo_atleta': 1},
+            {'contrato_numero': 'N2', 'codigo_atleta': 2},
+            {'id_contrato': 'c3', 'codigo_atleta': 3},
+            {'contrato_numero': 'N4'},
+        ]
+
+        pending = self.repo.contracts_needing_history(contracts)
+
+        self.collection.find.assert_called_once()
+        keys = self.collection.find.call_args.args[0]['$and'][0]
+        self.assertEqual(keys['$or'][0], {'contrato_numero': {'$in': ['N1', 'N2']}})
+        self.assertEqual(keys['$or'][1], {'id_contrato': {'$in': ['c3']}})
+        self.assertEqual([c['codigo_atleta'] for c in pending], [2, 3])
+
+    def test_history_is_stored_once_per_athlete(self):
+        self.collection.find_one.return_value = None
+        self.repo.athletes.find_one.return_value = None
+        athlete = {'contrato_numero': 'N1', 'codigo_atleta': 7, 'nome': 'A', 'historico': [{'jogo': 1}]}
+
+        self.repo.save_contract_with_history(athlete)
+
+        history_update = self.repo.athletes.update_one.call_args.args
+        self.assertEqual(history_update[0], {'_id': 7})
+        self.assertEqual(history_update[1]['$set']['historico'], [{'jogo': 1}])
+        contract_update = self.collection.update_one.call_args.args[1]
+        self.assertNotIn('historico', contract_update['$set'])
+        self.assertEqual(contract_update['$set']['historico_ref'], 7)
+        self.assertIn('historico', contract_update['$unset'])
+        # The caller's dict is left untouched
+        self.assertIn('historico', athlete)
+
+    def test_cached_history_respects_staleness(self):
+        now = datetime.now(timezone.utc)
+        self.repo.athletes.find_one.return_value = {'_id': 7, 'historico': [1], 'fetched_at': now - timedelta(hours=2)}
+        self.assertEqual(self.repo.get_athlete_history(7, max_age_hours=3), [1])
+        self.assertIsNone(self.repo.get_athlete_history(7, max_age_hours=1))
+
+    def test_readers_attach_history(self):
+        self.repo.athletes.find.return_value = [{'_id': 7, 'historico': [1]}]
+        contracts = self.repo.attach_history([{'historico_ref': 7}, {'historico': ['legacy']}])
+        self.assertEqual([c['historico'] for c in contracts], [[1], ['legacy']])
+
+    def _stored(self, historico):
+        # What the athletes collection holds after a full write
+        update, _ = _history_update(None, historico, 'then')
+        return {'content_hash': update['$set']['content_hash'], 'seasons': update['$set']['seasons']}
+
+    def test_unchanged_history_skips_write(self):
+        historico = {'2024': [{'jogo': 1}], '2025': [{'jogo': 2}]}
+        update, changed = _history_update(self._stored(historico), historico, 'now')
+        self.assertEqual(update, {'$set': {'fetched_at': 'now'}})
+        self.assertEqual(changed, [])
+
+    def test_new_matches_are_pushed_to_their_season(self):
+        stored = self._stored({'2024': [{'jogo': 1}], '2025': [{'jogo': 2}]})
+        historico = {'2024': [{'jogo': 1}], '2025': [{'jogo': 2}, {'jogo': 3}]}
+
+        update, changed = _history_update(stored, historico, 'now')
+
+        self.assertEqual(changed, ['2025'])
+        self.assertEqual(update['$push'], {'historico.2025': {'$each': [{'jogo': 3}]}})
+        self.assertNotIn('historico.2024', update['$set'])
+        self.assertNotIn('historico', update['$set'])
+
+    def test_newest_first_matches_are_prepended(self):
+        stored = self._stored({'2025': [{'jogo': 2}]})
+        update, _ = _history_update(stored, {'2025': [{'jogo': 3}, {'jogo': 2}]}, 'now')
+        self.assertEqual(update['$push'], {'historico.2025': {'$each': [{'jogo': 3}], '$position': 0}})
+
+    def test_edited_and_removed_seasons(self):
+        stored = self._stored({'2024': [{'jogo': 1}], '2025': [{'jogo': 2}]})
+        update, changed = _history_update(stored, {'2025': [{'jogo': 2, 'gols': 1}]}, 'now')
+
+        self.assertEqual(sorted(changed), ['2024', '2025'])
+        self.assertEqual(update['$set']['historico.2025'], [{'jogo': 2, 'gols': 1}])
+        self.assertIn('historico.2024', update['$unset'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,100 +1,186 @@
-import unittest
-from unittest.mock import MagicMock, patch
-import sys
-import os
-import time
-
-# Add app to path if not already there
-sys.path.append(os.getcwd())
-
-from app.services.gemini_service import GeminiService
-
-class TestGeminiOptimization(unittest.TestCase):
-    
-    def setUp(self):
-        # Mock Config to avoid needing real keys
-        self.config_patcher = patch('app.services.gemini_service.Config')
-        self.mock_config = self.config_patcher.start()
-        self.mock_config.GOOGLE_API_KEY = "fake_key"
-        
-        # Mock genai.Client
-        self.genai_patcher = patch('app.services.gemini_service.genai')
-        self.mock_genai = self.genai_patcher.start()
-        
-        # Mock time.sleep to run tests fast
-        self.sleep_patcher = patch('app.services.gemini_service.time.sleep')
-        self.mock_sleep = self.sleep_patcher.start()
-
-        self.service = GeminiService()
-
-    def tearDown(self):
-        self.config_patcher.stop()
-        self.genai_patcher.stop()
-        self.sleep_patcher.stop()
-
-    def test_text_model_rotation(self):
-        """Test that it rotates through TEXT_MODELS on 429 error"""
-        print("\n--- Testing Text Model Rotation ---")
-        
-        # Setup mock to raise exception for first 2 models, then succeed
-        mock_generate = MagicMock()
-        # Side effect: first 2 calls raise 429, 3rd returns success
-        mock_generate.side_effect = [
-            Exception("429 Resource Exhausted"),
-            Exception("429 Resource Exhausted"),
-            MagicMock(text="Success!")
-        ]
-        
-        self.service.client.models.generate_content = mock_generate
-        
-        result = self.service._generate_with_retry(["test"], is_vision=False)
-        
-        self.assertEqual(result, "Success!")
-        self.assertEqual(mock_generate.call_count, 3)
-        # Verify it tried the first 3 models in TEXT_MODELS
-        expected_models = self.service.TEXT_MODELS[:3]
-        calls = mock_generate.call_args_list
-        for i, call in enumerate(calls):
-            self.assertEqual(call.kwargs['model'], expected_models[i])
-            print(f"Call {i+1} used model: {call.kwargs['model']}")
-
-    def test_vision_model_selection(self):
-        """Test that is_vision=True uses VISION_MODELS"""
-        print("\n--- Testing Vision Model Selection ---")
-        
-        mock_generate = MagicMock()
-        mock_generate.return_value.text = "Vision Success"
-        self.service.client.models.generate_content = mock_generate
-        
-        self.service._generate_with_retry(["image"], is_vision=True)
-        
-        # Should use first model of VISION_MODELS
-        first_vision_model = self.service.VISION_MODELS[0]
-        self.assertEqual(mock_generate.call_args.kwargs['model'], first_vision_model)
-        print(f"Successfully used vision model: {first_vision_model}")
-
-    def test_wait_after_exhaustion(self):
-        """Test that it waits 60s after exhausting all models once"""
-        print("\n--- Testing Wait Strategy ---")
-        
-        # We want to fail everything for the first cycle, then succeed on first of second cycle.
-        # Number of models in list
-        num_models = len(self.service.TEXT_MODELS)
-        
-        # Side effects: Fail (num_models) times, then Succeed
-        side_effects = [Exception("429")] * num_models + [MagicMock(text="Finally worked")]
-        
-        mock_generate = MagicMock()
-        mock_generate.side_effect = side_effects
-        self.service.client.models.generate_content = mock_generate
-        
-        result = self.service._generate_with_retry(["test"], is_vision=False)
-        
-        self.assertEqual(result, "Finally worked")
-        
-        # Verify sleep was called with 60s
-        self.mock_sleep.assert_any_call(60)
-        print("Verified 60s sleep was triggered after exhausting all models.")
-
-if __name__ == '__main__':
-    unittest.main()
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import time
+import base64
+
+# Add app to path if not already there
+sys.path.append(os.getcwd())
+
+from app.services.gemini_service import GeminiService
+
+class TestGeminiOptimization(unittest.TestCase):
+    
+    def setUp(self):
+        # Mock Config to avoid needing real keys
+        self.config_patcher = patch('app.services.gemini_service.Config')
+        self.mock_config = self.config_patcher.start()
+        self.mock_config.GOOGLE_API_KEY = "fake_key"
+        self.mock_config.CAPTCHA_SOLVER_MODEL = None
+        self.mock_config.CAPTCHA_CORPUS_DIR = None
+        self.mock_config.CAPTCHA_DEBUG_DIR = None
+        self.mock_config.MODEL_ROUTER_STATE_PATH = None
+        self.mock_config.LLM_CACHE_ENABLED = False
+        
+        # Mock genai.Client
+        self.genai_patcher = patch('app.services.gemini_service.genai')
+        self.mock_genai = self.genai_patcher.start()
+        
+        # Mock time.sleep to run tests fast
+        self.sleep_patcher = patch('app.services.gemini_service.time.sleep')
+        self.mock_sleep = self.sleep_patcher.start()
+
+        self.service = GeminiService()
+
+    def tearDown(self):
+        self.config_patcher.stop()
+        self.genai_patcher.stop()
+        self.sleep_patcher.stop()
+
+    def test_text_model_rotation(self):
+        """Test that it rotates through TEXT_MODELS on 429 error"""
+        print("\n--- Testing Text Model Rotation ---")
+        
+        # Setup mock to raise exception for first 2 models, then succeed
+        mock_generate = MagicMock()
+        # Side effect: first 2 calls raise 429, 3rd returns success
+        mock_generate.side_effect = [
+            Exception("429 Resource Exhausted"),
+            Exception("429 Resource Exhausted"),
+            MagicMock(text="Success!")
+        ]
+        
+        self.service.client.models.generate_content = mock_generate
+        
+        result, model = self.service._generate_with_retry(["test"], is_vision=False)
+        
+        self.assertEqual(result, "Success!")
+        self.assertEqual(model, self.service.TEXT_MODELS[2])
+        self.assertEqual(mock_generate.call_count, 3)
+        # Verify it tried the first 3 models in TEXT_MODELS
+        expected_models = self.service.TEXT_MODELS[:3]
+        calls = mock_generate.call_args_list
+        for i, call in enumerate(calls):
+            self.assertEqual(call.kwargs['model'], expected_models[i])
+            print(f"Call {i+1} used model: {call.kwargs['model']}")
+
+    def test_vision_model_selection(self):
+        """Test that is_vision=True uses VISION_MODELS"""
+        print("\n--- Testing Vision Model Selection ---")
+        
+        mock_generate = MagicMock()
+        mock_generate.return_value.text = "Vision Success"
+        self.service.client.models.generate_content = mock_generate
+        
+        self.service._generate_with_retry(["image"], is_vision=True)
+        
+        # Should use first model of VISION_MODELS
+        first_vision_model = self.service.VISION_MODELS[0]
+        self.assertEqual(mock_generate.call_args.kwargs['model'], first_vision_model)
+        print(f"Successfully used vision model: {first_vision_model}")
+
+    def test_wait_after_exhaustion(self):
+        """Test that it waits 60s after exhausting all models once"""
+        print("\n--- Testing Wait Strategy ---")
+        
+        # We want to fail everything for the first cycle, then succeed on first of second cycle.
+        # Number of models in list
+        num_models = len(self.service.TEXT_MODELS)
+        
+        # Side effects: Fail (num_models) times, then Succeed
+        side_effects = [Exception("429")] * num_models + [MagicMock(text="Finally worked")]
+        
+        mock_generate = MagicMock()
+        mock_generate.side_effect = side_effects
+        self.service.client.models.generate_content = mock_generate
+        
+        result, _ = self.service._generate_with_retry(["test"], is_vision=False)
+        
+        self.assertEqual(result, "Finally worked")
+        
+        # Verify sleep was called with 60s
+        self.mock_sleep.assert_any_call(60)
+        print("Verified 60s sleep was triggered after exhausting all models.")
+
+    def test_gives_up_instead_of_waiting_hours(self):
+        self.service.client.models.generate_content = MagicMock(side_effect=Exception("404 NOT_FOUND"))
+
+        with self.assertRaises(Exception):
+            self.service._generate_with_retry(["test"], is_vision=False)
+
+        self.mock_sleep.assert_not_called()
+
+    def test_exhausted_model_skipped_on_next_call(self):
+        """Test that a model that returned 429 is not retried while cooling down"""
+        print("\n--- Testing Model Cooldown ---")
+        
+        mock_generate = MagicMock()
+        mock_generate.side_effect = [
+            Exception("429 Resource Exhausted"),
+            MagicMock(text="First"),
+            MagicMock(text="Second")
+        ]
+        self.service.client.models.generate_content = mock_generate
+        
+        self.service._generate_with_retry(["test"], is_vision=False)
+        self.service._generate_with_retry(["test"], is_vision=False)
+        
+        models_called = [call.kwargs['model'] for call in mock_generate.call_args_list]
+        self.assertEqual(models_called.count(self.service.TEXT_MODELS[0]), 1)
+        print(f"Models called: {models_called}")
+
+    def test_batched_posts_parse_json_array(self):
+        self.mock_config.TWEET_PROMPT_TOKEN_BUDGET = 1500
+        self.mock_config.TWEET_PROMPT_RECENT_MATCHES = 5
+        self.mock_config.TWEET_BATCH_SIZE = 5
+        contracts = [{'_id': 'c1', 'nome': 'A'}, {'_id': 'c2', 'nome': 'B'}]
+        answer = '```json\n[{"id": "c1", "texto": "Tweet A"}, {"id": "c2", "texto": "Tweet B"}]\n```'
+        self.service.client.models.generate_content = MagicMock(return_value=MagicMock(text=answer))
+
+        posts = self.service.generate_posts(contracts)
+
+        self.assertEqual(self.service.client.models.generate_content.call_count, 1)
+        self.assertEqual({k: p['text'] for k, p in posts.items()}, {'c1': 'Tweet A', 'c2': 'Tweet B'})
+        self.assertEqual(posts['c1']['model'], self.service.TEXT_MODELS[0])
+
+    def test_post_model_comes_from_the_call_that_answered(self):
+        self.mock_config.TWEET_PROMPT_TOKEN_BUDGET = 1500
+        self.mock_config.TWEET_PROMPT_RECENT_MATCHES = 5
+        # A captcha answered by another model must not relabel the post
+        with patch.object(self.service, '_generate_with_retry', return_value=('Tweet', 'models/post-model')):
+            post = self.service.generate_post({'_id': 'c1', 'nome': 'A'})
+
+        self.assertEqual(post['model'], 'models/post-model')
+        self.assertFalse(hasattr(self.service, 'last_model'))
+
+    def test_corpus_records_the_model_that_solved_the_captcha(self):
+        self.service.local_solver = None
+        self.service.corpus = MagicMock()
+        with patch.object(self.service, '_preprocess_image', side_effect=lambda b: b), \
+             patch.object(self.service, '_generate_with_retry', return_value=('AB12', 'models/vision-model')):
+            answer = self.service.solve_captcha(base64.b64encode(b'image').decode(), hedged=False)
+        self.service.report_captcha_result(answer, True)
+
+        image, text, model, _, accepted = self.service.corpus.record.call_args.args
+        self.assertEqual((image, text, model, accepted), (b'image', 'AB12', 'models/vision-model', True))
+
+    def test_malformed_batch_falls_back_to_single_calls(self):
+        self.mock_config.TWEET_PROMPT_TOKEN_BUDGET = 1500
+        self.mock_config.TWEET_PROMPT_RECENT_MATCHES = 5
+        self.mock_config.TWEET_BATCH_SIZE = 5
+        contracts = [{'_id': 'c1', 'nome': 'A'}, {'_id': 'c2', 'nome': 'B'}]
+        self.service.client.models.generate_content = MagicMock(side_effect=[
+            MagicMock(text='[{"id": "c1", "texto": "Tweet A"}'),  # truncated JSON
+            MagicMock(text='Single A'),
+            MagicMock(text='Single B'),
+        ])
+
+        posts = self.service.generate_posts(contracts)
+
+        self.assertEqual(self.service.client.models.generate_content.call_count, 3)
+        self.assertEqual(posts['c1']['text'], 'Single A')
+        self.assertEqual(posts['c2']['text'], 'Single B')
+
+if __name__ == '__main__':
+    unittest.main()
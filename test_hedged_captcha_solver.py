@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from app.services.captcha.hedged_solver import HedgedCaptchaSolver
+
+class TestHedgedCaptchaSolver(unittest.TestCase):
+
+    def make_solver(self, answers, delays=None, **kwargs):
+        delays = delays or {}
+        self.calls = []
+
+        def solve_with_model(model, image_bytes):
+            self.calls.append(model)
+            time.sleep(delays.get(model, 0))
+            result = answers[model]
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        return HedgedCaptchaSolver(solve_with_model, list(answers), **kwargs)
+
+    def test_majority_per_character(self):
+        solver = self.make_solver({'a': 'ABCD', 'b': 'ABCX', 'c': 'ZBCD'}, quorum=10)
+        text, answers = solver.solve(b'img')
+        self.assertEqual(text, 'ABCD')
+        self.assertEqual(len(answers), 3)
+
+    def test_returns_early_when_quorum_reached(self):
+        solver = self.make_solver(
+            {'fast1': 'LEAO', 'fast2': 'LEAO', 'slow': 'XXXX'},
+            delays={'slow': 1.0},
+            max_in_flight=3,
+            quorum=1.2
+        )
+        started_at = time.perf_counter()
+        text, answers = solver.solve(b'img')
+        self.assertEqual(text, 'LEAO')
+        self.assertNotIn('slow', answers)
+        self.assertLess(time.perf_counter() - started_at, 0.9)
+
+    def test_failed_and_malformed_answers_are_ignored(self):
+        solver = self.make_solver({'a': Exception('429'), 'b': 'AB', 'c': 'PICI'}, quorum=10)
+        text, answers = solver.solve(b'img')
+        self.assertEqual(text, 'PICI')
+        self.assertEqual(answers, {'c': 'PICI'})
+
+    def test_no_answers(self):
+        solver = self.make_solver({'a': Exception('429')})
+        self.assertEqual(solver.solve(b'img'), ('', {}))
+
+    def test_weights_follow_past_accuracy(self):
+        solver = self.make_solver({'good': 'AAAA', 'bad1': 'BBBB', 'bad2': 'BBBB'}, quorum=100)
+        solver.seed_stats({
+            'good': {'attempts': 50, 'accepted': 48},
+            'bad1': {'attempts': 50, 'accepted': 10},
+            'bad2': {'attempts': 50, 'accepted': 10},
+        })
+        self.assertGreater(solver.weight('good'), solver.weight('bad1') + solver.weight('bad2'))
+        self.assertEqual(solver.solve(b'img')[0], 'AAAA')
+
+    def test_record_outcome_updates_weight(self):
+        solver = self.make_solver({'a': 'AAAA'})
+        before = solver.weight('a')
+        for _ in range(5):
+            solver.record_outcome('a', True)
+        self.assertGreater(solver.weight('a'), before)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+from unittest.mock import patch
+
+sys.path.append(os.getcwd())
+
+from google.genai import types
+from app.services.llm_cache import LLMResponseCache, DiskCacheStore, contents_digest
+from app.services.gemini_service import GeminiService
+
+def captcha_contents(image_bytes):
+    return [
+        types.Part.from_text(text="Solve this captcha"),
+        types.Part.from_bytes(data=image_bytes, mime_type="image/png"),
+    ]
+
+class TestLLMCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_digest_depends_on_exact_image_bytes(self):
+        self.assertEqual(contents_digest(captcha_contents(b'img-1')), contents_digest(captcha_contents(b'img-1')))
+        self.assertNotEqual(contents_digest(captcha_contents(b'img-1')), contents_digest(captcha_contents(b'img-2')))
+        self.assertNotEqual(contents_digest(captcha_contents(b'img-1')), contents_digest(captcha_contents(b'img-1'), 0.5))
+
+    def test_hit_by_model_family_and_counters(self):
+        cache = LLMResponseCache()
+        cache.put('text', 'gemini-2.5-flash', 'd1', 'tweet', latency=3.0)
+
+        self.assertIsNone(cache.get('text', ['gemma'], 'd1'))
+        entry = cache.get('text', ['gemma', 'gemini'], 'd1')
+        self.assertEqual(entry['text'], 'tweet')
+        self.assertEqual(entry['model'], 'gemini-2.5-flash')
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['saved_seconds'], 3.0)
+
+    def test_memory_lru_backed_by_disk(self):
+        store = DiskCacheStore(self.tmp.name)
+        cache = LLMResponseCache(max_entries=1, store=store)
+        cache.put('text', 'gemini-2.5-flash', 'd1', 'first', latency=1.0)
+        cache.put('text', 'gemini-2.5-flash', 'd2', 'second', latency=1.0)
+
+        self.assertEqual(cache.get('text', ['gemini'], 'd1')['text'], 'first')
+        self.assertEqual(cache.stats()['store_hits'], 1)
+
+        # A new process (empty memory) still hits the disk tier
+        restarted = LLMResponseCache(store=DiskCacheStore(self.tmp.name))
+        self.assertEqual(restarted.get('text', ['gemini'], 'd2')['text'], 'second')
+
+    def test_disk_round_trip_with_real_model_names(self):
+        model = GeminiService.TEXT_MODELS[0]
+        cache = LLMResponseCache(store=DiskCacheStore(self.tmp.name))
+        cache.put('text', model, 'd1', 'tweet', latency=1.0)
+
+        self.assertEqual(os.listdir(self.tmp.name), ['text-gemma-d1.json'])
+        restarted = LLMResponseCache(store=DiskCacheStore(self.tmp.name))
+        families = GeminiService._families(GeminiService.TEXT_MODELS)
+        self.assertEqual(restarted.get('text', families, 'd1')['model'], model)
+
+    def test_concurrent_writes_of_the_same_key(self):
+        store = DiskCacheStore(self.tmp.name)
+        entry = {'text': 'ABCD', 'model': 'gemini-2.5-flash'}
+
+        threads = [threading.Thread(target=lambda: [store.save('k', entry) for _ in range(20)]) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(os.listdir(self.tmp.name), ['k.json'])
+        self.assertEqual(store.load('k'), entry)
+
+    def test_ttl_and_invalidation(self):
+        cache = LLMResponseCache(ttl_seconds=60)
+        cache.put('captcha', 'gemini-2.5-flash', 'd1', 'ABCD', latency=1.0)
+        cache.invalidate('captcha', ['gemini'], 'd1')
+        self.assertIsNone(cache.get('captcha', ['gemini'], 'd1'))
+
+        cache.put('captcha', 'gemini-2.5-flash', 'd2', 'EFGH', latency=1.0)
+        with patch('app.services.llm_cache.time.time', return_value=10 ** 11):
+            self.assertIsNone(cache.get('captcha', ['gemini'], 'd2'))
+
+    def test_disabled_task_is_never_cached(self):
+        cache = LLMResponseCache(disabled_tasks=['captcha'])
+        cache.put('captcha', 'gemini-2.5-flash', 'd1', 'ABCD', latency=1.0)
+        self.assertIsNone(cache.get('captcha', ['gemini'], 'd1'))
+
+if __name__ == '__main__':
+    unittest.main()
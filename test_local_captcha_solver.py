@@ -0,0 +1,71 @@
+import unittest
+import io
+import os
+import sys
+import random
+
+sys.path.append(os.getcwd())
+
+from PIL import Image, ImageDraw
+from app.services.captcha.local_solver import LocalCaptchaSolver
+
+def render_captcha(text, jitter=0):
+    """Renders a thresholded (black on white) captcha-like image."""
+    img = Image.new("L", (60, 16), 255)
+    draw = ImageDraw.Draw(img)
+    x = 4
+    for char in text:
+        draw.text((x, 2 + random.randint(0, jitter)), char, fill=0)
+        x += 13
+    img = img.resize((180, 48), Image.NEAREST)
+    buf = io.BytesIO()
+    img.save(buf, format='PNG')
+    return buf.getvalue()
+
+class TestLocalCaptchaSolver(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(42)
+        alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+        self.train = []
+        for _ in range(60):
+            label = ''.join(random.choice(alphabet) for _ in range(4))
+            self.train.append((render_captcha(label, jitter=1), label))
+        self.solver = LocalCaptchaSolver()
+        self.solver.fit(self.train)
+
+    def test_segments_four_glyphs(self):
+        glyphs = self.solver.segment(render_captcha("WXYZ"))
+        self.assertEqual(len(glyphs), 4)
+
+    def test_solves_unseen_captcha_with_high_confidence(self):
+        text, confidence = self.solver.solve(render_captcha("FORT", jitter=1))
+        self.assertEqual(text, "FORT")
+        self.assertGreater(confidence, 0.5)
+
+    def test_untrained_solver_has_zero_confidence(self):
+        text, confidence = LocalCaptchaSolver().solve(render_captcha("ABCD"))
+        self.assertEqual(text, '')
+        self.assertEqual(confidence, 0.0)
+
+    def test_blank_image_has_zero_confidence(self):
+        buf = io.BytesIO()
+        Image.new("L", (180, 48), 255).save(buf, format='PNG')
+        self.assertEqual(self.solver.solve(buf.getvalue()), ('', 0.0))
+
+    def test_save_and_load_roundtrip(self):
+        path = 'test_captcha_templates.npz'
+        try:
+            self.solver.save(path)
+            loaded = LocalCaptchaSolver.load(path)
+            self.assertEqual(len(loaded.labels), len(self.solver.labels))
+            self.assertEqual(loaded.solve(render_captcha("LEAO"))[0], "LEAO")
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_load_missing_model_returns_none(self):
+        self.assertIsNone(LocalCaptchaSolver.load('does_not_exist.npz'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.append(os.getcwd())
+
+from app.services.model_router import ModelRouter
+
+MODELS = ['a', 'b', 'c']
+
+class TestModelRouter(unittest.TestCase):
+
+    def setUp(self):
+        self.router = ModelRouter()
+
+    def test_default_order_without_history(self):
+        self.assertEqual(self.router.route('text', MODELS), MODELS)
+
+    def test_fastest_healthy_model_first(self):
+        self.router.record_success('text', 'a', 4.0)
+        self.router.record_success('text', 'b', 0.5)
+        self.router.record_success('text', 'c', 2.0)
+        self.assertEqual(self.router.route('text', MODELS), ['b', 'c', 'a'])
+
+    def test_latency_is_per_task(self):
+        self.router.record_success('captcha', 'a', 9.0)
+        self.assertEqual(self.router.route('text', MODELS)[0], 'a')
+        self.assertNotEqual(self.router.route('captcha', MODELS)[0], 'a')
+
+    def test_rate_limited_model_skipped_for_all_tasks(self):
+        self.router.record_failure('text', 'a', Exception("429 RESOURCE_EXHAUSTED"))
+        self.assertEqual(self.router.route('text', MODELS), ['b', 'c'])
+        self.assertEqual(self.router.route('captcha', MODELS), ['b', 'c'])
+        self.assertEqual(self.router.seconds_until_available('text', ['a']), 60)
+
+    def test_retry_delay_from_error_is_honoured(self):
+        self.router.record_failure('text', 'a', Exception("429 ... Please retry in 12.5s."))
+        self.assertEqual(self.router.seconds_until_available('text', ['a']), 13)
+
+    def test_failures_without_cooldown_still_wait(self):
+        self.router.record_failure('text', 'a', Exception("500 internal"))
+        self.assertIn('a', self.router.route('text', MODELS))
+        self.assertEqual(self.router.seconds_until_available('text', ['a']), ModelRouter.MIN_RETRY_WAIT)
+
+    def test_not_found_model_disabled(self):
+        self.router.record_failure('text', 'b', Exception("404 NOT_FOUND"))
+        self.assertNotIn('b', self.router.route('text', MODELS))
+        self.assertGreater(self.router.seconds_until_available('text', ['b']), 3600)
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        for _ in range(ModelRouter.FAILURE_THRESHOLD - 1):
+            self.router.record_failure('captcha', 'c', Exception("500 internal"))
+        self.assertIn('c', self.router.route('captcha', MODELS))
+        self.router.record_failure('captcha', 'c', Exception("500 internal"))
+        self.assertNotIn('c', self.router.route('captcha', MODELS))
+        # The breaker is per task
+        self.assertIn('c', self.router.route('text', MODELS))
+
+    def test_state_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'router.json')
+            router = ModelRouter(path)
+            router.record_success('text', 'c', 0.1)
+            router.record_failure('text', 'a', Exception("429"))
+
+            restored = ModelRouter(path)
+            self.assertEqual(restored.route('text', MODELS), ['c', 'b'])
+
+    def test_concurrent_saves_keep_a_valid_state_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'router.json')
+            router = ModelRouter(path)
+            router.record_success('text', 'c', 0.1)
+
+            threads = [threading.Thread(target=lambda: [router.save() for _ in range(20)]) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(os.listdir(tmp), ['router.json'])
+            self.assertIn('text|c', ModelRouter(path).stats)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+import os
+import sys
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.getcwd())
+
+from app.models.contract_repository import ContractRepository
+from app.models.outbox_repository import OutboxRepository, IN_PROGRESS, PENDING, FAILED, DONE
+from app.services.social.publish_worker import PublishWorker
+
+class TestOutboxRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.collection = MagicMock()
+        self.outbox = OutboxRepository(self.collection, lease_seconds=60, max_attempts=3, backoff_base=10, backoff_max=25)
+
+    def test_claim_is_atomic_and_takes_expired_leases(self):
+        self.outbox.claim('twitter', 'worker-a')
+
+        self.collection.find_one_and_update.assert_called_once()
+        query, update = self.collection.find_one_and_update.call_args.args
+        self.assertEqual(query['platform'], 'twitter')
+        self.assertIn({'state': PENDING}, query['$or'])
+        self.assertIn('lease_until', query['$or'][1])
+        self.assertEqual(update['$set']['state'], IN_PROGRESS)
+        self.assertEqual(update['$set']['lease_owner'], 'worker-a')
+        self.assertEqual(update['$inc'], {'attempts': 1})
+
+    def test_claim_one_contract(self):
+        self.outbox.claim('threads', 'worker-a', contract_id='c1')
+
+        query = self.collection.find_one_and_update.call_args.args[0]
+        self.assertEqual(query['_id'], 'c1:threads')
+
+    def test_enqueue_never_resets_existing_jobs(self):
+        self.outbox.enqueue(['c1', 'c2'], ('twitter', 'threads'))
+
+        operations = self.collection.bulk_write.call_args.args[0]
+        self.assertEqual(len(operations), 4)
+        update = operations[0]._doc
+        self.assertEqual(update['$setOnInsert']['state'], PENDING)
+        self.assertIn('next_attempt_at', update['$min'])
+        self.assertNotIn('$set', update)
+
+    def test_retry_later_backs_off_exponentially_then_fails(self):
+        before = datetime.now(timezone.utc)
+
+        self.outbox.retry_later({'_id': 'c1:twitter', 'attempts': 2, 'lease_owner': 'worker-a'}, 'boom')
+        query, update = self.collection.update_one.call_args.args
+        self.assertEqual(query, {'_id': 'c1:twitter', 'state': IN_PROGRESS, 'lease_owner': 'worker-a'})
+        self.assertEqual(update['$set']['state'], PENDING)
+        self.assertAlmostEqual((update['$set']['next_attempt_at'] - before).total_seconds(), 20, delta=1)
+
+        self.outbox.retry_later({'_id': 'c1:twitter', 'attempts': 3, 'lease_owner': 'worker-a'})
+        update = self.collection.update_one.call_args.args[1]
+        self.assertEqual(update['$set']['state'], FAILED)
+        self.assertAlmostEqual((update['$set']['next_attempt_at'] - before).total_seconds(), 25, delta=1)
+
+    def test_release_does_not_count_an_attempt(self):
+        self.outbox.release({'_id': 'c1:twitter', 'attempts': 1, 'lease_owner': 'worker-a'})
+
+        update = self.collection.update_one.call_args.args[1]
+        self.assertEqual(update['$set']['state'], PENDING)
+        self.assertEqual(update['$inc'], {'attempts': -1})
+
+class TestRepositoryOutbox(unittest.TestCase):
+
+    def setUp(self):
+        client = MagicMock()
+        collections = {}
+        client.__getitem__.return_value.__getitem__.side_effect = lambda name: collections.setdefault(name, MagicMock())
+        patcher = patch.object(ContractRepository, '_get_client', return_value=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.repo = ContractRepository()
+        self.collection = self.repo.collection
+        self.jobs = self.repo.outbox.collection
+
+    def test_claim_pending_posts_skips_already_posted(self):
+        self.jobs.find_one_and_update.side_effect = [
+            {'_id': 'c1:twitter', 'contract_id': 'c1', 'platform': 'twitter', 'attempts': 1},
+            {'_id': 'c2:twitter', 'contract_id': 'c2', 'platform': 'twitter', 'attempts': 1},
+            None,
+        ]
+        self.collection.find_one.side_effect = [
+            {'_id': 'c1', 'social_status': {'twitter': {'posted': True}}},
+            {'_id': 'c2', 'nome': 'B'},
+        ]
+
+        contracts = self.repo.claim_pending_posts('twitter', 'worker-a', limit=5)
+
+        self.assertEqual([c['_id'] for c in contracts], ['c2'])
+        self.assertEqual(contracts[0]['outbox_job']['_id'], 'c2:twitter')
+        query, update = self.jobs.update_one.call_args.args
+        self.assertEqual(query, {'_id': 'c1:twitter'})
+        self.assertEqual(update['$set']['state'], DONE)
+
+    def test_mark_as_posted_completes_the_job(self):
+        self.repo.mark_as_posted('c1', 'threads', 'post-1')
+
+        query, update = self.jobs.update_one.call_args.args
+        self.assertEqual(query, {'_id': 'c1:threads'})
+        self.assertEqual(update['$set']['post_id'], 'post-1')
+
+    def test_enrichment_enqueues_only_unposted_platforms(self):
+        self.jobs.bulk_write.reset_mock()
+        self.collection.find_one.return_value = {'_id': 'c1', 'social_status': {'twitter': {'posted': True}}}
+
+        self.repo.save_contract_with_history({'id_contrato': 'x', 'nome': 'A'})
+
+        operations = self.jobs.bulk_write.call_args.args[0]
+        self.assertEqual([op._filter['_id'] for op in operations], ['c1:threads'])
+
+class TestPublishWorkerOutbox(unittest.TestCase):
+
+    def test_failures_are_rescheduled_and_skipped_jobs_released(self):
+        provider = MagicMock()
+        provider.name = 'twitter'
+        provider.render.side_effect = lambda text: text
+        provider.publish.return_value = None
+        repository = MagicMock()
+        worker = PublishWorker(provider, repository, max_attempts=1, backoff_base=0, max_failures=1)
+        worker.start()
+        self.addCleanup(worker.stop)
+
+        worker.submit({'_id': 'c1', 'outbox_job': {'_id': 'c1:twitter'}}, 'texto')
+        worker.submit({'_id': 'c2', 'outbox_job': {'_id': 'c2:twitter'}}, 'texto')
+        worker.join()
+
+        repository.retry_post_later.assert_called_once()
+        self.assertEqual(repository.retry_post_later.call_args.args[0]['_id'], 'c1')
+        repository.release_post.assert_called_once()
+        self.assertEqual(repository.release_post.call_args.args[0]['_id'], 'c2')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import os
+import sys
+from datetime import datetime, timedelta, timezone, date
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from app.services.poll_scheduler import PollScheduler, parse_windows
+
+FORTALEZA = timezone(timedelta(hours=-3))
+
+def at(day, hour, minute=0):
+    # 2025-06-02 is a Monday; times given in Fortaleza local time
+    return datetime(2025, 6, day, hour, minute, tzinfo=FORTALEZA).astimezone(timezone.utc)
+
+class TestPollScheduler(unittest.TestCase):
+
+    def make_scheduler(self, seen, **kwargs):
+        repository = MagicMock()
+        repository.first_seen_times.return_value = seen
+        kwargs.setdefault('min_interval', 60)
+        kwargs.setdefault('max_interval', 12 * 3600)
+        return PollScheduler(repository, polls_per_day=24, **kwargs)
+
+    def test_peak_hours_are_polled_more_often_than_nights(self):
+        # Contracts show up on weekday business hours
+        seen = [at(day, hour) for day in range(2, 7) for hour in (10, 11, 15, 16) for _ in range(5)]
+        scheduler = self.make_scheduler(seen)
+
+        self.assertLess(scheduler.interval_at(at(9, 10, 30)), 3600)
+        self.assertGreater(scheduler.interval_at(at(9, 3)), 3600)
+        self.assertGreater(scheduler.interval_at(at(14, 10)), scheduler.interval_at(at(9, 10)))
+
+    def test_budget_is_kept_over_a_week(self):
+        seen = [at(day, hour) for day in range(2, 7) for hour in (10, 15) for _ in range(8)]
+        scheduler = self.make_scheduler(seen)
+
+        runs, moment = 0, at(2, 0)
+        end = moment + timedelta(days=7)
+        while moment < end:
+            moment = scheduler.plan_next_run(moment)
+            runs += 1
+
+        self.assertAlmostEqual(runs, 7 * 24, delta=7 * 24 * 0.1)
+
+    def test_next_run_does_not_sleep_through_the_morning_peak(self):
+        seen = [at(day, 9) for day in range(2, 7) for _ in range(30)]
+        scheduler = self.make_scheduler(seen)
+
+        next_run = scheduler.plan_next_run(at(9, 8, 50))
+
+        self.assertLessEqual(next_run, at(9, 9, 30))
+        self.assertEqual(scheduler.next_run_at, next_run)
+
+    def test_transfer_windows(self):
+        windows = parse_windows('01-02:03-03,07-10:09-02,bad')
+        self.assertEqual(windows, [((1, 2), (3, 3)), ((7, 10), (9, 2))])
+        scheduler = self.make_scheduler([], transfer_windows=windows)
+
+        self.assertEqual(scheduler._window_factor(date(2025, 5, 1)), 1.0)
+        self.assertEqual(scheduler._window_factor(date(2025, 8, 1)), 4.0)
+        self.assertEqual(scheduler._window_factor(date(2025, 9, 1)), 8.0)
+        self.assertLess(scheduler.interval_at(datetime(2025, 8, 1, 12, tzinfo=timezone.utc)),
+                        scheduler.interval_at(datetime(2025, 5, 1, 12, tzinfo=timezone.utc)))
+
+if __name__ == '__main__':
+    unittest.main()
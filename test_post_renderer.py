@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from app.services.social.post_renderer import render_twitter, render_threads, parse_handle_map, twitter_length
+from app.use_cases.sync_social import SyncSocialUseCase
+
+POST = "🦁 É DO LEÃO!\n\nFulano chega ao @fortalezaec #Reforço\n\n#FortalezaEC #Pici"
+
+class FakeProvider:
+    def __init__(self, name, render):
+        self.name = name
+        self._render = render
+        self.published = []
+
+    def render(self, text):
+        return self._render(text)
+
+    def publish(self, text):
+        self.published.append(text)
+        return f'{self.name}-id'
+
+class TestPostRenderer(unittest.TestCase):
+
+    def test_twitter_counts_emoji_as_two(self):
+        self.assertEqual(twitter_length('abc'), 3)
+        self.assertEqual(twitter_length('🦁'), 2)
+
+    def test_twitter_truncates_keeping_hashtags(self):
+        text = "MANCHETE\n\n" + "palavra " * 60 + "\n\n#FortalezaEC"
+        rendered = render_twitter(text)
+        self.assertLessEqual(twitter_length(rendered), 280)
+        self.assertTrue(rendered.endswith('…\n\n#FortalezaEC'))
+        self.assertEqual(render_twitter(POST), POST)
+
+    def test_threads_maps_handles_and_keeps_one_topic_tag(self):
+        rendered = render_threads(POST, parse_handle_map('fortalezaec:fortalezaesporteclube'))
+        self.assertIn('@fortalezaesporteclube', rendered)
+        self.assertIn('Reforço', rendered)
+        self.assertNotIn('#Reforço', rendered)
+        self.assertTrue(rendered.endswith('#FortalezaEC Pici'))
+
+class TestSyncSocialPostReuse(unittest.TestCase):
+
+    def test_one_generation_per_contract(self):
+        contract = {'_id': 'c1', 'nome': 'Fulano'}
+        repository = MagicMock()
+        repository.claim_pending_posts.side_effect = lambda name, owner, limit: [contract]
+        repository.save_post.side_effect = lambda contract_id, post: post
+        gemini = MagicMock()
+        gemini.generate_posts.return_value = {'c1': {'text': POST, 'prompt_version': 'v2', 'model': 'm'}}
+        twitter = FakeProvider('twitter', render_twitter)
+        threads = FakeProvider('threads', lambda t: render_threads(t, {}))
+
+        SyncSocialUseCase(repository, gemini, providers=[twitter, threads]).execute()
+
+        gemini.generate_posts.assert_called_once()
+        gemini.generate_post.assert_not_called()
+        repository.save_post.assert_called_once()
+        self.assertEqual(twitter.published, [POST])
+        self.assertNotIn('#Reforço', threads.published[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import json
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from app.services.prompt_builder import build_tweet_input
+
+def contract(n_matches):
+    return {
+        '_id': 'oid',
+        'nome': 'Fulano de Tal',
+        'tipo_contrato': 'Contrato Definitivo',
+        'social_status': {'twitter': {'posted': False}},
+        'historico': {'2025': [
+            {'data': f'{day:02d}/03/2025', 'gols': [], 'alteracoes': [], 'penalidades': [], 'estadio': 'X' * 200}
+            for day in range(1, n_matches + 1)
+        ]},
+    }
+
+class TestPromptBuilder(unittest.TestCase):
+
+    def test_sends_only_template_fields_compactly(self):
+        json_input, stats = build_tweet_input(contract(20), token_budget=10000, recent=5)
+        data = json.loads(json_input)
+
+        self.assertNotIn('_id', data)
+        self.assertNotIn('social_status', data)
+        self.assertNotIn('historico', data)
+        self.assertEqual(data['scout']['games'], 20)
+        self.assertEqual(len(data['ultimos_jogos']), 5)
+        self.assertEqual(data['ultimos_jogos'][0]['data'], '20/03/2025')
+        self.assertNotIn('\n', json_input)
+        self.assertEqual(stats['matches'], 5)
+
+    def test_claimed_contract_bookkeeping_is_left_out(self):
+        claimed = contract(3)
+        claimed.update({
+            'first_seen_at': '2025-03-01T12:00:00Z',
+            'source': 'catch_up',
+            'outbox_job': {'_id': 'oid:twitter', 'state': 'in_progress', 'attempts': 2, 'last_error': 'boom'},
+        })
+        retried = dict(claimed, outbox_job=dict(claimed['outbox_job'], attempts=3))
+
+        json_input, _ = build_tweet_input(claimed, token_budget=10000)
+        data = json.loads(json_input)
+
+        for field in ('outbox_job', 'first_seen_at', 'source'):
+            self.assertNotIn(field, data)
+        self.assertEqual(json_input, build_tweet_input(retried, token_budget=10000)[0])
+
+    def test_token_budget_drops_oldest_matches(self):
+        json_input, stats = build_tweet_input(contract(20), token_budget=400, recent=5)
+
+        self.assertLess(stats['matches'], 5)
+        self.assertLessEqual(stats['tokens'], 400)
+        self.assertFalse(stats['over_budget'])
+        self.assertIn('scout', json.loads(json_input))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from pymongo.errors import OperationFailure
+from app.services.social.publish_trigger import PublishTrigger
+
+class FakeStream:
+    def __init__(self, changes):
+        self.changes = changes
+        self.alive = True
+        self.resume_token = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def try_next(self):
+        return self.changes.pop(0) if self.changes else None
+
+class TestPublishTrigger(unittest.TestCase):
+
+    def make_trigger(self, outbox, **kwargs):
+        trigger = PublishTrigger(outbox, debounce=0, **kwargs)
+        trigger.start()
+        self.addCleanup(trigger.stop)
+        return trigger
+
+    def test_falls_back_to_polling_without_replica_set(self):
+        outbox = MagicMock()
+        outbox.collection.watch.side_effect = OperationFailure('not a replica set', code=40573)
+        outbox.next_due_at.side_effect = [None, None, datetime.now(timezone.utc)]
+        trigger = self.make_trigger(outbox, poll_interval=0.05)
+
+        started = time.monotonic()
+        self.assertTrue(trigger.wait())
+
+        self.assertEqual(trigger.mode, 'polling')
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_change_wakes_the_publisher_before_max_wait(self):
+        due = {'at': None}
+        outbox = MagicMock()
+        outbox.next_due_at.side_effect = lambda: due['at']
+        stream = FakeStream([])
+        outbox.collection.watch.return_value = stream
+        trigger = self.make_trigger(outbox, max_wait=60)
+
+        def enqueue():
+            time.sleep(0.2)
+            due['at'] = datetime.now(timezone.utc)
+            stream.changes.append({'operationType': 'insert'})
+        threading.Thread(target=enqueue).start()
+
+        started = time.monotonic()
+        self.assertTrue(trigger.wait())
+
+        self.assertEqual(trigger.mode, 'change_stream')
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_waits_for_scheduled_retry(self):
+        outbox = MagicMock()
+        outbox.collection.watch.return_value = FakeStream([])
+        outbox.next_due_at.return_value = datetime.now(timezone.utc) + timedelta(seconds=0.3)
+        trigger = self.make_trigger(outbox, max_wait=60)
+
+        started = time.monotonic()
+        self.assertTrue(trigger.wait())
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.25)
+
+    def test_stop_releases_waiter(self):
+        outbox = MagicMock()
+        outbox.collection.watch.return_value = FakeStream([])
+        outbox.next_due_at.return_value = None
+        trigger = self.make_trigger(outbox, max_wait=60)
+        threading.Timer(0.1, trigger.stop).start()
+
+        self.assertFalse(trigger.wait())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+import time
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from app.services.social.publish_worker import PublishWorker
+
+class FakeProvider:
+    def __init__(self, name, results, delay=0.0):
+        self.name = name
+        self.results = list(results)
+        self.delay = delay
+        self.published = []
+
+    def render(self, text):
+        return f"[{self.name}] {text}"
+
+    def publish(self, text):
+        time.sleep(self.delay)
+        self.published.append((text, time.monotonic()))
+        return self.results.pop(0) if self.results else f'{self.name}-id'
+
+class TestPublishWorker(unittest.TestCase):
+
+    def make_worker(self, provider, **kwargs):
+        worker = PublishWorker(provider, MagicMock(), backoff_base=0, **kwargs)
+        worker.start()
+        self.addCleanup(worker.stop)
+        return worker
+
+    def test_retries_with_backoff_then_marks_posted(self):
+        provider = FakeProvider('twitter', [None, None, 'post-1'])
+        worker = self.make_worker(provider)
+
+        worker.submit({'_id': 'c1', 'nome': 'A'}, 'texto')
+        worker.join()
+
+        self.assertEqual(len(provider.published), 3)
+        self.assertEqual(provider.published[0][0], '[twitter] texto')
+        worker.repository.mark_as_posted.assert_called_once_with('c1', 'twitter', 'post-1')
+
+    def test_platform_down_skips_rest_of_queue(self):
+        provider = FakeProvider('threads', [None] * 10)
+        worker = self.make_worker(provider, max_attempts=1, max_failures=2)
+
+        for i in range(4):
+            worker.submit({'_id': f'c{i}'}, 'texto')
+        worker.join()
+
+        self.assertEqual(len(provider.published), 2)
+        self.assertEqual(worker.stats, {'posted': 0, 'failed': 2, 'skipped': 2})
+
+    def test_slow_provider_does_not_delay_others(self):
+        slow = FakeProvider('twitter', [], delay=0.3)
+        fast = FakeProvider('threads', [])
+        workers = [self.make_worker(slow), self.make_worker(fast)]
+
+        started = time.monotonic()
+        for worker in workers:
+            for i in range(2):
+                worker.submit({'_id': f'c{i}'}, 'texto')
+        workers[1].join()
+        fast_done = time.monotonic() - started
+        workers[0].join()
+
+        self.assertLess(fast_done, 0.2)
+        self.assertEqual(len(slow.published), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import os
+import sys
+import time
+import threading
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.getcwd())
+
+from pymongo.errors import DuplicateKeyError
+from app.services.rate_limiter import RateLimiter, TokenBucket, MongoBucketStore, parse_rate
+
+class FakeStore:
+    def __init__(self, limiter_lock=None):
+        self.docs = {}
+        self.saves = 0
+        self.threads = set()
+        # Store I/O must never happen while the limiter lock is held
+        self.limiter_lock = limiter_lock
+
+    def _check_unlocked(self):
+        assert not (self.limiter_lock and self.limiter_lock.locked())
+        self.threads.add(threading.current_thread())
+
+    def load(self, name):
+        self._check_unlocked()
+        return self.docs.get(name)
+
+    def save(self, name, tokens, updated_at):
+        self._check_unlocked()
+        self.saves += 1
+        self.docs[name] = {'tokens': tokens, 'updated_at': updated_at}
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('29/60'), (29.0, 60.0))
+
+    def test_bucket_allows_burst_then_reports_wait(self):
+        bucket = TokenBucket('cbf', 3, 60)
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(bucket.reserve(), 20, delta=0.1)
+
+    def test_family_limit_applies_to_keyed_buckets(self):
+        limiter = RateLimiter({'gemini': (1, 60)})
+        limiter.acquire('gemini:model-a')
+        self.assertFalse(limiter.available('gemini:model-a'))
+        # Each model has its own bucket
+        self.assertTrue(limiter.available('gemini:model-b'))
+
+    def test_unknown_bucket_is_unlimited(self):
+        limiter = RateLimiter()
+        for _ in range(100):
+            limiter.acquire('anything')
+
+    def test_acquire_blocks_until_refill(self):
+        limiter = RateLimiter({'cbf': (1, 60)})
+        limiter.acquire('cbf')
+        with patch('app.services.rate_limiter.time.sleep') as mock_sleep:
+            mock_sleep.side_effect = lambda s: limiter.buckets['cbf'].__setattr__('tokens', 1)
+            limiter.acquire('cbf')
+        wait = mock_sleep.call_args.args[0]
+        self.assertAlmostEqual(wait, 60, delta=0.5)
+
+    def test_persisted_state_prevents_burst_after_restart(self):
+        store = FakeStore()
+        first = RateLimiter({'cbf': (2, 60)}, store=store)
+        first.acquire('cbf')
+        first.acquire('cbf')
+
+        restarted = RateLimiter({'cbf': (2, 60)}, store=store)
+        self.assertFalse(restarted.available('cbf'))
+
+    def test_every_reservation_is_persisted_outside_the_lock(self):
+        limiter = RateLimiter({'cbf': (5, 60)})
+        store = FakeStore(limiter._lock)
+        limiter.attach_store(store)
+
+        for _ in range(3):
+            limiter.acquire('cbf')
+
+        self.assertEqual(store.saves, 3)
+        self.assertAlmostEqual(store.docs['cbf']['tokens'], 2, delta=0.01)
+
+    def test_mongo_store_never_overwrites_a_newer_snapshot(self):
+        collection = MagicMock()
+        collection.update_one.side_effect = DuplicateKeyError('newer snapshot stored')
+
+        MongoBucketStore(collection).save('cbf', 1.0, 100.0)
+
+        query = collection.update_one.call_args.args[0]
+        self.assertEqual(query, {'_id': 'cbf', 'updated_at': {'$not': {'$gt': 100.0}}})
+
+if __name__ == '__main__':
+    unittest.main()
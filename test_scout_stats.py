@@ -0,0 +1,53 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from app.services.scout_stats import compute_scout
+
+def match(data, entrou=False, gols=0, cartoes=()):
+    return {
+        'data': data,
+        'alteracoes': [{'tipo': 'ENTROU', 'minuto': 60}] if entrou else [],
+        'gols': [{'minuto': 10}] * gols,
+        'penalidades': [{'tipo': c} for c in cartoes],
+    }
+
+class TestScoutStats(unittest.TestCase):
+
+    def setUp(self):
+        self.historico = {
+            '2024': [match('10/11/2024', gols=1), match('17/11/2024', entrou=True, cartoes=['CARTÃO AMARELO'])],
+            '2025': [match('02/02/2025', gols=2), match('09/02/2025'), match('16/02/2025', entrou=True, cartoes=['CARTÃO VERMELHO'])],
+        }
+
+    def test_totals(self):
+        scout = compute_scout(self.historico)
+        self.assertEqual(scout['games'], 5)
+        self.assertEqual(scout['starts'], 3)
+        self.assertEqual(scout['sub_appearances'], 2)
+        self.assertEqual(scout['start_share'], 0.6)
+        self.assertEqual(scout['goals'], 3)
+        self.assertEqual(scout['goals_per_game'], 0.6)
+        self.assertEqual((scout['yellow_cards'], scout['red_cards'], scout['cards']), (1, 1, 2))
+
+    def test_per_season(self):
+        seasons = compute_scout(self.historico)['seasons']
+        self.assertEqual(seasons['2024'], {'games': 2, 'starts': 1, 'goals': 1, 'cards': 1})
+        self.assertEqual(seasons['2025']['goals'], 2)
+
+    def test_recent_form_uses_match_dates(self):
+        recent = compute_scout(self.historico, recent=2)['recent']
+        self.assertEqual(recent['games'], 2)
+        self.assertEqual(recent['starts'], 1)
+        self.assertEqual(recent['cards'], 1)
+        self.assertEqual(recent['last_game'], '16/02/2025')
+
+    def test_flat_list_and_empty_history(self):
+        flat = compute_scout([match('01/03/2025', gols=1)])
+        self.assertEqual(flat['seasons'], {'2025': {'games': 1, 'starts': 1, 'goals': 1, 'cards': 0}})
+        self.assertEqual(compute_scout({}), {'games': 0, 'seasons': {}})
+
+if __name__ == '__main__':
+    unittest.main()
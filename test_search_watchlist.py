@@ -0,0 +1,57 @@
+import unittest
+import os
+import sys
+import threading
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from app.use_cases.search_watchlist import SearchWatchlistUseCase, parse_watchlist
+
+class FakeSearch:
+    def __init__(self, results):
+        # (uf, club) -> results list or None (failed search)
+        self.results = results
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def execute(self, search_date=None, uf=None, codigo_clube=None):
+        with self._lock:
+            self.calls.append((uf, codigo_clube))
+        return self.results.get((uf, codigo_clube))
+
+class TestSearchWatchlist(unittest.TestCase):
+
+    def test_parse_watchlist(self):
+        self.assertEqual(parse_watchlist('ce:63238:Fortaleza, SP:1234,bad,'), [
+            {'uf': 'CE', 'codigo_clube': '63238', 'nome': 'Fortaleza'},
+            {'uf': 'SP', 'codigo_clube': '1234', 'nome': None},
+        ])
+
+    def test_searches_every_target_and_dedupes_contracts(self):
+        search = FakeSearch({
+            ('CE', '1'): [{'id_contrato': 'a', 'codigo_atleta': 7}, {'id_contrato': 'b', 'codigo_atleta': 8}],
+            ('CE', '2'): [{'id_contrato': 'b', 'codigo_atleta': 8}],
+            ('SP', '3'): None,
+        })
+        repository = MagicMock()
+        repository.get_watchlist.return_value = []
+        targets = parse_watchlist('CE:1,CE:2,SP:3')
+
+        results, searched = SearchWatchlistUseCase(search, repository, targets, workers=2).execute()
+
+        self.assertEqual(sorted(search.calls), [('CE', '1'), ('CE', '2'), ('SP', '3')])
+        self.assertEqual([c['id_contrato'] for c in results], ['a', 'b'])
+        self.assertEqual([t['codigo_clube'] for t in searched], ['1', '2'])
+
+    def test_mongo_watchlist_overrides_config(self):
+        search = FakeSearch({('RJ', '9'): []})
+        repository = MagicMock()
+        repository.get_watchlist.return_value = [{'uf': 'RJ', 'codigo_clube': '9', 'nome': None}]
+
+        SearchWatchlistUseCase(search, repository, parse_watchlist('CE:1')).execute()
+
+        self.assertEqual(search.calls, [('RJ', '9')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+from app.config import Config
+from app.services.captcha.local_solver import LocalCaptchaSolver
+from app.services.captcha.corpus import CaptchaCorpus
+from app.services.captcha.preprocessing import preprocess_captcha
+
+def load_labelled_images(directory):
+    """
+    Yields (image_bytes, label) for every PNG in the directory.
+    The label is taken from the file name: ABCD.png or ABCD_<anything>.png
+    Images must already be thresholded (as produced by GeminiService._preprocess_image).
+    """
+    for filename in sorted(os.listdir(directory)):
+        if not filename.lower().endswith('.png'):
+            continue
+        label = os.path.splitext(filename)[0].split('_')[0].upper()
+        with open(os.path.join(directory, filename), 'rb') as f:
+            yield f.read(), label
+
+def load_corpus(directory):
+    """
+    Yields (processed_image_bytes, label) for every captcha CBF accepted.
+    """
+    for image_bytes, label in CaptchaCorpus(directory).labelled():
+        yield preprocess_captcha(image_bytes), label
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python train_captcha_solver.py <labelled_images_dir | captcha_corpus_dir> [output_model]")
+        return
+
+    directory = sys.argv[1]
+    output = sys.argv[2] if len(sys.argv) > 2 else Config.CAPTCHA_SOLVER_MODEL
+
+    # A captcha corpus (see CAPTCHA_CORPUS_DIR) holds raw images; a plain directory holds thresholded ones
+    if os.path.exists(os.path.join(directory, 'index.jsonl')):
+        samples = load_corpus(directory)
+    else:
+        samples = load_labelled_images(directory)
+
+    solver = LocalCaptchaSolver()
+    used = solver.fit(samples)
+    print(f"Trained on {used} captchas ({len(solver.labels)} glyph exemplars).")
+
+    if solver.is_trained:
+        solver.save(output)
+    else:
+        print("No usable samples found. Model not saved.")
+
+if __name__ == "__main__":
+    main()